@@ -1,24 +1,83 @@
 #!/usr/bin/env python3
-"""List all available Gemini models."""
+"""List all available Gemini models.
+
+The model list is cached in ~/.cache/cosuno/models.json for 24 hours so
+repeated runs skip the network round-trip. Pass --refresh to bypass it.
+"""
+import json
 import os
+import sys
+import tempfile
+import time
+from pathlib import Path
 from dotenv import load_dotenv
 
-load_dotenv()
+CACHE_PATH = Path.home() / ".cache" / "cosuno" / "models.json"
+CACHE_TTL_SECONDS = 24 * 60 * 60
 
-api_key = os.getenv("GOOGLE_API_KEY")
-print(f"✅ API Key loaded: {api_key[:20]}...\n")
 
-try:
+def load_cached_models():
+    """Return the cached model list if it is fresh, else None."""
+    try:
+        if CACHE_PATH.stat().st_mtime > time.time() - CACHE_TTL_SECONDS:
+            return json.loads(CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def save_cached_models(models):
+    """Write the model list atomically so readers never see a partial file."""
+    # Serialize up front: one write() instead of one per JSON token
+    payload = json.dumps(models).encode()
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_PATH.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+
+def fetch_models():
+    """Query the Gemini API for the available models."""
+    load_dotenv()
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    print(f"✅ API Key loaded: {api_key[:20]}...\n")
+
     import google.generativeai as genai
     genai.configure(api_key=api_key)
-    
+
+    return [
+        {
+            "name": model.name,
+            "methods": list(getattr(model, "supported_generation_methods", []) or []),
+        }
+        for model in genai.list_models()
+    ]
+
+
+try:
+    models = None if "--refresh" in sys.argv else load_cached_models()
+    if models is None:
+        models = fetch_models()
+        try:
+            save_cached_models(models)
+        except OSError as e:
+            print(f"⚠️  Could not write model cache: {e}")
+    else:
+        print(f"📦 Using cached model list ({CACHE_PATH})\n")
+
     print("📋 Available Gemini Models:\n")
-    for model in genai.list_models():
-        print(f"  • {model.name}")
-        if hasattr(model, 'supported_generation_methods'):
-            print(f"    Methods: {model.supported_generation_methods}")
+    for model in models:
+        print(f"  • {model['name']}")
+        if model["methods"]:
+            print(f"    Methods: {model['methods']}")
         print()
-            
+
 except Exception as e:
     print(f"❌ Error: {e}")
     import traceback
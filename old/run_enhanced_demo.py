@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Demo the enhanced agent with advanced LangGraph features."""
 
+import asyncio
 import sys
 from pathlib import Path
 import logging
@@ -16,13 +17,21 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from construction_assistant import EnhancedLangGraphAgent
 
 
+async def run_all(agent, prompts):
+    """Run all prompts concurrently; failures are returned, not raised."""
+    return await asyncio.gather(
+        *[agent.arun(prompt, verbose=False) for prompt in prompts],
+        return_exceptions=True,
+    )
+
+
 def main():
     print("\n" + "=" * 80)
     print("🚀 Enhanced LangGraph Agent - Advanced Features Demo")
     print("=" * 80)
     print("\nFeatures demonstrated:")
-    print("  ✅ Conditional routing (validation → clarify or fetch)")
-    print("  ✅ Loops (fetch → refetch if insufficient bids)")
+    print("  ✅ Conditional routing (parse → clarify or fetch)")
+    print("  ✅ Bounded retries (re-fetch if insufficient bids)")
     print("  ✅ Multi-stage validation (parse + comparison)")
     print("  ✅ Fallback strategies (LLM → regex)")
     print("\n" + "=" * 80 + "\n")
@@ -49,11 +58,13 @@ def main():
         {
             "name": "Request with Multiple Refetch Triggers",
             "prompt": "Find contractors for roofing on project ALPHA-2025",
-            "notes": "May trigger refetch loop if bids < min_bids"
+            "notes": "May trigger fetch retries if bids < min_bids"
         },
     ]
     
-    for i, test in enumerate(test_cases, 1):
+    results = asyncio.run(run_all(agent, [test['prompt'] for test in test_cases]))
+    
+    for i, (test, result) in enumerate(zip(test_cases, results), 1):
         print(f"\n{'─' * 80}")
         print(f"Test {i}: {test['name']}")
         print(f"Notes: {test['notes']}")
@@ -61,7 +72,8 @@ def main():
         print(f"Prompt: {test['prompt']}\n")
         
         try:
-            result = agent.run(test['prompt'], verbose=False)
+            if isinstance(result, Exception):
+                raise result
             
             print(f"\n✅ Results:")
             print(f"   Project ID: {result.get('project_id')}")
@@ -84,10 +96,9 @@ def main():
     print("✅ Advanced Features Demo Complete!")
     print("\nKey Features Used:")
     print("  1. Conditional Routing:")
-    print("     - validate_parse → clarify OR fetch")
-    print("     - fetch → refetch OR compare")
-    print("\n  2. Loops:")
-    print("     - Retries fetch if insufficient bids")
+    print("     - parse → clarify OR fetch (Command goto)")
+    print("\n  2. Bounded Retries:")
+    print("     - Retries fetch concurrently if insufficient bids")
     print("     - Respects max_retries parameter")
     print("\n  3. Multi-stage Validation:")
     print("     - Parse validation with confidence scores")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Live agent demo - improved version with fallback to regex parsing."""
 
+import asyncio
 import sys
 from pathlib import Path
 
@@ -10,6 +11,14 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from construction_assistant import LangGraphAgent
 
 
+async def run_all(agent, prompts):
+    """Run all prompts concurrently; failures are returned, not raised."""
+    return await asyncio.gather(
+        *[agent.arun(prompt, verbose=False) for prompt in prompts],
+        return_exceptions=True,
+    )
+
+
 def main():
     print("=" * 80)
     print("🚀 LangGraph Agent - Demo with Fallback Parsing")
@@ -29,15 +38,18 @@ def main():
         "Find the cheapest contractors for roofing on project ALPHA-2025",
     ]
     
-    for i, prompt in enumerate(prompts, 1):
+    # Requests are independent, so run them concurrently
+    results = asyncio.run(run_all(agent, prompts))
+    
+    for i, (prompt, result) in enumerate(zip(prompts, results), 1):
         print("-" * 80)
         print(f"📝 Request #{i}:")
         print(f"   {prompt}")
         print("-" * 80)
         
         try:
-            # Run with verbose=True to see detailed execution
-            result = agent.run(prompt, verbose=False)
+            if isinstance(result, Exception):
+                raise result
             
             print(f"✅ Project ID: {result.get('project_id')}")
             print(f"📋 Scope: {result.get('scope')}")
@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 """Live demo of the LangGraph agent with real Gemini API."""
+import asyncio
 import sys
 sys.path.insert(0, 'src')
 
 from construction_assistant import LangGraphAgent
 
+
+async def run_all(agent, requests):
+    """Run all requests concurrently; failures are returned, not raised."""
+    return await asyncio.gather(
+        *[agent.arun(request) for request in requests],
+        return_exceptions=True,
+    )
+
+
 def main():
     print("🚀 Starting LangGraph Agent with Real Gemini API\n")
     print("=" * 70)
@@ -21,15 +31,20 @@ def main():
         "Get bids for electrical installation on project ELEC-99"
     ]
     
-    for i, request in enumerate(requests, 1):
+    # The Gemini calls are independent, so overlap them instead of waiting
+    # for each in turn; results are printed afterwards in request order
+    print("⏳ Processing with Gemini LLM...")
+    results = asyncio.run(run_all(agent, requests))
+    
+    for i, (request, result) in enumerate(zip(requests, results), 1):
         print(f"\n{'=' * 70}")
         print(f"📋 Request {i}:")
         print(f"   {request}")
         print("-" * 70)
         
         try:
-            print("⏳ Processing with Gemini LLM...")
-            result = agent.run(request)
+            if isinstance(result, Exception):
+                raise result
             
             print("\n✅ Result:")
             print(f"   Project ID: {result.get('project_id', 'N/A')}")
@@ -8,6 +8,7 @@ This demonstrates how the agent uses multiple tools to enrich recommendations:
 Tools are executed as part of the agent workflow and results are included
 in the final recommendation.
 """
+import asyncio
 import logging
 from src.construction_assistant.enhanced_langgraph_agent import EnhancedLangGraphAgent
 
@@ -20,25 +21,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def test_with_tools(prompt: str, test_name: str):
+async def run_with_tools(agent: EnhancedLangGraphAgent, prompt: str):
     """Run agent with tool usage."""
+    logger.info(f"🚀 Starting agent with prompt: {prompt[:50]}...")
+    return await agent.arun(prompt, verbose=True)
+
+
+async def run_all(agent: EnhancedLangGraphAgent, tests):
+    """Run all (prompt, test_name) pairs concurrently on one agent."""
+    return await asyncio.gather(*[run_with_tools(agent, prompt) for prompt, _ in tests])
+
+
+def show_results(prompt: str, test_name: str, result):
+    """Print the outcome of one agent run."""
     print(f"\n{'='*70}")
     print(f"TEST: {test_name}")
     print(f"{'='*70}")
     print(f"INPUT: {prompt}\n")
     
-    # Create agent with tool usage capability
-    agent = EnhancedLangGraphAgent(
-        use_llm=False,  # Use regex for demo
-        min_bids=2,
-        max_retries=1
-    )
-    agent.build_graph()
-    
-    # Run agent
-    logger.info(f"🚀 Starting agent with prompt: {prompt[:50]}...")
-    result = agent.run(prompt, verbose=True)
-    
     # Display results
     print("\n" + "="*70)
     print("RESULTS:")
@@ -101,23 +101,26 @@ if __name__ == "__main__":
     print("  2. CostEstimatorTool - Budget estimation based on scope")
     print()
     
-    # Test 1: Excavation project (medium complexity)
-    test_with_tools(
-        "Get bids for excavation work on project P-2025",
-        "Excavation Project with Market Tools"
-    )
+    tests = [
+        # Test 1: Excavation project (medium complexity)
+        ("Get bids for excavation work on project P-2025", "Excavation Project with Market Tools"),
+        # Test 2: Roofing project (high complexity)
+        ("I need roofing contractors for ALPHA-2025", "Roofing Project with Cost Estimation"),
+        # Test 3: Concrete work (stable market)
+        ("Concrete work needed for project BETA-100", "Concrete Project with Market Data"),
+    ]
     
-    # Test 2: Roofing project (high complexity)
-    test_with_tools(
-        "I need roofing contractors for ALPHA-2025",
-        "Roofing Project with Cost Estimation"
+    # Create the agent once: the graph is compiled lazily on the first run
+    # and reused for every test case
+    agent = EnhancedLangGraphAgent(
+        use_llm=False,  # Use regex for demo
+        min_bids=2,
+        max_retries=1
     )
     
-    # Test 3: Concrete work (stable market)
-    test_with_tools(
-        "Concrete work needed for project BETA-100",
-        "Concrete Project with Market Data"
-    )
+    # The three runs are independent, so execute them concurrently
+    for (prompt, test_name), result in zip(tests, asyncio.run(run_all(agent, tests))):
+        show_results(prompt, test_name, result)
     
     print("\n" + "="*70)
     print("KEY OBSERVATIONS:")
@@ -1,10 +1,20 @@
 """construction_assistant package
 
 Exports the LangGraph-based agent and helper tools.
+
+The agents are imported on first access, since they pull in langgraph and
+the LangChain packages; importing just the tools stays fast.
 """
+from importlib import import_module
+
 from .agent import estimate_materials, fetch_project_plan, fetch_subcontractor_bids, compare_bids
-from .langgraph_agent import LangGraphAgent
-from .enhanced_langgraph_agent import EnhancedLangGraphAgent
+
+# Lazily imported exports and the submodule defining each
+_LAZY_EXPORTS = {
+	"LangGraphAgent": ".langgraph_agent",
+	"get_agent": ".langgraph_agent",
+	"EnhancedLangGraphAgent": ".enhanced_langgraph_agent",
+}
 
 __all__ = [
 	"estimate_materials",
@@ -12,5 +22,18 @@ __all__ = [
 	"fetch_subcontractor_bids",
 	"compare_bids",
 	"LangGraphAgent",
+	"get_agent",
 	"EnhancedLangGraphAgent",
 ]
+
+
+def __getattr__(name):
+	if name in _LAZY_EXPORTS:
+		value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+		globals()[name] = value
+		return value
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
@@ -3,8 +3,23 @@
 These tools are used by the LangGraph-based agent to handle
 procurement, scheduling, and estimation tasks.
 """
+import heapq
+import math
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+from .patterns import AREA_PATTERN
+
+
+@lru_cache(maxsize=256)
+def _area_from_prompt(prompt: str) -> float:
+    """Parse the floor area in square meters from a prompt, defaulting to 10.
+
+    Memoized: planning steps often re-estimate for the same prompt.
+    """
+    m = AREA_PATTERN.search(prompt)
+    return float(m.group(1)) if m else 10.0
+
 
 def estimate_materials(prompt: str, area: Optional[float] = None, material: str = "concrete") -> Dict[str, Any]:
     """Produce a simple materials estimate.
@@ -13,14 +28,8 @@ def estimate_materials(prompt: str, area: Optional[float] = None, material: str
     so tests are easy to write and maintain. Replace with real logic for
     production use.
     """
-    import re
-
     if area is None:
-        m = re.search(r"(\d+\.?\d*)\s*(sqm|m2|square meters?|sq m)", prompt.lower())
-        if m:
-            area = float(m.group(1))
-        else:
-            area = 10.0
+        area = _area_from_prompt(prompt)
 
     if material == "concrete":
         depth_m = 0.12
@@ -77,14 +86,16 @@ def fetch_subcontractor_bids(prompt: str, project_id: Optional[str] = None, api_
 def compare_bids(bids: list, top_n: int = 1) -> Dict[str, Any]:
     """Compare bids and return top_n cheapest bids and some simple metrics.
 
-    This function is intentionally simple: it sorts by price and returns the
+    This function is intentionally simple: it ranks by price and returns the
     best options. Real-world logic may consider lead time, reliability, or
     historical performance.
+
+    Only the top_n cheapest bids are selected (O(n log top_n)) rather than
+    sorting the whole list; ties keep their original order as with sorted().
     """
     if not bids:
         return {"top": [], "count": 0}
 
-    sorted_bids = sorted(bids, key=lambda b: b.get("price", float("inf")))
-    top = sorted_bids[:top_n]
+    top = heapq.nsmallest(top_n, bids, key=lambda b: b.get("price", math.inf))
     avg_price = sum(b.get("price", 0) for b in bids) / len(bids)
     return {"top": top, "count": len(bids), "average_price": avg_price}
@@ -2,7 +2,7 @@
 
 This demonstrates advanced LangGraph patterns:
 - Conditional routing (graph_state_router)
-- Loops (validate -> re-fetch if invalid)
+- Bounded retries (re-fetch if bids are insufficient)
 - Parallel-like operations (multiple validators)
 - Adaptive behavior based on state
 - LangChain tool integration with proper tool binding
@@ -13,35 +13,162 @@ This enhanced version shows production-ready patterns.
 import json
 import logging
 import os
-import re
-from typing import Any, Literal
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Iterator, Literal
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Command, Send
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools.base import ToolException
 
 from .agent import fetch_subcontractor_bids, compare_bids
+from .graph_nodes import SharedGraphAgent, agent_node
+from .parallel_executor import ToolCall, create_parallel_executor
+from .patterns import LOOSE_PROJECT_ID_PATTERN, find_project_id, find_scope
 from .schema import AgentState
-from .tools import AVAILABLE_TOOLS, fetch_market_data, estimate_project_cost
+from .tools import (
+    AVAILABLE_TOOLS,
+    AVAILABLE_TOOL_SCHEMAS,
+    READ_ONLY_TOOL_NAMES,
+    TOOL_INVOKERS,
+    batch,
+    fetch_market_data,
+    estimate_project_cost,
+)
 
+# LLM replies, tool-result messages and tool-round fingerprints go through
+# orjson when it is installed
+try:
+    import orjson
 
+    _json_loads = orjson.loads
 
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
 
-class EnhancedLangGraphAgent:
+    def _json_dumps_sorted(value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(value: Any) -> str:
+        # Compact like orjson, so messages are the same with either library
+        return json.dumps(value, separators=(",", ":"))
+
+    def _json_dumps_sorted(value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+# Shared by all agents: runs the tool calls of one LLM turn concurrently.
+# Worker threads are only started on the first multi-call batch.
+_tool_executor = create_parallel_executor(max_workers=8, use_asyncio=False)
+
+# Tools the analysis needs; once the LLM has called both, the tool loop ends
+# without another LLM round-trip
+_REQUIRED_TOOLS = frozenset({fetch_market_data.name, estimate_project_cost.name})
+
+# Kept byte-identical across calls, with everything request-specific in the
+# user turn, so providers can reuse the cached prefill of this prefix.
+LLM_TOOLS_SYSTEM_PROMPT = """You are a construction project advisor. Analyze bids and use available tools 
+to provide market context and cost validation. Decide which tools are relevant and use them to enrich your analysis.
+When you need more than one tool, request them together in one turn, ideally through the batch tool."""
+
+
+@lru_cache(maxsize=1024)
+def _parse_prompt_with_regex(prompt: str) -> tuple[str | None, str | None]:
+    """Extract (project_id, scope) from a prompt, memoized for repeated prompts."""
+    return find_project_id(prompt), find_scope(prompt)
+
+
+@lru_cache(maxsize=4)
+def _shared_llm(llm_class: type, api_key: str, model: str, temperature: float):
+    """Return one chat model per configuration, shared by all agents.
+    
+    Agents built per request then reuse the same client and its connection
+    pool instead of opening new connections for every instance.
+    """
+    return llm_class(model=model, google_api_key=api_key, temperature=temperature)
+
+
+def _coalesce_concurrent(fn):
+    """Let concurrent calls with equal arguments share a single call of fn.
+    
+    Callers arriving while a call is in flight wait for its result (or
+    exception) instead of starting their own; lru_cache alone only helps
+    once the first call has finished.
+    """
+    lock = threading.Lock()
+    in_flight: dict[tuple, Future] = {}
+
+    @wraps(fn)
+    def wrapper(*args):
+        with lock:
+            future = in_flight.get(args)
+            leader = future is None
+            if leader:
+                future = in_flight[args] = Future()
+        if leader:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with lock:
+                    del in_flight[args]
+        return future.result()
+
+    return wrapper
+
+
+@dataclass(slots=True)
+class ExtendedState:
+    """Per-agent counters tracked alongside the graph state."""
+    iteration_count: int = 0
+    parse_confidence: float = 0.0
+    fetch_attempts: int = 0
+    validation_passed: bool = False
+
+
+def _bid_text(bids: list) -> str:
+    """Render bids one per line, in the single format every LLM prompt uses."""
+    return "\n".join(
+        f"- {bid.get('subcontractor')}: ${bid.get('price'):,} (lead: {bid.get('lead_time_days')}d)"
+        for bid in bids
+    )
+
+
+class EnhancedLangGraphAgent(SharedGraphAgent):
     """Advanced agent with conditional routing, validation loops, and error recovery.
     
     Features:
     - Conditional routing: Different paths based on parsing success
-    - Validation loops: Re-fetch if initial bids are insufficient
+    - Bounded retries: Re-fetch concurrently if initial bids are insufficient
     - Fallback strategies: Graceful degradation when data is incomplete
     - Multi-path execution: Try multiple extraction strategies
     - State tracking: Track iterations and confidence levels
+    
+    Tuning knobs, set per agent:
+    - max_tool_iterations: Upper bound on LLM <-> tool rounds per request
+      (default MAX_LLM_TOOL_ITERATIONS)
+    - per_tool_timeout_s: Seconds each LLM-requested tool call may run
+      before it is answered with {"error": "timeout"} (default
+      PER_TOOL_TIMEOUT_S; None disables the bound)
     """
 
+    # Default upper bound on LLM <-> tool rounds, preventing infinite loops
+    MAX_LLM_TOOL_ITERATIONS = 3
+    # Default seconds an LLM-requested tool call may take
+    PER_TOOL_TIMEOUT_S = 10.0
+    # Distinct prompts whose LLM parse / recommendation each agent remembers
+    LLM_CACHE_SIZE = 1024
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -50,6 +177,8 @@ class EnhancedLangGraphAgent:
         use_llm: bool = True,
         min_bids: int = 2,
         max_retries: int = 2,
+        max_tool_iterations: int = MAX_LLM_TOOL_ITERATIONS,
+        per_tool_timeout_s: float | None = PER_TOOL_TIMEOUT_S,
     ):
         """Initialize the enhanced agent.
         
@@ -60,6 +189,9 @@ class EnhancedLangGraphAgent:
             use_llm: If False, use regex parsing
             min_bids: Minimum bids required before considering successful
             max_retries: Maximum retry attempts for fetching bids
+            max_tool_iterations: Maximum LLM <-> tool rounds per request
+            per_tool_timeout_s: Seconds each LLM-requested tool call may
+                take, or None for no limit
         """
         self.api_key = api_key
         self.top_n = top_n
@@ -68,25 +200,31 @@ class EnhancedLangGraphAgent:
         self.llm_with_tools = None  # Initialize to None
         self.min_bids = min_bids
         self.max_retries = max_retries
-        self.graph = StateGraph(AgentState)
+        self.max_tool_iterations = max_tool_iterations
+        self.per_tool_timeout_s = per_tool_timeout_s
+        # Set by build_graph() from the graph shared by all agents
+        self.graph = None
         self.compiled_graph = None
 
+        # Per-agent, since answers depend on this agent's LLM. Failed calls
+        # raise through the cache, so only successful answers are kept.
+        # Concurrent runs asking the same thing share one in-flight call.
+        self._cached_llm_parse = lru_cache(maxsize=self.LLM_CACHE_SIZE)(
+            _coalesce_concurrent(self._invoke_llm_parse)
+        )
+        self._cached_llm_format = lru_cache(maxsize=self.LLM_CACHE_SIZE)(
+            _coalesce_concurrent(self._invoke_llm_format)
+        )
+
         # Extended state to track iterations
-        self.extended_state = {
-            "iteration_count": 0,
-            "parse_confidence": 0.0,
-            "fetch_attempts": 0,
-            "validation_passed": False,
-        }
+        self.extended_state = ExtendedState()
 
         if use_llm:
             api_key_to_use = gemini_api_key or os.getenv("GOOGLE_API_KEY")
             if api_key_to_use:
                 try:
-                    self.llm = ChatGoogleGenerativeAI(
-                        model="gemini-3-pro-preview",
-                        google_api_key=api_key_to_use,
-                        temperature=0.3
+                    self.llm = _shared_llm(
+                        ChatGoogleGenerativeAI, api_key_to_use, "gemini-3-pro-preview", 0.3
                     )
                     logger.info("✅ Gemini LLM initialized")
                     # Bind tools to LLM for tool-calling capability
@@ -100,7 +238,7 @@ class EnhancedLangGraphAgent:
         
         This demonstrates the proper LangChain pattern for tool binding:
         - Uses bind_tools() to attach tool definitions to LLM
-        - Tools are automatically converted to appropriate schema format
+        - Tool schemas are precomputed once (AVAILABLE_TOOL_SCHEMAS)
         - LLM can now return tool_calls in responses
         
         Returns:
@@ -111,8 +249,8 @@ class EnhancedLangGraphAgent:
         
         try:
             # Bind tools to LLM - this is the LangChain pattern
-            # The bind_tools method handles schema conversion automatically
-            llm_with_tools = self.llm.bind_tools(AVAILABLE_TOOLS)
+            # The schemas are converted once in tools.py, not on every bind
+            llm_with_tools = self.llm.bind_tools(AVAILABLE_TOOL_SCHEMAS)
             logger.info(f"✅ Tools bound to LLM: {[t.name for t in AVAILABLE_TOOLS]}")
             return llm_with_tools
         except Exception as e:
@@ -124,7 +262,7 @@ class EnhancedLangGraphAgent:
         
         This method handles the full LLM-tool loop orchestration:
         1. Parse tool_call messages from LLM response
-        2. Execute each tool using AVAILABLE_TOOLS
+        2. Execute the tools concurrently using AVAILABLE_TOOLS
         3. Collect results for feedback to LLM
         
         Args:
@@ -137,43 +275,93 @@ class EnhancedLangGraphAgent:
         if tool_results is None:
             tool_results = {}
         
-        for tool_call in tool_calls:
-            tool_name = tool_call.get("tool") or tool_call.get("name")
-            tool_input = tool_call.get("tool_input") or tool_call.get("input", {})
-            tool_id = tool_call.get("id", tool_name)
-            
-            logger.info(f"🔧 Executing LLM tool call: {tool_name}({tool_input})")
-            
-            try:
-                # Find and execute the matching tool
-                matching_tool = next(
-                    (t for t in AVAILABLE_TOOLS if t.name == tool_name),
-                    None
-                )
-                
-                if matching_tool is None:
-                    logger.warning(f"⚠️  Tool '{tool_name}' not found in AVAILABLE_TOOLS")
-                    tool_results[tool_id] = {"error": f"Tool '{tool_name}' not found"}
-                    continue
-                
-                # Invoke the tool with the LLM-provided inputs
-                result = matching_tool.invoke(tool_input)
-                tool_results[tool_id] = result
-                logger.info(f"✅ Tool '{tool_name}' executed successfully")
-                
-            except ToolException as e:
-                logger.warning(f"⚠️  Tool '{tool_name}' raised ToolException: {str(e)}")
-                tool_results[tool_id] = {"error": f"ToolException: {str(e)}"}
-            except Exception as e:
-                logger.error(f"❌ Unexpected error executing tool '{tool_name}': {str(e)}")
-                tool_results[tool_id] = {"error": f"Unexpected error: {str(e)}"}
+        # Read-only calls run concurrently (a single call inline), then
+        # mutating calls one at a time in their original order
+        batch = self._to_tool_call_batch(tool_calls)
+        read_only, mutating = self._split_by_side_effects(batch)
+        timeout = self.per_tool_timeout_s
+        results = _tool_executor.execute_tools_parallel(read_only, self._invoke_llm_tool, timeout=timeout)
+        for call in mutating:
+            results.update(_tool_executor.execute_tools_parallel([call], self._invoke_llm_tool, timeout=timeout))
+        tool_results.update(self._in_call_order(batch, results))
+        return tool_results
+
+    async def _aexecute_llm_tool_calls(self, tool_calls: list, tool_results: dict = None) -> dict:
+        """Async variant of _execute_llm_tool_calls.
         
+        The calls are gathered on the running loop, each tool body running in
+        the executor's thread pool, so the loop is never blocked by a tool.
+        """
+        if tool_results is None:
+            tool_results = {}
+        
+        batch = self._to_tool_call_batch(tool_calls)
+        read_only, mutating = self._split_by_side_effects(batch)
+        timeout = self.per_tool_timeout_s
+        results = await _tool_executor.aexecute_tools_parallel(read_only, self._invoke_llm_tool, timeout=timeout)
+        for call in mutating:
+            results.update(
+                await _tool_executor.aexecute_tools_parallel([call], self._invoke_llm_tool, timeout=timeout)
+            )
+        tool_results.update(self._in_call_order(batch, results))
         return tool_results
 
+    @staticmethod
+    def _split_by_side_effects(batch: list) -> tuple[list, list]:
+        """Split tool calls into (read-only, mutating), keeping their order.
+        
+        Unknown tools count as mutating, the safe default.
+        """
+        read_only, mutating = [], []
+        for call in batch:
+            (read_only if call.tool in READ_ONLY_TOOL_NAMES else mutating).append(call)
+        return read_only, mutating
+
+    @staticmethod
+    def _in_call_order(batch: list, results: dict) -> dict:
+        """Order results by the calls' original order, whichever finished first."""
+        return {call.id: results[call.id] for call in batch}
+
+    @staticmethod
+    def _to_tool_call_batch(tool_calls: list) -> list:
+        """Normalize LLM tool call dicts; see ToolCall.from_dict for the formats."""
+        return [ToolCall.from_dict(tool_call, index) for index, tool_call in enumerate(tool_calls)]
+
+    @staticmethod
+    def _invoke_llm_tool(tool_name: str, tool_input: dict) -> Any:
+        """Run one LLM-requested tool, mapping failures to error results."""
+        logger.info(f"🔧 Executing LLM tool call: {tool_name}({tool_input})")
+        
+        try:
+            # Find and execute the matching tool
+            invoke_tool = TOOL_INVOKERS.get(tool_name)
+            
+            if invoke_tool is None:
+                logger.warning(f"⚠️  Tool '{tool_name}' not found in AVAILABLE_TOOLS")
+                return {"error": f"Tool '{tool_name}' not found"}
+            
+            # Invoke the tool with the LLM-provided inputs
+            result = invoke_tool(tool_input)
+            logger.info(f"✅ Tool '{tool_name}' executed successfully")
+            return result
+            
+        except ToolException as e:
+            logger.warning(f"⚠️  Tool '{tool_name}' raised ToolException: {str(e)}")
+            return {"error": f"ToolException: {str(e)}"}
+        except Exception as e:
+            logger.error(f"❌ Unexpected error executing tool '{tool_name}': {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
+
     # ==================== PARSING NODES ====================
 
-    def _parse_node(self, state: AgentState) -> dict:
-        """Parse and extract project_id and scope."""
+    def _parse_node(self, state: AgentState) -> Command[Literal["fetch", "clarify"]]:
+        """Parse and extract project_id and scope - CONDITIONAL ROUTING POINT.
+        
+        Validation happens here too, and the returned Command picks the next
+        node without a separate validation step:
+        - If parse succeeded with high confidence → proceed to fetch
+        - If parse failed or low confidence → request clarification
+        """
         prompt = state.get("prompt", "")
         logger.info(f"Parsing: {prompt[:50]}...")
 
@@ -185,73 +373,46 @@ class EnhancedLangGraphAgent:
             result = self._parse_with_regex(prompt)
             confidence = 0.6 if result["project_id"] else 0.3
 
-        return {
-            "project_id": result.get("project_id"),
-            "scope": result.get("scope"),
-            "_parse_confidence": confidence,
-        }
+        project_id = result.get("project_id")
+        logger.info(f"Validation: project_id={project_id}, confidence={confidence:.1%}")
+        validation_passed = project_id is not None and confidence > 0.5
+
+        if validation_passed:
+            logger.info("✅ Validation passed → proceeding to fetch")
+        else:
+            logger.warning("❌ Validation failed → requesting clarification")
+
+        return Command(
+            update={"project_id": project_id, "scope": result.get("scope")},
+            goto="fetch" if validation_passed else "clarify",
+        )
 
     def _parse_with_llm(self, prompt: str) -> dict[str, Any]:
-        """Use LLM for intelligent extraction."""
-        extraction_prompt = f"""Extract project_id and scope from: {prompt}
-Respond only with JSON: {{"project_id": <string or null>, "scope": <string or null>}}"""
+        """Use LLM for intelligent extraction, memoized by prompt."""
         try:
-            response = self.llm.invoke(extraction_prompt)
-            return json.loads(response.content)
+            # Copy, so callers can't alter the cached answer
+            return dict(self._cached_llm_parse(prompt))
         except Exception as e:
             logger.warning(f"LLM parsing failed: {e}. Falling back to regex.")
             return self._parse_with_regex(prompt)
 
+    def _invoke_llm_parse(self, prompt: str) -> dict[str, Any]:
+        """Ask the LLM to extract project_id and scope; raises on failure."""
+        extraction_prompt = f"""Extract project_id and scope from: {prompt}
+Respond only with JSON: {{"project_id": <string or null>, "scope": <string or null>}}"""
+        response = self.llm.invoke(extraction_prompt)
+        return _json_loads(response.content)
+
     def _parse_with_regex(self, prompt: str) -> dict[str, Any]:
         """Regex-based extraction fallback."""
-        project_match = re.search(r'([A-Z]+[-]?\d+|P[-]?\d+)', prompt.upper())
-        project_id = project_match.group(1) if project_match else None
-
-        scope_keywords = [
-            "foundation", "excavation", "electrical", "plumbing", 
-            "roofing", "site clearing", "HVAC"
-        ]
-        scope = next(
-            (kw for kw in scope_keywords if kw.lower() in prompt.lower()),
-            None
-        )
+        project_id, scope = _parse_prompt_with_regex(prompt)
         return {"project_id": project_id, "scope": scope}
 
-    # ==================== VALIDATION NODE ====================
-
-    def _validate_parse_node(self, state: AgentState) -> dict:
-        """Validate parsing results - CONDITIONAL ROUTING POINT.
-        
-        This node determines the next path:
-        - If parse succeeded with high confidence → proceed to fetch
-        - If parse failed or low confidence → fallback or request clarification
-        """
-        project_id = state.get("project_id")
-        confidence = state.get("_parse_confidence", 0.0)
-
-        logger.info(f"Validation: project_id={project_id}, confidence={confidence:.1%}")
-
-        # Determine validation result
-        validation_passed = project_id is not None and confidence > 0.5
-
-        return {
-            "_validation_passed": validation_passed,
-            "_parse_confidence": confidence,
-        }
-
-    def _router_after_validation(self, state: AgentState) -> Literal["fetch", "clarify"]:
-        """Conditional router: decide next node based on validation.
-        
-        This is a key LangGraph feature - routing decisions based on state.
-        """
-        validation_passed = state.get("_validation_passed", False)
-        
-        if validation_passed:
-            logger.info("✅ Validation passed → proceeding to fetch")
-            return "fetch"
-        else:
-            logger.warning("❌ Validation failed → requesting clarification")
-            return "clarify"
+    def clear_parse_cache(self) -> None:
+        """Forget memoized parses and recommendations, e.g. between tests."""
+        self._cached_llm_parse.cache_clear()
+        self._cached_llm_format.cache_clear()
+        _parse_prompt_with_regex.cache_clear()
 
     # ==================== CLARIFICATION NODE ====================
 
@@ -260,16 +421,11 @@ Respond only with JSON: {{"project_id": <string or null>, "scope": <string or nu
         logger.info("Attempting clarification with LLM or defaults...")
 
         # If we have no project_id, try harder to extract it
-        prompt = state.get("prompt", "")
-        if not state.get("project_id"):
+        project_id = state.get("project_id")
+        if not project_id:
             # More aggressive extraction
-            all_numbers = re.findall(r'\b[A-Z]+-\d+\b', prompt)
-            if all_numbers:
-                project_id = all_numbers[0]
-            else:
-                project_id = "UNKNOWN"
-        else:
-            project_id = state.get("project_id")
+            match = LOOSE_PROJECT_ID_PATTERN.search(state.get("prompt", ""))
+            project_id = match.group(0) if match else "UNKNOWN"
 
         # For scope, provide a generic default
         scope = state.get("scope") or "general construction"
@@ -282,78 +438,128 @@ Respond only with JSON: {{"project_id": <string or null>, "scope": <string or nu
             "_validation_passed": True,  # Accept clarified values
         }
 
-    # ==================== FETCH NODE WITH LOOP ====================
+    # ==================== FETCH NODE WITH RETRIES ====================
 
     def _fetch_node(self, state: AgentState) -> dict:
-        """Fetch bids - can loop if results are insufficient.
+        """Fetch bids, retrying within the node if results are insufficient.
         
-        This demonstrates the loop pattern in LangGraph:
-        - Check result quality
-        - If insufficient, mark for retry
-        - Router decides whether to retry or continue
-        """
-        prompt = state.get("prompt", "")
-        project_id = state.get("project_id")
+        Bounded retry without extra graph steps:
+        - Fetch once
+        - If fewer than min_bids came back, run the remaining attempts (up to
+          max_retries in total) concurrently and merge their bids
         
-        fetch_attempts = state.get("_fetch_attempts", 0)
-        logger.info(f"Fetching bids (attempt {fetch_attempts + 1}/{self.max_retries})...")
-
-        bids_result = fetch_subcontractor_bids(
-            prompt,
-            project_id=project_id,
-            api_key=self.api_key
+        Attempts that raise are recorded in fetch_errors, so a run that ends
+        without bids says why. _afetch_node is the async variant used under
+        ainvoke/arun.
+        """
+        results = _tool_executor.execute_tools_parallel(self._fetch_calls(state, range(1, 2)), self._invoke_fetch)
+        bids = self._attempt_bids(results)
+        retries = self._retry_attempts(bids)
+        if retries:
+            retry_results = _tool_executor.execute_tools_parallel(
+                self._fetch_calls(state, retries), self._invoke_fetch
+            )
+            bids = self._merge_bids(bids, retry_results)
+            results.update(retry_results)
+        return self._fetch_update(bids, results)
+
+    async def _afetch_node(self, state: AgentState) -> dict:
+        """Async variant of _fetch_node; attempts run on the executor's pool."""
+        results = await _tool_executor.aexecute_tools_parallel(
+            self._fetch_calls(state, range(1, 2)), self._invoke_fetch
         )
-        bids = bids_result.get("bids", [])
-
-        return {
-            "bids": bids,
-            "_fetch_attempts": fetch_attempts + 1,
-            "_needs_refetch": len(bids) < self.min_bids and fetch_attempts < self.max_retries,
-        }
-
-    def _use_tools_node(self, state: AgentState) -> dict:
-        """Execute tools to gather market data and cost estimates.
+        bids = self._attempt_bids(results)
+        retries = self._retry_attempts(bids)
+        if retries:
+            retry_results = await _tool_executor.aexecute_tools_parallel(
+                self._fetch_calls(state, retries), self._invoke_fetch
+            )
+            bids = self._merge_bids(bids, retry_results)
+            results.update(retry_results)
+        return self._fetch_update(bids, results)
+    
+    @staticmethod
+    def _fetch_update(bids: list, results: dict) -> dict:
+        """State update for the fetch nodes, given every attempt's result."""
+        errors = [
+            f"Attempt {attempt}: {results[attempt].get('error')}"
+            for attempt in sorted(results)
+            if isinstance(results[attempt], dict)
+        ]
+        if errors and not bids:
+            logger.error(f"All {len(results)} fetch attempt(s) failed: {'; '.join(errors)}")
+        return {"bids": bids, "_fetch_attempts": len(results), "fetch_errors": errors}
+
+    @staticmethod
+    def _fetch_calls(state: AgentState, attempts: range) -> list:
+        """One fetch call per attempt number, so results stay keyed by attempt."""
+        tool_input = {"prompt": state.get("prompt", ""), "project_id": state.get("project_id")}
+        return [ToolCall(id=attempt, tool="fetch_subcontractor_bids", tool_input=tool_input) for attempt in attempts]
+
+    def _invoke_fetch(self, tool_name: str, tool_input: dict) -> list:
+        """Run one fetch attempt, returning its bids."""
+        logger.info(f"Fetching bids for {tool_input['project_id']}...")
+        return fetch_subcontractor_bids(**tool_input, api_key=self.api_key).get("bids", [])
+
+    def _retry_attempts(self, bids: list) -> range:
+        """Attempt numbers still to run, empty when the first fetch sufficed."""
+        if len(bids) >= self.min_bids:
+            logger.info(f"Sufficient bids ({len(bids)}) → proceeding")
+            return range(0)
+        logger.warning(f"Insufficient bids ({len(bids)} < {self.min_bids}). Retrying...")
+        return range(2, self.max_retries + 1)
+
+    @staticmethod
+    def _attempt_bids(results: dict) -> list:
+        """Concatenate the bids of each attempt, in attempt order, skipping failures."""
+        bids = []
+        for attempt in sorted(results):
+            if isinstance(results[attempt], list):
+                bids.extend(results[attempt])
+        return bids
+
+    def _merge_bids(self, bids: list, retry_results: dict) -> list:
+        """Append retried bids to the first attempt's."""
+        return (bids + self._attempt_bids(retry_results))[:10]  # Keep top 10
+
+    def _dispatch_tools_router(self, state: AgentState) -> list[Send]:
+        """Fan out the independent tool calls as parallel graph branches.
         
-        This demonstrates LangChain tool usage in LangGraph agents:
-        - Identify which tools are needed
-        - Execute tools using proper LangChain tool.invoke() pattern
-        - Store results in state for later nodes
+        Each Send schedules one tool node in the same superstep, so LangGraph
+        runs them concurrently and the use_tools join waits for both.
         """
+        payload = {"scope": state.get("scope") or "general"}
+        return [
+            Send("market_data", payload),
+            Send("cost_estimate", payload),
+        ]
+
+    def _market_data_node(self, state: dict) -> dict:
+        """Tool branch: fetch market data for the scope."""
         scope = state.get("scope", "general")
-        logger.info(f"Using tools for scope: {scope}")
-        
-        tool_calls = []
-        tool_results = {}
+        tool_call = {"tool": fetch_market_data.name, "params": {"scope": scope}}
+        result = None
         
-        # Tool 1: Fetch market data
         try:
-            # Execute tool using LangChain's standard tool invocation
-            market_data = fetch_market_data.invoke({"scope": scope})
-            tool_calls.append({
-                "tool": fetch_market_data.name,
-                "params": {"scope": scope},
-                "status": "success"
-            })
-            tool_results["market_data"] = market_data
-            logger.info(f"✅ Market data fetched: {market_data['market_suppliers']} suppliers found")
+            # Validate against the tool's schema and call it directly
+            result = TOOL_INVOKERS[fetch_market_data.name]({"scope": scope})
+            tool_call["status"] = "success"
+            logger.info(f"✅ Market data fetched: {result['market_suppliers']} suppliers found")
         except ToolException as e:
             logger.warning(f"Market data tool failed: {str(e)}")
-            tool_calls.append({
-                "tool": fetch_market_data.name,
-                "params": {"scope": scope},
-                "status": "failed",
-                "error": str(e)
-            })
+            tool_call.update(status="failed", error=str(e))
         except Exception as e:
             logger.error(f"Unexpected error in market data tool: {str(e)}")
-            tool_calls.append({
-                "tool": fetch_market_data.name,
-                "params": {"scope": scope},
-                "status": "error",
-                "error": f"Unexpected error: {str(e)}"
-            })
+            tool_call.update(status="error", error=f"Unexpected error: {str(e)}")
+        
+        return {"market_data_outcome": {"call": tool_call, "result": result}}
+
+    def _cost_estimate_node(self, state: dict) -> dict:
+        """Tool branch: estimate project cost for the scope."""
+        scope = state.get("scope", "general")
+        tool_call = {"tool": estimate_project_cost.name, "params": {"scope": scope}}
+        result = None
         
-        # Tool 2: Estimate costs
         try:
             complexity = "medium"
             # Determine complexity based on scope
@@ -362,40 +568,64 @@ Respond only with JSON: {{"project_id": <string or null>, "scope": <string or nu
             elif "excavation" in scope.lower():
                 complexity = "medium"
             
-            # Execute tool using LangChain's standard tool invocation
-            cost_estimate = estimate_project_cost.invoke({
+            # Validate against the tool's schema and call it directly
+            result = TOOL_INVOKERS[estimate_project_cost.name]({
                 "scope": scope,
                 "complexity": complexity
             })
-            tool_calls.append({
-                "tool": estimate_project_cost.name,
-                "params": {"scope": scope, "complexity": complexity},
-                "status": "success"
-            })
-            tool_results["cost_estimate"] = cost_estimate
-            logger.info(f"✅ Cost estimate generated: ${cost_estimate['estimated_total']:,}")
+            tool_call["params"]["complexity"] = complexity
+            tool_call["status"] = "success"
+            logger.info(f"✅ Cost estimate generated: ${result['estimated_total']:,}")
         except ToolException as e:
             logger.warning(f"Cost estimator tool failed: {str(e)}")
-            tool_calls.append({
-                "tool": estimate_project_cost.name,
-                "params": {"scope": scope},
-                "status": "failed",
-                "error": str(e)
-            })
+            tool_call.update(status="failed", error=str(e))
         except Exception as e:
             logger.error(f"Unexpected error in cost estimator tool: {str(e)}")
-            tool_calls.append({
-                "tool": estimate_project_cost.name,
-                "params": {"scope": scope},
-                "status": "error",
-                "error": f"Unexpected error: {str(e)}"
-            })
+            tool_call.update(status="error", error=f"Unexpected error: {str(e)}")
+        
+        return {"cost_estimate_outcome": {"call": tool_call, "result": result}}
+
+    def _use_tools_node(self, state: AgentState) -> dict:
+        """Join node: collect market data and cost estimates into state.
+        
+        This demonstrates LangChain tool usage in LangGraph agents:
+        - Tools run as parallel Send branches (market_data, cost_estimate)
+        - Each branch calls its tool through the precompiled TOOL_INVOKERS path
+        - This node merges the branch outcomes into tool_calls/tool_results
+        
+        Branch outcomes missing from state (e.g. when the node is called
+        outside the graph) are computed inline.
+        """
+        scope = state.get("scope", "general")
+        logger.info(f"Using tools for scope: {scope}")
+        
+        outcomes = {
+            "market_data": (
+                state.get("market_data_outcome")
+                or self._market_data_node(state)["market_data_outcome"]
+            ),
+            "cost_estimate": (
+                state.get("cost_estimate_outcome")
+                or self._cost_estimate_node(state)["cost_estimate_outcome"]
+            ),
+        }
+        
+        tool_calls = []
+        tool_results = {}
+        for result_key, outcome in outcomes.items():
+            tool_calls.append(outcome["call"])
+            if outcome["result"] is not None:
+                tool_results[result_key] = outcome["result"]
         
         return {
             "tool_calls": tool_calls,
             "tool_results": tool_results,
         }
 
+    def _router_after_tools(self, state: AgentState) -> Literal["llm_with_tools", "compare"]:
+        """Conditional router: only run the LLM tool loop if an LLM is bound."""
+        return "llm_with_tools" if self.llm_with_tools else "compare"
+
     def _llm_with_tools_node(self, state: AgentState) -> dict:
         """Execute LLM with tools bound - demonstrates full LLM-initiated tool-calling loop.
         
@@ -408,155 +638,225 @@ Respond only with JSON: {{"project_id": <string or null>, "scope": <string or nu
         4. Loop until LLM returns final response (no more tool_calls)
         
         This enables the LLM to autonomously decide which tools to use and when.
+        _allm_with_tools_node is the async variant used under ainvoke/arun.
         """
         if not self.llm_with_tools:
             logger.info("ℹ️  LLM-with-tools not available, skipping LLM tool orchestration")
             return {"_llm_tool_calls": [], "_llm_tool_results": {}}
         
-        project_id = state.get("project_id", "Unknown")
-        scope = state.get("scope", "general")
-        bids = state.get("bids", [])
-        
-        logger.info(f"🤖 Calling LLM with tools bound for analysis of {len(bids)} bids")
-        
+        messages = self._llm_tool_messages(state)
         llm_tool_calls = []
         llm_tool_results = {}
-        max_iterations = 3  # Prevent infinite loops
+        seen_rounds = set()
         iteration = 0
         
-        # Build context for LLM
-        bid_text = "\n".join([
-            f"- {bid.get('subcontractor')}: ${bid.get('price'):,} (lead: {bid.get('lead_time_days')}d)"
-            for bid in bids[:5]  # Show top 5
-        ]) or "No bids available"
-        
-        system_prompt = """You are a construction project advisor. Analyze bids and use available tools 
-to provide market context and cost validation. Decide which tools are relevant and use them to enrich your analysis."""
-        
-        user_prompt = f"""Analyze these bids for project {project_id} ({scope}):
-{bid_text}
-
-Use tools to:
-1. Get market data for this scope
-2. Estimate expected costs
-
-Then provide a brief analysis."""
-        
-        # Initial message to LLM
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
         # Loop: call LLM, execute tools, repeat until no more tool calls
-        while iteration < max_iterations:
+        while iteration < self.max_tool_iterations:
             iteration += 1
-            logger.debug(f"LLM iteration {iteration}/{max_iterations}")
+            logger.debug(f"LLM iteration {iteration}/{self.max_tool_iterations}")
             
             try:
                 # Call LLM with tools bound
                 response = self.llm_with_tools.invoke(messages)
-                
-                # Parse response for tool_calls
-                # Different providers may format this differently
-                tool_calls = []
-                
-                # Check for tool_calls attribute (LangChain format)
-                if hasattr(response, 'tool_calls') and response.tool_calls:
-                    tool_calls = response.tool_calls
-                    logger.info(f"📋 LLM returned {len(tool_calls)} tool calls")
-                
-                # Check for tool_call in content (some providers)
-                elif hasattr(response, 'content') and isinstance(response.content, list):
-                    for item in response.content:
-                        if isinstance(item, dict) and item.get('type') == 'tool_use':
-                            tool_calls.append({
-                                'tool': item.get('name'),
-                                'tool_input': item.get('input', {}),
-                                'id': item.get('id')
-                            })
+                tool_calls = self._response_tool_calls(response)
                 
                 # If no tool calls, we're done
                 if not tool_calls:
                     logger.info(f"✅ LLM finished (no tool calls). Final response received.")
                     break
                 
+                # A repeated round would get the same results back, so the
+                # LLM is looping; stop before spending more calls on it
+                fingerprint = self._tool_round_fingerprint(tool_calls)
+                if fingerprint in seen_rounds:
+                    logger.warning("⚠️  LLM repeated an earlier round of tool calls. Ending LLM tool loop.")
+                    break
+                seen_rounds.add(fingerprint)
+                
                 # Execute the tool calls
                 logger.info(f"🔧 Executing {len(tool_calls)} tool calls from LLM")
                 new_results = self._execute_llm_tool_calls(tool_calls, llm_tool_results)
-                llm_tool_results.update(new_results)
-                llm_tool_calls.extend(tool_calls)
+                self._record_tool_round(
+                    messages, response, tool_calls, new_results, llm_tool_calls, llm_tool_results
+                )
+                if self._required_tools_called(llm_tool_calls):
+                    logger.info("✅ All required tools called. Ending LLM tool loop.")
+                    break
                 
-                # Add assistant message and tool results to message history
-                assistant_message = {
-                    "role": "assistant",
-                    "content": response.content if hasattr(response, 'content') else str(response)
-                }
-                messages.append(assistant_message)
+            except Exception as e:
+                logger.error(f"Error in LLM tool orchestration iteration {iteration}: {str(e)}")
+                break
+        
+        return self._llm_tool_loop_result(iteration, llm_tool_calls, llm_tool_results)
+
+    async def _allm_with_tools_node(self, state: AgentState) -> dict:
+        """Async variant of _llm_with_tools_node.
+        
+        Awaits the LLM and gathers each round's tool calls on the event loop,
+        so concurrent arun() calls overlap their LLM and tool latency.
+        """
+        if not self.llm_with_tools:
+            logger.info("ℹ️  LLM-with-tools not available, skipping LLM tool orchestration")
+            return {"_llm_tool_calls": [], "_llm_tool_results": {}}
+        
+        messages = self._llm_tool_messages(state)
+        llm_tool_calls = []
+        llm_tool_results = {}
+        seen_rounds = set()
+        iteration = 0
+        
+        while iteration < self.max_tool_iterations:
+            iteration += 1
+            logger.debug(f"LLM iteration {iteration}/{self.max_tool_iterations}")
+            
+            try:
+                response = await self.llm_with_tools.ainvoke(messages)
+                tool_calls = self._response_tool_calls(response)
                 
-                # Add tool results to messages for LLM to see
-                for tool_call in tool_calls:
-                    tool_id = tool_call.get('id', tool_call.get('tool'))
-                    result = new_results.get(tool_id, {})
-                    messages.append({
-                        "role": "tool",
-                        "tool_use_id": tool_id,
-                        "content": json.dumps(result)
-                    })
+                if not tool_calls:
+                    logger.info(f"✅ LLM finished (no tool calls). Final response received.")
+                    break
+                
+                fingerprint = self._tool_round_fingerprint(tool_calls)
+                if fingerprint in seen_rounds:
+                    logger.warning("⚠️  LLM repeated an earlier round of tool calls. Ending LLM tool loop.")
+                    break
+                seen_rounds.add(fingerprint)
                 
-                logger.debug(f"Added {len(tool_calls)} tool results to message history")
+                logger.info(f"🔧 Executing {len(tool_calls)} tool calls from LLM")
+                new_results = await self._aexecute_llm_tool_calls(tool_calls, llm_tool_results)
+                self._record_tool_round(
+                    messages, response, tool_calls, new_results, llm_tool_calls, llm_tool_results
+                )
+                if self._required_tools_called(llm_tool_calls):
+                    logger.info("✅ All required tools called. Ending LLM tool loop.")
+                    break
                 
             except Exception as e:
                 logger.error(f"Error in LLM tool orchestration iteration {iteration}: {str(e)}")
                 break
         
-        if iteration >= max_iterations:
-            logger.warning(f"⚠️  LLM tool loop reached max iterations ({max_iterations})")
+        return self._llm_tool_loop_result(iteration, llm_tool_calls, llm_tool_results)
+
+    def _llm_tool_messages(self, state: AgentState) -> list:
+        """Build the initial system/user messages for the LLM tool loop."""
+        project_id = state.get("project_id", "Unknown")
+        scope = state.get("scope", "general")
+        bids = state.get("bids", [])
         
-        logger.info(f"✅ LLM tool orchestration complete: {len(llm_tool_calls)} tools used")
-        return {
-            "_llm_tool_calls": llm_tool_calls,
-            "_llm_tool_results": llm_tool_results,
-        }
+        logger.info(f"🤖 Calling LLM with tools bound for analysis of {len(bids)} bids")
+        
+        # Build context for LLM
+        bid_text = _bid_text(bids[:5]) or "No bids available"  # Show top 5
+        
+        user_prompt = f"""Analyze these bids for project {project_id} ({scope}):
+{bid_text}
+
+Use tools to:
+1. Get market data for this scope
+2. Estimate expected costs
 
-    def _router_after_fetch(self, state: AgentState) -> Literal["compare", "refetch"]:
-        """Conditional router: decide if we need to retry fetching.
+Then provide a brief analysis."""
         
-        Loop pattern: if not enough bids, fetch again with different parameters.
+        return [
+            {"role": "system", "content": LLM_TOOLS_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    @staticmethod
+    def _response_tool_calls(response) -> list:
+        """Extract tool calls from an LLM response.
+        
+        Different providers may format this differently.
         """
-        needs_refetch = state.get("_needs_refetch", False)
+        tool_calls = []
         
-        if needs_refetch:
-            logger.warning(f"Insufficient bids ({len(state.get('bids', []))} < {self.min_bids}). Retrying...")
-            return "refetch"
-        else:
-            logger.info(f"Sufficient bids ({len(state.get('bids', []))}) → proceeding to compare")
-            return "compare"
-
-    def _refetch_node(self, state: AgentState) -> dict:
-        """Retry fetching with expanded parameters."""
-        logger.info("Refetching with expanded scope...")
+        # Check for tool_calls attribute (LangChain format)
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            tool_calls = response.tool_calls
+            logger.info(f"📋 LLM returned {len(tool_calls)} tool calls")
         
-        # In a real system, would expand search criteria
-        prompt = state.get("prompt", "")
-        project_id = state.get("project_id")
+        # Check for tool_call in content (some providers)
+        elif hasattr(response, 'content') and isinstance(response.content, list):
+            for item in response.content:
+                if isinstance(item, dict) and item.get('type') == 'tool_use':
+                    tool_calls.append({
+                        'tool': item.get('name'),
+                        'tool_input': item.get('input', {}),
+                        'id': item.get('id')
+                    })
         
-        # Try again (in production, would modify parameters)
-        bids_result = fetch_subcontractor_bids(
-            prompt,
-            project_id=project_id,
-            api_key=self.api_key
+        return tool_calls
+
+    @classmethod
+    def _tool_round_fingerprint(cls, tool_calls: list) -> frozenset:
+        """Identify a round by its (tool, arguments) pairs, ignoring call ids and order."""
+        return frozenset(
+            (call.tool, _json_dumps_sorted(call.tool_input))
+            for call in cls._to_tool_call_batch(tool_calls)
         )
-        bids = bids_result.get("bids", [])
-        existing_bids = state.get("bids", [])
+
+    @classmethod
+    def _record_tool_round(
+        cls,
+        messages: list,
+        response,
+        tool_calls: list,
+        new_results: dict,
+        llm_tool_calls: list,
+        llm_tool_results: dict,
+    ) -> None:
+        """Accumulate one round's calls/results and extend the message history.
+        
+        The history keeps the system and user prompts plus only the latest
+        round; earlier results are already in llm_tool_results, and dropping
+        them keeps each LLM call's prefill from growing with the iteration.
+        """
+        llm_tool_results.update(new_results)
+        llm_tool_calls.extend(tool_calls)
         
-        # Merge with existing bids
-        all_bids = existing_bids + bids
+        # Add assistant message and tool results to message history
+        assistant_message = {
+            "role": "assistant",
+            "content": response.content if hasattr(response, 'content') else str(response)
+        }
+        messages.append(assistant_message)
         
+        # Add tool results to messages for LLM to see
+        for call in cls._to_tool_call_batch(tool_calls):
+            messages.append({
+                "role": "tool",
+                "tool_use_id": call.id,
+                "content": _json_dumps(new_results.get(call.id, {}))
+            })
+        
+        # Sliding window: system, user, then this round's assistant + tool messages
+        del messages[2:-(1 + len(tool_calls))]
+        logger.debug(f"Added {len(tool_calls)} tool results to message history")
+
+    @classmethod
+    def _required_tools_called(cls, llm_tool_calls: list) -> bool:
+        """Return True once every tool in _REQUIRED_TOOLS has been called.
+        
+        Tools called through the batch tool count as called.
+        """
+        called = set()
+        for call in cls._to_tool_call_batch(llm_tool_calls):
+            if call.tool == batch.name:
+                called.update(entry.get("tool_name") for entry in call.tool_input.get("invocations") or ())
+            else:
+                called.add(call.tool)
+        return _REQUIRED_TOOLS <= called
+
+    def _llm_tool_loop_result(self, iteration: int, llm_tool_calls: list, llm_tool_results: dict) -> dict:
+        """Log the loop outcome and build the node's state update."""
+        if iteration >= self.max_tool_iterations:
+            logger.warning(f"⚠️  LLM tool loop reached max iterations ({self.max_tool_iterations})")
+        
+        logger.info(f"✅ LLM tool orchestration complete: {len(llm_tool_calls)} tools used")
         return {
-            "bids": all_bids[:10],  # Keep top 10
-            "_fetch_attempts": state.get("_fetch_attempts", 0) + 1,
-            "_needs_refetch": len(all_bids) < self.min_bids and state.get("_fetch_attempts", 0) < self.max_retries,
+            "_llm_tool_calls": llm_tool_calls,
+            "_llm_tool_results": llm_tool_results,
         }
 
     # ==================== ANALYSIS NODES ====================
@@ -589,10 +889,7 @@ Then provide a brief analysis."""
         scope = state.get("scope", "construction")
         tool_results = state.get("tool_results", {})
 
-        bid_text = "\n".join([
-            f"- {bid.get('subcontractor')}: ${bid.get('price'):,} (lead: {bid.get('lead_time_days')}d)"
-            for bid in top
-        ])
+        bid_text = _bid_text(top)
         
         # Include tool insights in recommendation
         tool_insights = ""
@@ -613,18 +910,22 @@ Then provide a brief analysis."""
         return {"recommendation": recommendation}
 
     def _format_with_llm(self, bid_text: str, project_id: str, scope: str, insights: str = "") -> str:
-        """Format using LLM."""
-        prompt = f"""Create a brief professional recommendation for: {project_id} ({scope})
-Top Bids:
-{bid_text}{insights}
-Recommendation (2-3 sentences):"""
+        """Format using LLM, memoized since retries repeat identical arguments."""
         try:
-            response = self.llm.invoke(prompt)
-            return response.content
+            return self._cached_llm_format(bid_text, project_id, scope, insights)
         except Exception as e:
             logger.warning(f"LLM format failed: {e}")
             return ""
 
+    def _invoke_llm_format(self, bid_text: str, project_id: str, scope: str, insights: str) -> str:
+        """Ask the LLM for a recommendation; raises on failure."""
+        prompt = f"""Create a brief professional recommendation for: {project_id} ({scope})
+Top Bids:
+{bid_text}{insights}
+Recommendation (2-3 sentences):"""
+        response = self.llm.invoke(prompt)
+        return response.content
+
     def _format_default(self, top_bids: list, insights: str = "") -> str:
         """Simple formatting fallback."""
         lines = [f"Recommended {len(top_bids)} contractors:"]
@@ -637,71 +938,106 @@ Recommendation (2-3 sentences):"""
 
     # ==================== GRAPH BUILDING ====================
 
-    def build_graph(self):
-        """Build the enhanced graph with conditionals, loops, and tool usage."""
+    @classmethod
+    def _build_graph(cls) -> StateGraph:
+        """The enhanced graph, with conditionals, loops, tools and LLM orchestration."""
+        graph = StateGraph(AgentState)
+
         # Add nodes
-        self.graph.add_node("parse", self._parse_node)
-        self.graph.add_node("validate_parse", self._validate_parse_node)
-        self.graph.add_node("clarify", self._clarify_node)
-        self.graph.add_node("fetch", self._fetch_node)
-        self.graph.add_node("use_tools", self._use_tools_node)
-        self.graph.add_node("llm_with_tools", self._llm_with_tools_node)
-        self.graph.add_node("refetch", self._refetch_node)
-        self.graph.add_node("compare", self._compare_node)
-        self.graph.add_node("validate_comparison", self._validate_comparison_node)
-        self.graph.add_node("format", self._format_node)
+        # parse routes itself via Command; destinations only document the edges
+        graph.add_node("parse", agent_node("_parse_node"), destinations=("fetch", "clarify"))
+        graph.add_node("clarify", agent_node("_clarify_node"))
+        graph.add_node("fetch", agent_node("_fetch_node", "_afetch_node"))
+        graph.add_node("market_data", agent_node("_market_data_node"))
+        graph.add_node("cost_estimate", agent_node("_cost_estimate_node"))
+        graph.add_node("use_tools", agent_node("_use_tools_node"))
+        # Sync and async implementations: invoke() runs the former, ainvoke()
+        # (and so arun) the latter
+        graph.add_node(
+            "llm_with_tools",
+            agent_node("_llm_with_tools_node", "_allm_with_tools_node"),
+        )
+        graph.add_node("compare", agent_node("_compare_node"))
+        graph.add_node("validate_comparison", agent_node("_validate_comparison_node"))
+        graph.add_node("format", agent_node("_format_node"))
 
         # Build edges with conditional routing
-        self.graph.add_edge(START, "parse")
-        self.graph.add_edge("parse", "validate_parse")
+        graph.add_edge(START, "parse")
+        graph.add_edge("clarify", "fetch")
         
-        # Conditional router: validate_parse → clarify or fetch
-        self.graph.add_conditional_edges(
-            "validate_parse",
-            self._router_after_validation,
-            {
-                "fetch": "fetch",
-                "clarify": "clarify",
-            }
+        # Tool fanout: fetch → (market_data ∥ cost_estimate) → use_tools join
+        graph.add_conditional_edges(
+            "fetch",
+            agent_node("_dispatch_tools_router"),
+            ["market_data", "cost_estimate"],
         )
-        self.graph.add_edge("clarify", "fetch")
+        graph.add_edge(["market_data", "cost_estimate"], "use_tools")
         
-        # Tool usage nodes: use_tools → llm_with_tools → compare (or refetch if needed)
-        self.graph.add_edge("fetch", "use_tools")
-        self.graph.add_edge("use_tools", "llm_with_tools")
-        
-        # Conditional router: llm_with_tools → refetch or compare (loop)
-        self.graph.add_conditional_edges(
-            "llm_with_tools",
-            self._router_after_fetch,
+        # Tool usage nodes: use_tools → llm_with_tools → compare, skipping
+        # llm_with_tools when the agent has no tool-calling LLM
+        graph.add_conditional_edges(
+            "use_tools",
+            agent_node("_router_after_tools"),
             {
+                "llm_with_tools": "llm_with_tools",
                 "compare": "compare",
-                "refetch": "refetch",
             }
         )
-        self.graph.add_edge("refetch", "compare")
+        graph.add_edge("llm_with_tools", "compare")
         
         # Continue with validation and formatting
-        self.graph.add_edge("compare", "validate_comparison")
-        self.graph.add_edge("validate_comparison", "format")
-        self.graph.add_edge("format", END)
-
-        self.compiled_graph = self.graph.compile()
-        logger.info("✅ Enhanced graph compiled with conditionals, loops, tools, and LLM orchestration")
+        graph.add_edge("compare", "validate_comparison")
+        graph.add_edge("validate_comparison", "format")
+        graph.add_edge("format", END)
+        return graph
 
     # ==================== EXECUTION ====================
 
-    def run(self, prompt: str, verbose: bool = False) -> AgentState:
-        """Execute the enhanced agent."""
-        if self.compiled_graph is None:
-            self.build_graph()
-
+    def stream(self, prompt: str, verbose: bool = False) -> Iterator[str]:
+        """Execute the enhanced agent, yielding the recommendation as it is generated.
+        
+        The format node's LLM tokens are yielded as they arrive, so the first
+        text shows up after prefill instead of after the whole decode. A
+        recommendation that was not streamed (regex mode, memoized LLM answer)
+        is yielded in one piece. Joined, the chunks are run()'s recommendation.
+        """
+        initial_state = self._prepare_run(prompt, verbose)
+        streamed = False
+        for mode, payload in self.compiled_graph.stream(initial_state, stream_mode=["messages", "updates"]):
+            text = self._recommendation_text(mode, payload, streamed)
+            if text:
+                streamed = streamed or mode == "messages"
+                yield text
+
+    async def astream(self, prompt: str, verbose: bool = False) -> AsyncIterator[str]:
+        """Async variant of stream() via the graph's astream."""
+        initial_state = self._prepare_run(prompt, verbose)
+        streamed = False
+        async for mode, payload in self.compiled_graph.astream(initial_state, stream_mode=["messages", "updates"]):
+            text = self._recommendation_text(mode, payload, streamed)
+            if text:
+                streamed = streamed or mode == "messages"
+                yield text
+
+    @staticmethod
+    def _recommendation_text(mode: str, payload: Any, streamed: bool) -> str:
+        """Pick recommendation text out of one (messages | updates) stream event."""
+        if mode == "messages":
+            chunk, metadata = payload
+            return chunk.text if metadata.get("langgraph_node") == "format" else ""
+        format_update = payload.get("format")
+        if format_update and not streamed:
+            return format_update.get("recommendation") or ""
+        return ""
+
+    def _initial_state(self, prompt: str, verbose: bool) -> AgentState:
+        """Configure logging and build the initial state of a run."""
         if verbose:
             logger.setLevel(logging.DEBUG)
 
         logger.info(f"Starting enhanced agent: {prompt[:50]}...")
 
-        initial_state: AgentState = {
+        return {
             "prompt": prompt,
             "project_id": None,
             "scope": None,
@@ -712,8 +1048,8 @@ Recommendation (2-3 sentences):"""
             "tool_results": None,
         }
 
-        final_state = self.compiled_graph.invoke(initial_state)
-
+    def _finish_run(self, final_state: dict, prompt: str) -> AgentState:
+        """Project the final graph state onto the agent's output fields."""
         return {
             "prompt": final_state.get("prompt", prompt),
             "project_id": final_state.get("project_id"),
@@ -723,6 +1059,7 @@ Recommendation (2-3 sentences):"""
             "recommendation": final_state.get("recommendation"),
             "tool_calls": final_state.get("tool_calls"),
             "tool_results": final_state.get("tool_results"),
+            "fetch_errors": final_state.get("fetch_errors", []),
             "llm_tool_calls": final_state.get("_llm_tool_calls"),
             "llm_tool_results": final_state.get("_llm_tool_results"),
         }
@@ -0,0 +1,137 @@
+"""Graph nodes that dispatch to the agent a shared compiled graph runs for.
+
+Agents compile their graph once per class rather than once per instance.
+Nodes of such a shared graph can't be bound methods; each agent's
+compiled graph instead carries the agent in its config, under
+``configurable["agent"]``, and the nodes built here call its methods.
+SharedGraphAgent holds the run methods such agents have in common.
+"""
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Default bound on runs in flight in run_many()
+MAX_CONCURRENCY = 10
+
+
+def agent_node(method: str, amethod: str | None = None):
+    """Graph node (or router) running a method of the agent the graph runs for.
+    
+    With amethod, ainvoke() awaits that coroutine method instead. LangGraph
+    passes the RunnableConfig to any node parameter named ``config``; it is
+    left unannotated because langchain_core is only imported when needed.
+    """
+    def node(state: dict, config):
+        return getattr(config["configurable"]["agent"], method)(state)
+
+    if amethod is None:
+        return node
+
+    # Slow to import, so deferred until a graph is actually built
+    from langchain_core.runnables import RunnableLambda
+
+    async def anode(state: dict, config):
+        return await getattr(config["configurable"]["agent"], amethod)(state)
+
+    return RunnableLambda(node, afunc=anode)
+
+
+class SharedGraphAgent:
+    """Base for agents running one compiled graph shared by their class.
+    
+    Subclasses define _build_graph(), a classmethod returning the uncompiled
+    StateGraph, plus _initial_state() and _finish_run(), which build a run's
+    initial state and project the final one onto its result. They set graph
+    and compiled_graph to None in __init__.
+    """
+    
+    # Lets subclasses that declare __slots__ keep instances __dict__-free
+    __slots__ = ()
+    
+    def build_graph(self):
+        """Attach the class's compiled graph, building it on first use."""
+        if self.compiled_graph is not None:
+            return
+        
+        self.graph, compiled_graph = type(self)._shared_graph()
+        # Nodes find the agent they run for in the config, see agent_node
+        self.compiled_graph = compiled_graph.with_config(configurable={"agent": self})
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _shared_graph(cls) -> "tuple[Any, Any]":
+        """Build and compile the graph once per agent class.
+        
+        The topology doesn't depend on the instance, so every agent shares one
+        compiled graph instead of re-validating and recompiling it.
+        """
+        graph = cls._build_graph()
+        compiled = graph.compile()
+        logger.info(f"✅ {cls.__name__} graph compiled")
+        return graph, compiled
+    
+    def _prepare_run(self, prompt: str, verbose: bool) -> dict:
+        """Compile the graph if needed and build the initial state."""
+        if self.compiled_graph is None:
+            self.build_graph()
+        return self._initial_state(prompt, verbose)
+    
+    def run(self, prompt: str, verbose: bool = False) -> dict:
+        """Execute the agent: invoke the compiled graph with initial state.
+        
+        Args:
+            prompt: The user's procurement request
+            verbose: If True, print detailed execution logs
+            
+        Returns:
+            Final agent state with all processing results
+        """
+        initial_state = self._prepare_run(prompt, verbose)
+        final_state = self.compiled_graph.invoke(initial_state)
+        return self._finish_run(final_state, prompt)
+    
+    async def arun(self, prompt: str, verbose: bool = False) -> dict:
+        """Async variant of run() using the compiled graph's ainvoke.
+        
+        Lets callers execute several requests concurrently, e.g. with
+        asyncio.gather(*(agent.arun(p) for p in prompts)).
+        """
+        initial_state = self._prepare_run(prompt, verbose)
+        final_state = await self.compiled_graph.ainvoke(initial_state)
+        return self._finish_run(final_state, prompt)
+    
+    def run_many(self, prompts: list[str], max_concurrency: int = MAX_CONCURRENCY) -> list[dict]:
+        """Run several independent prompts together; see arun_many()."""
+        return asyncio.run(self.arun_many(prompts, max_concurrency))
+    
+    async def arun_many(
+        self, prompts: list[str], max_concurrency: int = MAX_CONCURRENCY
+    ) -> list[dict]:
+        """Push independent prompts through the graph's native abatch.
+        
+        Within one request the LLM calls depend on each other and stay
+        sequential; across requests they overlap.
+        
+        Args:
+            prompts: The user's procurement requests
+            max_concurrency: Most runs in flight at once, to stay within the
+                LLM provider's rate limits
+                
+        Returns:
+            Final agent states, in the order of prompts
+        """
+        # Longest prompts first: abatch starts runs in input order as slots
+        # free up, and a slow long prompt started last would finish well
+        # after all the others
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]), reverse=True)
+        initial_states = [self._prepare_run(prompts[i], verbose=False) for i in order]
+        final_states = await self.compiled_graph.abatch(
+            initial_states, config={"max_concurrency": max_concurrency}
+        )
+        results = [None] * len(prompts)
+        for i, state in zip(order, final_states):
+            results[i] = self._finish_run(state, prompts[i])
+        return results
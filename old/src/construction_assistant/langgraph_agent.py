@@ -8,35 +8,134 @@ Uses the real `langgraph` library from LangChain and Google Gemini for LLM tasks
 import json
 import logging
 import os
-import re
-from typing import Any
+import string
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 from dotenv import load_dotenv
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Handler verbose runs attach to the module logger
+_verbose_handler = logging.StreamHandler()
+_verbose_handler.setLevel(logging.DEBUG)
+_verbose_handler.setFormatter(logging.Formatter('%(name)s - %(levelname)s - %(message)s'))
+
 # Load environment variables from .env file
 load_dotenv()
 
-try:
-    from langgraph.graph import StateGraph, START, END
-except ImportError:
-    raise ImportError(
-        "langgraph is required. Install it with: pip install langgraph"
-    )
+# langgraph and the LangChain packages take most of a second to import, so
+# they are imported on first use: regex-only callers never pay for Gemini,
+# and nobody pays for langgraph until a graph is built
+if TYPE_CHECKING:
+    from langchain_core.caches import BaseCache
+    from langgraph.graph import StateGraph
 
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-except ImportError:
-    raise ImportError(
-        "langchain-google-genai is required. Install it with: pip install langchain-google-genai"
-    )
+# Imported by _chat_model_class(); a module attribute so tests can patch it
+ChatGoogleGenerativeAI = None
 
 from .agent import fetch_subcontractor_bids, compare_bids
+from .graph_nodes import SharedGraphAgent, agent_node
+from .patterns import find_project_id, find_project_ids, find_scope
 from .schema import AgentState
+from .semantic_cache import SemanticCache, default_embedder
+
+# LLM replies are decoded with orjson when it is installed; its
+# JSONDecodeError subclasses json's, so one except clause covers both
+try:
+    import orjson
 
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-class LangGraphAgent:
+# Directory LLM responses are persisted in when langchain-community is
+# installed; None keeps them in memory for the life of the process
+LLM_CACHE_DIR = os.getenv("COSUNO_LLM_CACHE_DIR") or None
+LLM_CACHE_FILENAME = "llm_cache.db"
+
+
+def _chat_model_class():
+    """The Gemini chat model class, imported on first use."""
+    global ChatGoogleGenerativeAI
+    if ChatGoogleGenerativeAI is None:
+        try:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+        except ImportError:
+            raise ImportError(
+                "langchain-google-genai is required. Install it with: pip install langchain-google-genai"
+            )
+    return ChatGoogleGenerativeAI
+
+
+@lru_cache(maxsize=None)
+def _llm_response_cache() -> "BaseCache":
+    """Response cache shared by all agents' LLMs, created on first use.
+    
+    Identical prompts to the same model configuration are answered from the
+    cache instead of another Gemini round-trip. Kept in memory unless
+    ``LLM_CACHE_DIR`` is set and the optional ``langchain-community`` package
+    is installed, in which case it persists to SQLite in that directory.
+    Persisted responses don't expire; delete the file to reset them.
+    """
+    from langchain_core.caches import InMemoryCache
+
+    if LLM_CACHE_DIR:
+        try:
+            from langchain_community.cache import SQLiteCache
+        except ImportError:
+            logger.warning("langchain-community is not installed; keeping LLM responses in memory")
+        else:
+            try:
+                os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+                return SQLiteCache(database_path=os.path.join(LLM_CACHE_DIR, LLM_CACHE_FILENAME))
+            except Exception as e:
+                logger.warning(f"Failed to open LLM cache in {LLM_CACHE_DIR}: {str(e)}. Using memory-only cache.")
+    return InMemoryCache(maxsize=1024)
+
+
+@lru_cache(maxsize=None)
+def _semantic_parse_cache() -> SemanticCache | None:
+    """Parse results shared by all agents, looked up by prompt similarity.
+    
+    None when no local embedding model is available.
+    """
+    embed = default_embedder()
+    return SemanticCache(embed) if embed is not None else None
+
+
+# Kept byte-identical across calls, with the user request in its own turn,
+# so providers can reuse the cached prefill of this prefix
+PARSE_SYSTEM_PROMPT = """You are a construction project manager assistant. From the user request:
+1. project_id: Extract the project identifier (e.g., P-123, Project-456, or null if not found)
+2. scope: Extract the scope of work (e.g., "foundation works", "excavation", etc.)
+3. recommendation_template: Write a brief, professional 2-3 sentence recommendation to choose
+   the best subcontractor bid for this project and scope, focusing on cost-effectiveness and
+   timeline. The bids aren't known yet: refer to the chosen bid only through the placeholders
+   {subcontractor}, {price} and {lead_time_days}, and use no other braces.
+
+Respond ONLY with valid JSON:
+{"project_id": <string or null>, "scope": <string or null>, "recommendation_template": <string>}"""
+
+# The only placeholders a recommendation template may use; anything else,
+# including attribute or index lookups on them, falls back to the default
+_TEMPLATE_FIELDS = frozenset({"subcontractor", "price", "lead_time_days"})
+
+# Copied for every run's initial state. Nodes subscript the state directly,
+# so every key they read must be set here. The empty bids and comparison are
+# shared between runs: nodes replace state values and never mutate them.
+_INITIAL_STATE: AgentState = {
+    "prompt": "",
+    "project_id": None,
+    "scope": None,
+    "bids": [],
+    "comparison": {},
+    "recommendation": "",
+    "recommendation_template": None,
+}
+
+
+class LangGraphAgent(SharedGraphAgent):
     """Constructs a StateGraph-based agent for Cosuno procurement flows.
 
     This agent demonstrates the key LangGraph pattern:
@@ -48,12 +147,16 @@ class LangGraphAgent:
     Uses Google Gemini LLM for intelligent parsing and formatting.
     """
 
+    # No per-instance __dict__: servers may create an agent per request
+    __slots__ = ("api_key", "top_n", "graph", "compiled_graph", "use_llm", "llm", "parse_cache", "regex_first")
+
     def __init__(
         self,
         api_key: str | None = None,
         top_n: int = 1,
         gemini_api_key: str | None = None,
         use_llm: bool = True,
+        regex_first: bool = False,
     ):
         """Initialize the LangGraph agent.
         
@@ -62,24 +165,37 @@ class LangGraphAgent:
             top_n: Number of top bids to return
             gemini_api_key: Optional Gemini API key (falls back to GOOGLE_API_KEY env var)
             use_llm: If False, use regex-based parsing instead of LLM (useful for demos/testing)
+            regex_first: If True, prompts the regex parses conclusively skip the
+                LLM call. That saves a round-trip for most prompts, but the
+                LLM call also writes the recommendation, so those prompts get
+                the default recommendation format instead.
         """
         self.api_key = api_key
         self.top_n = top_n
-        self.graph = StateGraph(AgentState)
+        self.graph = None
         self.compiled_graph = None
         self.use_llm = use_llm
+        self.regex_first = regex_first
         self.llm = None
+        self.parse_cache = None
         
         # Try to initialize Gemini LLM if requested
         if use_llm:
             api_key_to_use = gemini_api_key or os.getenv("GOOGLE_API_KEY")
             if api_key_to_use:
                 try:
-                    self.llm = ChatGoogleGenerativeAI(
+                    self.llm = _chat_model_class()(
                         model="gemini-3-pro-preview",
                         google_api_key=api_key_to_use,
-                        temperature=0.3
+                        temperature=0.3,
+                        # The only call made is the combined parse + template
+                        # prompt, whose answer is always JSON
+                        response_mime_type="application/json",
+                        # Per-model rather than set_llm_cache(), which would
+                        # also cache every other LLM in the process
+                        cache=_llm_response_cache(),
                     )
+                    self.parse_cache = _semantic_parse_cache()
                     logger.info("✅ Gemini LLM initialized successfully")
                 except Exception as e:
                     logger.warning(f"Failed to initialize Gemini LLM: {e}. Falling back to regex parsing.")
@@ -89,46 +205,74 @@ class LangGraphAgent:
                 self.use_llm = False
 
     def _parse_with_llm(self, prompt: str) -> dict[str, Any]:
-        """Use LLM to intelligently extract project_id and scope."""
-        extraction_prompt = f"""Extract the following information from the user request:
-1. project_id: A project identifier (e.g., P-123, Project-456, or null if not found)
-2. scope: The scope of work (e.g., "foundation works", "excavation", etc.)
-
-User request: {prompt}
-
-Respond ONLY with valid JSON (no markdown, no extra text):
-{{"project_id": <string or null>, "scope": <string or null>}}"""
+        """Use LLM to extract project_id and scope and draft the recommendation.
+        
+        One call returns both the extraction and a recommendation template
+        that the format node fills in with the top bid once bids are
+        compared, so a run costs a single LLM round-trip.
+        """
+        cache_key, cached = self._lookup_parse(prompt)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(self._extraction_prompt(prompt))
+        return self._read_parse(prompt, response, cache_key)
+
+    async def _aparse_with_llm(self, prompt: str) -> dict[str, Any]:
+        """Async variant of _parse_with_llm() using the LLM's ainvoke."""
+        cache_key, cached = self._lookup_parse(prompt)
+        if cached is not None:
+            return cached
+        response = await self.llm.ainvoke(self._extraction_prompt(prompt))
+        return self._read_parse(prompt, response, cache_key)
+
+    def _lookup_parse(self, prompt: str) -> tuple[tuple | None, dict[str, Any] | None]:
+        """Look prompt up in the semantic cache.
+        
+        Results are reused for reworded prompts. Only prompts naming the same
+        project ids and scope keyword can share a result, since embeddings
+        barely tell P-123 from P-124.
+        
+        Returns:
+            The key to store the LLM's answer under on a miss (None when the
+            cache is off), and the cached parse or None
+        """
+        if self.parse_cache is None:
+            return None, None
+        bucket = (tuple(find_project_ids(prompt)), find_scope(prompt))
+        vector, cached = self.parse_cache.lookup(prompt, bucket)
+        if cached is not None:
+            logger.debug(f"Semantic cache hit: {cached}")
+            return None, dict(cached)
+        return (vector, bucket), None
+
+    @staticmethod
+    def _extraction_prompt(prompt: str) -> list[dict[str, str]]:
+        """Messages for the combined extraction and recommendation call."""
+        return [
+            {"role": "system", "content": PARSE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"User request: {prompt}"},
+        ]
 
+    def _read_parse(self, prompt: str, response: Any, cache_key: tuple | None) -> dict[str, Any]:
+        """Decode the LLM's JSON answer, caching it, or fall back to regex."""
         try:
-            response = self.llm.invoke(extraction_prompt)
-            parsed = json.loads(response.content)
-            logger.debug(f"LLM parsed: {parsed}")
-            return parsed
+            parsed = _json_loads(response.content)
         except (json.JSONDecodeError, AttributeError) as e:
             logger.warning(f"LLM parsing failed: {e}. Falling back to regex.")
             return self._parse_with_regex(prompt)
+        logger.debug(f"LLM parsed: {parsed}")
+        if cache_key is not None:
+            vector, bucket = cache_key
+            self.parse_cache.add(vector, dict(parsed), bucket)
+        return parsed
 
     def _parse_with_regex(self, prompt: str) -> dict[str, Any]:
         """Fallback regex-based extraction for project_id and scope."""
         # Extract project_id (patterns like P-123, PROJECT-456, ABC-789)
-        project_match = re.search(r'([A-Z]+[-]?\d+|P[-]?\d+)', prompt.upper())
-        project_id = project_match.group(1) if project_match else None
+        project_id = find_project_id(prompt)
         
         # Extract scope (common construction terms)
-        scope_keywords = [
-            "foundation",
-            "excavation",
-            "electrical",
-            "plumbing",
-            "roofing",
-            "site clearing",
-            "HVAC",
-        ]
-        scope = None
-        for keyword in scope_keywords:
-            if keyword.lower() in prompt.lower():
-                scope = keyword
-                break
+        scope = find_scope(prompt)
         
         logger.debug(f"Regex parsed: project_id={project_id}, scope={scope}")
         return {"project_id": project_id, "scope": scope}
@@ -136,56 +280,95 @@ Respond ONLY with valid JSON (no markdown, no extra text):
     def _parse_node(self, state: AgentState) -> AgentState:
         """Parse node: extract project_id and scope from prompt.
         
-        Uses LLM if available, otherwise falls back to regex extraction.
+        Uses the LLM when available, else regex. With regex_first, the regex
+        runs first and the LLM is only asked when it isn't conclusive.
         """
-        prompt = state.get("prompt", "")
-        
-        if self.use_llm and self.llm:
+        prompt = state["prompt"]
+        parsed = self._parse_without_llm(prompt)
+        if parsed is None:
             parsed = self._parse_with_llm(prompt)
-        else:
+        
+        return self._parse_update(parsed)
+
+    async def _aparse_node(self, state: AgentState) -> AgentState:
+        """Async parse node, so concurrent runs overlap their LLM calls."""
+        prompt = state["prompt"]
+        parsed = self._parse_without_llm(prompt)
+        if parsed is None:
+            parsed = await self._aparse_with_llm(prompt)
+        
+        return self._parse_update(parsed)
+    
+    def _parse_without_llm(self, prompt: str) -> dict[str, Any] | None:
+        """The regex parse of prompt, or None when the LLM should be asked."""
+        if not (self.use_llm and self.llm):
+            return self._parse_with_regex(prompt)
+        if self.regex_first:
             parsed = self._parse_with_regex(prompt)
+            if self._is_conclusive(prompt, parsed):
+                return parsed
+        return None
+
+    @staticmethod
+    def _is_conclusive(prompt: str, parsed: dict[str, Any]) -> bool:
+        """Whether a regex parse can stand without asking the LLM.
         
+        Needs a scope keyword and exactly one distinct project id; a prompt
+        naming several ids is left to the LLM to disambiguate.
+        """
+        if parsed["scope"] is None or parsed["project_id"] is None:
+            return False
+        return len(set(find_project_ids(prompt))) == 1
+
+    @staticmethod
+    def _parse_update(parsed: dict[str, Any]) -> AgentState:
+        """State update for the fields extracted by either parser."""
         return {
             "project_id": parsed.get("project_id"),
-            "scope": parsed.get("scope")
+            "scope": parsed.get("scope"),
+            "recommendation_template": parsed.get("recommendation_template"),
         }
 
     def _fetch_node(self, state: AgentState) -> AgentState:
         """Tool node: call fetch_subcontractor_bids with project context."""
-        prompt = state.get("prompt", "")
-        project_id = state.get("project_id")
+        prompt = state["prompt"]
+        project_id = state["project_id"]
         bids_result = fetch_subcontractor_bids(prompt, project_id=project_id, api_key=self.api_key)
         return {"bids": bids_result.get("bids", [])}
 
     def _compare_node(self, state: AgentState) -> AgentState:
         """Analysis node: compare bids and select top candidates."""
-        bids = state.get("bids", [])
+        bids = state["bids"]
         compare_result = compare_bids(bids, top_n=self.top_n)
         return {"comparison": compare_result}
 
-    def _format_with_llm(self, bid_text: str, project_id: str, scope: str) -> str:
-        """Use LLM to format a professional recommendation."""
-        format_prompt = f"""You are a construction project manager assistant. Create a brief, professional recommendation 
-for selecting subcontractors based on the provided bids.
-
-Project: {project_id}
-Scope: {scope}
-
-Top Bids:
-{bid_text}
-
-Write a concise 2-3 sentence recommendation. Be specific about which contractor to choose and why.
-Focus on cost-effectiveness and timeline."""
-
+    def _fill_template(self, template: Any, top_bids: list) -> str | None:
+        """Fill the LLM's recommendation template with the top bid.
+        
+        Returns None, so the default format is used, when the template isn't
+        a string, uses placeholders other than _TEMPLATE_FIELDS, or fails to
+        format for any other reason.
+        """
+        if not top_bids:
+            return None
+        if not isinstance(template, str):
+            logger.warning(f"Recommendation template is a {type(template).__name__}, not a string. Using default format.")
+            return None
+        bid = top_bids[0]
         try:
-            response = self.llm.invoke(format_prompt)
-            logger.debug("LLM-formatted recommendation")
-            return response.content
-        except Exception as e:
-            logger.warning(f"LLM formatting failed: {e}. Using default format.")
+            for _, field_name, _, _ in string.Formatter().parse(template):
+                if field_name is not None and field_name not in _TEMPLATE_FIELDS:
+                    raise KeyError(field_name)
+            return template.format(
+                subcontractor=bid.get("subcontractor", "Unknown"),
+                price=f"${bid.get('price', 0):,}",
+                lead_time_days=bid.get("lead_time_days", "?"),
+            )
+        except (KeyError, IndexError, ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"Unusable recommendation template: {e!r}. Using default format.")
             return None
 
-    def _format_with_default(self, top_bids: list, bid_text: str) -> str:
+    def _format_with_default(self, top_bids: list) -> str:
         """Default formatting for recommendation."""
         lines = [f"Recommendation (top {len(top_bids)}):"]
         for bid in top_bids:
@@ -198,81 +381,62 @@ Focus on cost-effectiveness and timeline."""
     def _format_node(self, state: AgentState) -> AgentState:
         """Output node: format a professional recommendation.
         
-        Uses LLM if available, otherwise uses simple formatting.
+        Fills in the template the LLM wrote while parsing, if any, otherwise
+        uses simple formatting. Makes no LLM call of its own.
         """
-        comparison = state.get("comparison", {})
+        comparison = state["comparison"]
         top = comparison.get("top", [])
-        project_id = state.get("project_id", "Unknown")
-        scope = state.get("scope", "construction works")
-        
-        # Build bid summary
-        bid_text = "\n".join([
-            f"- {bid.get('subcontractor')}: ${bid.get('price'):,} (lead time: {bid.get('lead_time_days')}d)"
-            for bid in top
-        ])
+        template = state["recommendation_template"]
         
-        # Format recommendation
-        if self.use_llm and self.llm:
-            recommendation_text = self._format_with_llm(bid_text, project_id, scope)
-            if not recommendation_text:
-                recommendation_text = self._format_with_default(top, bid_text)
-        else:
-            recommendation_text = self._format_with_default(top, bid_text)
+        recommendation_text = self._fill_template(template, top) if template else None
+        if not recommendation_text:
+            recommendation_text = self._format_with_default(top)
         
         return {"recommendation": recommendation_text}
 
-    def build_graph(self):
-        """Build the StateGraph with nodes and edges."""
-        # Add nodes
-        self.graph.add_node("parse", self._parse_node)
-        self.graph.add_node("fetch", self._fetch_node)
-        self.graph.add_node("compare", self._compare_node)
-        self.graph.add_node("format", self._format_node)
-
-        # Add edges: START -> parse -> fetch -> compare -> format -> END
-        self.graph.add_edge(START, "parse")
-        self.graph.add_edge("parse", "fetch")
-        self.graph.add_edge("fetch", "compare")
-        self.graph.add_edge("compare", "format")
-        self.graph.add_edge("format", END)
+    @classmethod
+    def _build_graph(cls) -> "StateGraph":
+        """The agent's graph: parse -> fetch -> compare -> format."""
+        try:
+            from langgraph.graph import StateGraph, START, END
+        except ImportError:
+            raise ImportError(
+                "langgraph is required. Install it with: pip install langgraph"
+            )
 
-        # Compile for execution
-        self.compiled_graph = self.graph.compile()
+        graph = StateGraph(AgentState)
 
-    def run(self, prompt: str, verbose: bool = False) -> AgentState:
-        """Execute the agent: invoke the compiled graph with initial state.
-        
-        Args:
-            prompt: The user's procurement request
-            verbose: If True, print detailed execution logs
-            
-        Returns:
-            Final agent state with all processing results
-        """
-        if self.compiled_graph is None:
-            self.build_graph()
+        # Add nodes; invoke() runs the sync parse node, ainvoke()/abatch()
+        # the async one
+        graph.add_node("parse", agent_node("_parse_node", "_aparse_node"))
+        graph.add_node("fetch", agent_node("_fetch_node"))
+        graph.add_node("compare", agent_node("_compare_node"))
+        graph.add_node("format", agent_node("_format_node"))
 
+        # Add edges: START -> parse -> fetch -> compare -> format -> END
+        graph.add_edge(START, "parse")
+        graph.add_edge("parse", "fetch")
+        graph.add_edge("fetch", "compare")
+        graph.add_edge("compare", "format")
+        graph.add_edge("format", END)
+        return graph
+
+    def _initial_state(self, prompt: str, verbose: bool) -> AgentState:
+        """Configure logging and build the initial state of a run."""
         if verbose:
             logger.setLevel(logging.DEBUG)
-            handler = logging.StreamHandler()
-            handler.setLevel(logging.DEBUG)
-            formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
+            # Attached once, however many verbose runs there are
+            if _verbose_handler not in logger.handlers:
+                logger.addHandler(_verbose_handler)
 
         logger.info(f"Starting agent execution with prompt: {prompt[:50]}...")
         
-        initial_state: AgentState = {
-            "prompt": prompt,
-            "project_id": None,
-            "scope": None,
-            "bids": [],
-            "comparison": {},
-            "recommendation": "",
-        }
-        
-        final_state = self.compiled_graph.invoke(initial_state)
-        
+        initial_state = _INITIAL_STATE.copy()
+        initial_state["prompt"] = prompt
+        return initial_state
+
+    def _finish_run(self, final_state: dict, prompt: str) -> AgentState:
+        """Project the final graph state onto the agent's output fields."""
         logger.info("Agent execution completed")
 
         return {
@@ -283,3 +447,22 @@ Focus on cost-effectiveness and timeline."""
             "comparison": final_state.get("comparison", {}),
             "recommendation": final_state.get("recommendation"),
         }
+
+
+@lru_cache(maxsize=16)
+def get_agent(
+    api_key: str | None = None,
+    top_n: int = 1,
+    use_llm: bool = True,
+    gemini_api_key: str | None = None,
+) -> LangGraphAgent:
+    """Shared, ready-to-run agent for these settings.
+    
+    Serving code can call ``get_agent(...).run(prompt)`` per request instead
+    of constructing an agent, keeping Gemini client setup and graph binding
+    off the request path. Agents keep no per-run state, so concurrent runs
+    may share one.
+    """
+    agent = LangGraphAgent(api_key=api_key, top_n=top_n, gemini_api_key=gemini_api_key, use_llm=use_llm)
+    agent.build_graph()
+    return agent
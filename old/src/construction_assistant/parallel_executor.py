@@ -5,167 +5,606 @@ Provides:
 - Asyncio-based parallel invocation
 - Fallback to sequential execution if needed
 - Result aggregation and error handling
+- Optional batching of same-tool calls into a single dispatch
 """
 import asyncio
+import contextvars
+import functools
+import json
 import logging
-from typing import Any, Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .tool_cache import ToolCache
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True, frozen=True)
+class ToolCall:
+    """A tool call normalized once at the executor boundary.
+    
+    error is set when the call can't be run as given (e.g. its arguments
+    aren't valid JSON); executors answer such a call with {"error": error}.
+    """
+    id: Any
+    tool: str
+    tool_input: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, tool_call: Dict[str, Any], index: int = 0) -> "ToolCall":
+        """Build a ToolCall from any of the tool call formats in use.
+        
+        The tool name is read from 'tool' or 'name'; the arguments from
+        'tool_input', 'input', 'args' (LangChain) or 'arguments' (OpenAI,
+        possibly a JSON string); the id from 'id' or 'tool_call_id'. A call
+        without an id gets '<tool>_<index>', index being its position in the
+        batch, so id-less calls to the same tool don't collide.
+        """
+        tool = tool_call.get("tool") or tool_call.get("name")
+        tool_input = (
+            tool_call.get("tool_input")
+            or tool_call.get("input")
+            or tool_call.get("args")
+            or tool_call.get("arguments")
+            or {}
+        )
+        error = None
+        if isinstance(tool_input, str):
+            try:
+                tool_input = json.loads(tool_input)
+            except json.JSONDecodeError as e:
+                tool_input, error = {}, f"Invalid JSON arguments: {e}"
+        return cls(
+            id=tool_call.get("id") or tool_call.get("tool_call_id") or f"{tool}_{index}",
+            tool=tool,
+            tool_input=tool_input,
+            error=error,
+        )
+
+
+def _canonicalize(tool_calls: Iterable[Union[ToolCall, Dict[str, Any]]]) -> List[ToolCall]:
+    """Convert incoming tool call dicts into ToolCall instances."""
+    return [
+        tc if isinstance(tc, ToolCall) else ToolCall.from_dict(tc, index)
+        for index, tc in enumerate(tool_calls)
+    ]
+
+
+def _split_invalid(tool_calls: List[ToolCall]) -> tuple[Dict[str, Any], List[ToolCall]]:
+    """Answer calls that can't run with their error; return (errors, runnable calls)."""
+    errors = {tool_call.id: {"error": tool_call.error} for tool_call in tool_calls if tool_call.error}
+    if not errors:
+        return errors, tool_calls
+    for tool_id, result in errors.items():
+        logger.error("Tool call %s not executed: %s", tool_id, result["error"])
+    return errors, [tool_call for tool_call in tool_calls if not tool_call.error]
+
+
+def _to_columns(tool_calls: List[ToolCall]) -> tuple[List[Any], List[str], List[Dict[str, Any]]]:
+    """Split tool calls into parallel (ids, names, inputs) lists for dispatch."""
+    return (
+        [tool_call.id for tool_call in tool_calls],
+        [tool_call.tool for tool_call in tool_calls],
+        [tool_call.tool_input for tool_call in tool_calls],
+    )
+
+
+async def _run_in_context(ctx: contextvars.Context, coro) -> Any:
+    """Await coro as a task running in ctx rather than the loop thread's context."""
+    return await ctx.run(asyncio.ensure_future, coro)
+
+
+def _run_noting_start(started: List[Optional[float]], index: int, job) -> Any:
+    """Record when a worker starts job, then run it."""
+    started[index] = time.monotonic()
+    return job()
+
+
 class ParallelToolExecutor:
     """Executes tools in parallel when possible."""
     
-    def __init__(self, max_workers: int = 4, use_asyncio: bool = True):
+    def __init__(
+        self,
+        max_workers: int = 4,
+        use_asyncio: bool = True,
+        cache: Optional[ToolCache] = None,
+        use_uvloop: bool = False,
+    ):
         """Initialize the parallel executor.
         
         Args:
             max_workers: Maximum number of concurrent workers
             use_asyncio: If True, use asyncio for concurrency. If False, use ThreadPoolExecutor.
+            cache: Optional ToolCache. Calls whose (tool, input) are cached skip
+                dispatch entirely; successful results are stored for reuse.
+            use_uvloop: Run the asyncio path on a uvloop event loop. Requires the
+                optional ``uvloop`` package; falls back to the default loop if missing.
         """
         self.max_workers = max_workers
         self.use_asyncio = use_asyncio
-        self.executor = None
-        
-        if not use_asyncio:
-            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = cache
+        self.use_uvloop = use_uvloop
+        # Long-lived worker pool shared by the threaded and asyncio paths
+        self.executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="paralleltool"
+        )
+        self._pool_lock = threading.Lock()
+        # Event loop reused across calls, running in its own thread so callers
+        # on different threads share it concurrently; started lazily on the
+        # first async batch. The lock only guards starting and stopping it.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
     
     def execute_tools_parallel(
         self,
-        tool_calls: List[Dict[str, Any]],
+        tool_calls: List[Union[ToolCall, Dict[str, Any]]],
         tool_invoke_fn,
+        tool_ainvoke_fn=None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Execute multiple tool calls in parallel.
         
         Args:
-            tool_calls: List of tool call dicts with 'tool', 'tool_input', 'id'
+            tool_calls: ToolCalls or dicts with 'tool'/'name', 'tool_input'/'input', 'id'
             tool_invoke_fn: Function to invoke a tool: fn(tool_name, tool_input) -> result
+            tool_ainvoke_fn: Optional coroutine function with the same signature.
+                When given, the asyncio path awaits it directly instead of
+                dispatching tool_invoke_fn onto the worker pool.
+            timeout: Seconds each call may run, counted from when a worker
+                starts it, so calls queued behind a full pool aren't charged
+                for the wait. A call that runs longer gets {"error": "timeout"}
+                as its result; the others are not held up by it. A worker
+                thread can't be interrupted, so it finishes the call in the
+                background, and calls still queued or submitted later move
+                to a fresh pool rather than wait behind it. None waits
+                indefinitely.
             
         Returns:
             Dict mapping tool_id -> result
         """
+        errors, tool_calls = _split_invalid(_canonicalize(tool_calls))
+        if self.cache is None:
+            results = self._dispatch_tools(tool_calls, tool_invoke_fn, tool_ainvoke_fn, timeout)
+        else:
+            results, pending = self._split_cached(tool_calls)
+            fresh_results = self._dispatch_tools(pending, tool_invoke_fn, tool_ainvoke_fn, timeout)
+            self._store_results(pending, fresh_results)
+            results.update(fresh_results)
+        if errors:
+            results.update(errors)
+        return results
+    
+    async def aexecute_tools_parallel(
+        self,
+        tool_calls: List[Union[ToolCall, Dict[str, Any]]],
+        tool_invoke_fn,
+        tool_ainvoke_fn=None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of execute_tools_parallel for callers already on a loop.
+        
+        Async LangGraph nodes should await this rather than calling the sync
+        method, which cannot block on the caller's running loop and so falls
+        back to threads. Arguments and return value match execute_tools_parallel.
+        """
+        errors, tool_calls = _split_invalid(_canonicalize(tool_calls))
+        if self.cache is None:
+            results = {}
+            if tool_calls:
+                results = await self._execute_tools_async(
+                    *_to_columns(tool_calls), tool_invoke_fn, tool_ainvoke_fn, timeout
+                )
+        else:
+            results, pending = self._split_cached(tool_calls)
+            if pending:
+                fresh_results = await self._execute_tools_async(
+                    *_to_columns(pending), tool_invoke_fn, tool_ainvoke_fn, timeout
+                )
+                self._store_results(pending, fresh_results)
+                results.update(fresh_results)
+        if errors:
+            results.update(errors)
+        return results
+    
+    def _split_cached(self, tool_calls: List[ToolCall]) -> tuple[Dict[str, Any], List[ToolCall]]:
+        """Answer calls from the cache; return (cached results, calls still to run)."""
+        results = {}
+        pending = []
+        for tool_call in tool_calls:
+            cached_result = self.cache.get(tool_call.tool, tool_call.tool_input)
+            if cached_result is not None:
+                results[tool_call.id] = cached_result
+            else:
+                pending.append(tool_call)
+        return results, pending
+    
+    def _store_results(self, tool_calls: List[ToolCall], results: Dict[str, Any]) -> None:
+        """Cache the successful results of freshly executed calls."""
+        for tool_call in tool_calls:
+            result = results.get(tool_call.id)
+            # Failed calls come back as a bare {"error": ...}; don't cache those
+            if result is not None and not (isinstance(result, dict) and result.keys() == {"error"}):
+                self.cache.set(tool_call.tool, tool_call.tool_input, result)
+    
+    def _dispatch_tools(
+        self,
+        tool_calls: List[ToolCall],
+        tool_invoke_fn,
+        tool_ainvoke_fn=None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Run tool calls on the single, asyncio or threaded path."""
         if not tool_calls:
             return {}
         
-        if len(tool_calls) == 1:
-            # Single tool, no parallelization needed
-            return self._execute_single_tool(tool_calls[0], tool_invoke_fn)
-        
-        if self.use_asyncio:
+        if len(tool_calls) == 1 and timeout is None:
+            # Single tool, no parallelization needed: call it inline. A
+            # timeout needs the call off this thread, so it takes the pool.
+            tool_call = tool_calls[0]
             try:
-                # Try to use asyncio
-                try:
-                    loop = asyncio.get_running_loop()
-                    # Can't use asyncio in running loop, fall back to threads
-                    return self._execute_tools_threaded(tool_calls, tool_invoke_fn)
-                except RuntimeError:
-                    # No running loop, we can create one
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(
-                            self._execute_tools_async(tool_calls, tool_invoke_fn)
-                        )
-                    finally:
-                        loop.close()
+                return {tool_call.id: tool_invoke_fn(tool_call.tool, tool_call.tool_input)}
             except Exception as e:
-                logger.warning(f"Asyncio execution failed: {str(e)}. Falling back to threaded.")
-                return self._execute_tools_threaded(tool_calls, tool_invoke_fn)
-        else:
-            return self._execute_tools_threaded(tool_calls, tool_invoke_fn)
+                logger.error("Tool execution failed for %s: %s", tool_call.id, e)
+                return {tool_call.id: {"error": str(e)}}
+        
+        # Lay the batch out as parallel lists once; both paths zip over them
+        columns = _to_columns(tool_calls)
+        
+        if not self.use_asyncio or self._in_running_loop():
+            # Blocking on the caller's own running loop would deadlock, so use
+            # threads; async callers should await aexecute_tools_parallel
+            return self._execute_tools_threaded(*columns, tool_invoke_fn, timeout)
+        
+        try:
+            # No running loop here: submit the batch to the executor's own
+            # loop thread and block on it. Batches from other threads run on
+            # the same loop at the same time.
+            coro = self._execute_tools_async(*columns, tool_invoke_fn, tool_ainvoke_fn, timeout)
+            ctx = contextvars.copy_context()
+            if len(ctx):
+                # Tasks take the context of the loop thread; carry the caller's
+                coro = _run_in_context(ctx, coro)
+            return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+        except Exception as e:
+            logger.warning("Asyncio execution failed: %s. Falling back to threaded.", e)
+            return self._execute_tools_threaded(*columns, tool_invoke_fn, timeout)
+    
+    @staticmethod
+    def _in_running_loop() -> bool:
+        """Return True when called from a thread with a running event loop."""
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the worker pool, recreating it if the executor was shut down."""
+        with self._pool_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="paralleltool"
+                )
+            return self.executor
+    
+    def _retire_pool(self, pool: ThreadPoolExecutor) -> None:
+        """Stop sending calls to a pool that has a timed-out call on a worker.
+        
+        The stuck worker stays busy until its call returns; later calls get a
+        fresh pool. The old pool isn't shut down, as callers that already hold
+        it may still submit to it; its idle workers exit once it is
+        garbage-collected.
+        """
+        with self._pool_lock:
+            if self.executor is pool:
+                self.executor = None
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the persistent event loop, starting its thread on first use."""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = self._new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=loop.run_forever, name="paralleltool-loop", daemon=True
+                )
+                self._loop_thread.start()
+                self._loop = loop
+            return self._loop
+    
+    def _new_event_loop(self) -> asyncio.AbstractEventLoop:
+        """Create the executor's loop, using uvloop when requested and installed."""
+        if self.use_uvloop:
+            try:
+                import uvloop
+                return uvloop.new_event_loop()
+            except ImportError:
+                logger.warning("uvloop is not installed. Using the default asyncio event loop.")
+                self.use_uvloop = False
+        return asyncio.new_event_loop()
     
     async def _execute_tools_async(
         self,
-        tool_calls: List[Dict[str, Any]],
+        tool_ids: List[Any],
+        tool_names: List[str],
+        tool_inputs: List[Dict[str, Any]],
         tool_invoke_fn,
+        tool_ainvoke_fn=None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Execute tools concurrently using asyncio."""
-        tasks = []
-        
-        for tool_call in tool_calls:
-            task = asyncio.create_task(
-                self._invoke_tool_async(tool_call, tool_invoke_fn)
-            )
-            tasks.append((tool_call.get("id"), task))
+        outcomes = await asyncio.gather(
+            *(
+                self._invoke_tool_async(tool_name, tool_input, tool_invoke_fn, tool_ainvoke_fn, timeout)
+                for tool_name, tool_input in zip(tool_names, tool_inputs)
+            ),
+            return_exceptions=True,
+        )
         
-        results = {}
-        for tool_id, task in tasks:
-            try:
-                result = await task
-                results[tool_id] = result
-            except Exception as e:
-                logger.error(f"Tool execution failed for {tool_id}: {str(e)}")
-                results[tool_id] = {"error": str(e)}
+        # Build the result dict in one allocation, then patch failures in place
+        results = dict(zip(tool_ids, outcomes))
+        for tool_id, outcome in results.items():
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.error("Tool execution timed out for %s after %ss", tool_id, timeout)
+                results[tool_id] = {"error": "timeout"}
+            elif isinstance(outcome, Exception):
+                logger.error("Tool execution failed for %s: %s", tool_id, outcome)
+                results[tool_id] = {"error": str(outcome)}
         
         return results
     
-    async def _invoke_tool_async(self, tool_call: Dict[str, Any], tool_invoke_fn) -> Any:
-        """Invoke a single tool asynchronously."""
-        tool_name = tool_call.get("tool") or tool_call.get("name")
-        tool_input = tool_call.get("tool_input") or tool_call.get("input", {})
-        
-        # Run blocking operation in executor
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            tool_invoke_fn,
-            tool_name,
-            tool_input
-        )
+    async def _invoke_tool_async(
+        self,
+        tool_name: str,
+        tool_input: Dict[str, Any],
+        tool_invoke_fn,
+        tool_ainvoke_fn=None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Invoke a single tool asynchronously, within timeout once it runs.
+        
+        Like the threaded path, a call still queued on a pool that has been
+        retired moves to the current pool instead of waiting behind it.
+        """
+        # Awaitable tools run natively on the loop, no thread hop needed
+        if tool_ainvoke_fn is not None:
+            return await asyncio.wait_for(tool_ainvoke_fn(tool_name, tool_input), timeout)
+        
+        # Run blocking operation on the shared worker pool. run_in_executor
+        # does not carry contextvars (e.g. tracing ids) over, so wrap the call
+        # in a context copy when there is anything to carry.
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        pool = self._get_executor()
+        invoke = functools.partial(ctx.run, tool_invoke_fn) if len(ctx) else tool_invoke_fn
+        if timeout is None:
+            return await loop.run_in_executor(pool, invoke, tool_name, tool_input)
+        
+        # The clock starts when a worker picks the call up
+        started = loop.create_future()
+        
+        def run():
+            loop.call_soon_threadsafe(started.set_result, None)
+            return invoke(tool_name, tool_input)
+        
+        job = pool.submit(run)
+        while not started.done():
+            await asyncio.wait((started,), timeout=timeout)
+            # cancel() only succeeds while the call is still queued
+            if not started.done() and pool is not self.executor and job.cancel():
+                pool = self._get_executor()
+                job = pool.submit(run)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except asyncio.TimeoutError:
+            self._retire_pool(pool)
+            raise
     
     def _execute_tools_threaded(
         self,
-        tool_calls: List[Dict[str, Any]],
+        tool_ids: List[Any],
+        tool_names: List[str],
+        tool_inputs: List[Dict[str, Any]],
         tool_invoke_fn,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Execute tools concurrently using ThreadPoolExecutor."""
-        results = {}
-        futures = {}
-        
-        # Submit all tools
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for tool_call in tool_calls:
-                tool_id = tool_call.get("id")
-                tool_name = tool_call.get("tool") or tool_call.get("name")
-                tool_input = tool_call.get("tool_input") or tool_call.get("input", {})
-                
-                future = executor.submit(tool_invoke_fn, tool_name, tool_input)
-                futures[future] = tool_id
-            
-            # Collect results as they complete
-            for future in as_completed(futures):
-                tool_id = futures[future]
-                try:
-                    result = future.result()
-                    results[tool_id] = result
-                except Exception as e:
-                    logger.error(f"Tool execution failed for {tool_id}: {str(e)}")
-                    results[tool_id] = {"error": str(e)}
+        jobs = [
+            functools.partial(self._invoke_tool_safely, tool_invoke_fn, tool_id, tool_name, tool_input)
+            for tool_id, tool_name, tool_input in zip(tool_ids, tool_names, tool_inputs)
+        ]
         
-        return results
+        ctx = contextvars.copy_context()
+        if not len(ctx):
+            submit = ThreadPoolExecutor.submit
+        else:
+            # Worker threads don't inherit contextvars (tracing ids etc.).
+            # A Context can only be entered by one thread at a time, so each
+            # call runs in its own copy of the caller's snapshot.
+            def submit(pool, job):
+                return pool.submit(ctx.copy().run, job)
+        
+        if timeout is not None:
+            return self._collect_within_timeout(tool_ids, jobs, submit, timeout)
+        
+        executor = self._get_executor()
+        futures = [submit(executor, job) for job in jobs]
+        
+        # Results are keyed by id, so completion order doesn't matter: block
+        # once for the whole batch, then read results that are already set.
+        # _invoke_tool_safely never raises, so result() cannot either.
+        wait(futures, return_when=ALL_COMPLETED)
+        return {tool_id: future.result() for tool_id, future in zip(tool_ids, futures)}
     
-    def _execute_single_tool(
+    def _collect_within_timeout(
         self,
-        tool_call: Dict[str, Any],
-        tool_invoke_fn,
+        tool_ids: List[Any],
+        jobs: list,
+        submit,
+        timeout: float,
     ) -> Dict[str, Any]:
-        """Execute a single tool call."""
-        tool_id = tool_call.get("id")
-        tool_name = tool_call.get("tool") or tool_call.get("name")
-        tool_input = tool_call.get("tool_input") or tool_call.get("input", {})
+        """Run jobs, waiting for each until timeout seconds after it started.
         
+        A timed-out call retires its pool. Calls still queued on a retired
+        pool, by this batch or any other sharing the executor, would wait
+        behind its stuck workers, so they are moved to the current pool.
+        """
+        # Each job notes when a worker starts it, where its clock starts
+        started: List[Optional[float]] = [None] * len(jobs)
+        jobs = [functools.partial(_run_noting_start, started, index, job) for index, job in enumerate(jobs)]
+        pools = [self._get_executor()] * len(jobs)
+        outcomes: List[Any] = [None] * len(jobs)
+        pending = {index: submit(pools[index], job) for index, job in enumerate(jobs)}
+        while pending:
+            # Sleep until the earliest deadline of a running call, or until a
+            # queued call could have started and run out its time
+            deadlines = [started[i] + timeout for i in pending if started[i] is not None]
+            delay = max(0.0, min(deadlines) - time.monotonic()) if deadlines else timeout
+            wait(pending.values(), timeout=delay, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for index, future in list(pending.items()):
+                if future.done():
+                    outcomes[index] = future.result()
+                elif started[index] is not None and now - started[index] >= timeout:
+                    logger.error("Tool execution timed out for %s after %ss", tool_ids[index], timeout)
+                    outcomes[index] = {"error": "timeout"}
+                    self._retire_pool(pools[index])
+                else:
+                    continue
+                del pending[index]
+            
+            for index, future in list(pending.items()):
+                # cancel() only succeeds while the call is still queued
+                if pools[index] is not self.executor and future.cancel():
+                    pools[index] = self._get_executor()
+                    pending[index] = submit(pools[index], jobs[index])
+        return dict(zip(tool_ids, outcomes))
+    
+    @staticmethod
+    def _invoke_tool_safely(tool_invoke_fn, tool_id: Any, tool_name: str, tool_input: Dict[str, Any]) -> Any:
+        """Invoke a tool, converting any exception into an error result."""
         try:
-            result = tool_invoke_fn(tool_name, tool_input)
-            return {tool_id: result}
+            return tool_invoke_fn(tool_name, tool_input)
         except Exception as e:
-            logger.error(f"Tool execution failed for {tool_id}: {str(e)}")
-            return {tool_id: {"error": str(e)}}
+            logger.error("Tool execution failed for %s: %s", tool_id, e)
+            return {"error": str(e)}
     
     def shutdown(self):
-        """Shutdown the executor."""
-        if self.executor:
+        """Shutdown the executor. Safe to call more than once."""
+        with self._loop_lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop_thread.join()
+                self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+        
+        if self.executor is not None:
             self.executor.shutdown(wait=True)
+            self.executor = None
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.shutdown()
+
+
+class BatchingToolExecutor:
+    """Coalesces calls to batch-capable tools before parallel execution.
+    
+    Calls to a tool listed in ``batch_tools`` are grouped into chunks of at
+    most ``max_batch_size`` and dispatched once per chunk as
+    ``tool_invoke_fn(tool_name, {"batch": [input, ...]})``. The tool must
+    return a list of results in input order; results are scattered back to
+    the original tool call ids. All other calls take the normal per-call path.
+    """
+    
+    def __init__(
+        self,
+        executor: Optional[ParallelToolExecutor] = None,
+        batch_tools: Optional[Iterable[str]] = None,
+        max_batch_size: int = 10,
+    ):
+        """Initialize the batching executor.
+        
+        Args:
+            executor: Underlying executor. A default ParallelToolExecutor is created if None.
+            batch_tools: Names of tools that accept a {"batch": [...]} input
+            max_batch_size: Maximum number of calls coalesced into one dispatch
+        """
+        self.executor = executor or ParallelToolExecutor()
+        self.batch_tools = frozenset(batch_tools or ())
+        self.max_batch_size = max(1, max_batch_size)
+    
+    def execute_tools_parallel(
+        self,
+        tool_calls: List[Union[ToolCall, Dict[str, Any]]],
+        tool_invoke_fn,
+    ) -> Dict[str, Any]:
+        """Execute tool calls, batching calls to batch-capable tools.
+        
+        Args:
+            tool_calls: ToolCalls or dicts with 'tool'/'name', 'tool_input'/'input', 'id'
+            tool_invoke_fn: Function to invoke a tool: fn(tool_name, tool_input) -> result
+            
+        Returns:
+            Dict mapping tool_id -> result
+        """
+        dispatch_calls: List[ToolCall] = []
+        groups: Dict[str, List[ToolCall]] = {}
+        
+        for tool_call in _canonicalize(tool_calls):
+            if tool_call.tool in self.batch_tools:
+                groups.setdefault(tool_call.tool, []).append(tool_call)
+            else:
+                dispatch_calls.append(tool_call)
+        
+        # One synthetic call per chunk; remember which ids it stands for
+        batches: Dict[str, List[Any]] = {}
+        for tool_name, calls in groups.items():
+            for start in range(0, len(calls), self.max_batch_size):
+                chunk = calls[start:start + self.max_batch_size]
+                batch_id = f"batch:{tool_name}:{start}"
+                batches[batch_id] = [call.id for call in chunk]
+                dispatch_calls.append(ToolCall(
+                    id=batch_id,
+                    tool=tool_name,
+                    tool_input={"batch": [call.tool_input for call in chunk]},
+                ))
+        
+        raw_results = self.executor.execute_tools_parallel(dispatch_calls, tool_invoke_fn)
+        
+        results = {}
+        for tool_call in dispatch_calls:
+            tool_id = tool_call.id
+            result = raw_results.get(tool_id)
+            if tool_id not in batches:
+                results[tool_id] = result
+                continue
+            
+            member_ids = batches[tool_id]
+            if isinstance(result, list) and len(result) == len(member_ids):
+                results.update(zip(member_ids, result))
+            else:
+                error = result.get("error") if isinstance(result, dict) else None
+                error = error or f"Batched tool returned {type(result).__name__}, expected list of {len(member_ids)}"
+                logger.error("Batched execution failed for %s: %s", tool_id, error)
+                for member_id in member_ids:
+                    results[member_id] = {"error": error}
+        
+        return results
+    
+    def shutdown(self):
+        """Shutdown the underlying executor."""
+        self.executor.shutdown()
     
     def __enter__(self):
         """Context manager entry."""
@@ -176,14 +615,26 @@ class ParallelToolExecutor:
         self.shutdown()
 
 
-def create_parallel_executor(max_workers: int = 4, use_asyncio: bool = True) -> ParallelToolExecutor:
+def create_parallel_executor(
+    max_workers: int = 4,
+    use_asyncio: bool = True,
+    cache: Optional[ToolCache] = None,
+    use_uvloop: bool = False,
+) -> ParallelToolExecutor:
     """Create a parallel tool executor.
     
     Args:
         max_workers: Maximum number of concurrent workers
         use_asyncio: Use asyncio or ThreadPoolExecutor
+        cache: Optional ToolCache for memoizing identical tool calls
+        use_uvloop: Use uvloop for the asyncio path if it is installed
         
     Returns:
         Configured ParallelToolExecutor instance
     """
-    return ParallelToolExecutor(max_workers=max_workers, use_asyncio=use_asyncio)
+    return ParallelToolExecutor(
+        max_workers=max_workers,
+        use_asyncio=use_asyncio,
+        cache=cache,
+        use_uvloop=use_uvloop,
+    )
@@ -0,0 +1,62 @@
+"""Precompiled patterns for the agents' regex-based parsing.
+
+Uses Google's linear-time RE2 engine when the optional ``google-re2``
+package is installed, and the standard library ``re`` otherwise.
+"""
+from re import escape
+
+# PROJECT_ID_PATTERN is case-insensitive, so prompts are searched as they are
+# rather than upper-cased whole; find_project_id(s) upper-case just the ids
+try:
+    import re2 as re_engine
+
+    # RE2 never backtracks, so the plain pattern is already linear-time
+    PROJECT_ID_PATTERN = re_engine.compile(r"(?i)[A-Z]+-?\d+")
+except ImportError:
+    import re as re_engine
+
+    # The lookbehind only lets a match start at the beginning of a letter
+    # run, so a long run without digits is scanned once instead of once per
+    # letter. Leftmost matches are unchanged: [A-Z]+ from the run start can
+    # always cover whatever a later start in the same run would match.
+    PROJECT_ID_PATTERN = re_engine.compile(r"(?i)(?<![A-Z])[A-Z]+-?\d+")
+
+# Stricter project-id form (hyphen required, whole words only) used when
+# clarifying a prompt the main pattern failed on
+LOOSE_PROJECT_ID_PATTERN = re_engine.compile(r"\b[A-Z]+-\d+\b")
+
+# Floor area with its unit, e.g. "120 sqm"; case-insensitive via the inline
+# flag (understood by both engines) so callers needn't lower-case the prompt
+AREA_PATTERN = re_engine.compile(r"(?i)(\d+\.?\d*)\s*(sqm|m2|square meters?|sq m)")
+
+# Recognized scopes of work, in priority order when a prompt names several
+SCOPE_KEYWORDS = (
+    "foundation", "excavation", "electrical", "plumbing",
+    "roofing", "site clearing", "HVAC",
+)
+
+# All keywords as one alternation, so a prompt is scanned once however many
+# keywords there are (RE2 compiles it to a DFA). No keyword's suffix is
+# another's prefix, so non-overlapping matches still find every keyword.
+SCOPE_PATTERN = re_engine.compile(
+    "(?i)" + "|".join(escape(kw) for kw in SCOPE_KEYWORDS)
+)
+_SCOPE_BY_LOWER = {kw.lower(): kw for kw in SCOPE_KEYWORDS}
+_SCOPE_RANK = {kw: rank for rank, kw in enumerate(SCOPE_KEYWORDS)}
+
+
+def find_project_id(prompt: str) -> str | None:
+    """Return the first project id in prompt, upper-cased."""
+    match = PROJECT_ID_PATTERN.search(prompt)
+    return match.group(0).upper() if match else None
+
+
+def find_project_ids(prompt: str) -> list[str]:
+    """Return every project id in prompt, upper-cased, in order."""
+    return [match.upper() for match in PROJECT_ID_PATTERN.findall(prompt)]
+
+
+def find_scope(prompt: str) -> str | None:
+    """Return the highest-priority scope keyword in prompt, case-insensitively."""
+    found = {_SCOPE_BY_LOWER[m.group(0).lower()] for m in SCOPE_PATTERN.finditer(prompt)}
+    return min(found, key=_SCOPE_RANK.__getitem__, default=None)
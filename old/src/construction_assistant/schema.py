@@ -9,7 +9,16 @@ class AgentState(TypedDict):
     bids: list
     comparison: dict
     recommendation: str
+    # Recommendation with {subcontractor}/{price}/{lead_time_days} placeholders
+    # for the top bid, written by the LLM while parsing
+    recommendation_template: str | None
     # Tool usage fields
     tool_calls: list[dict] | None
     tool_results: dict | None
-
+    # Per-branch outcomes written by the parallel tool nodes
+    market_data_outcome: dict | None
+    cost_estimate_outcome: dict | None
+    # Fetch attempts made, including retries for insufficient bids
+    _fetch_attempts: int
+    # Errors of the fetch attempts that failed, in attempt order
+    fetch_errors: list[str]
@@ -0,0 +1,121 @@
+"""Similarity-based cache for LLM results keyed on prompt meaning.
+
+Exact-match caches miss prompts that say the same thing in different words
+("foundation works on P-123" vs "foundation bids, project P-123"). This
+cache embeds each prompt and answers a lookup with the stored value of the
+most similar earlier prompt, provided the cosine similarity reaches a
+threshold.
+
+Embeddings are supplied by the caller, so any model works; by default a
+small local sentence-transformers model is used when the optional
+``sentence-transformers`` package is installed.
+"""
+import math
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Small, fast model that runs locally on CPU
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+def _normalize(vector: Sequence[float]) -> Tuple[float, ...]:
+    """Scale vector to unit length, so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return tuple(vector)
+    return tuple(x / norm for x in vector)
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class SemanticCache:
+    """Bounded cache returning the value stored for the most similar prompt.
+
+    Entries are grouped into buckets that must match exactly: a hit is only
+    possible between prompts in the same bucket. Callers use this for the
+    parts of a prompt embeddings are blind to, such as project ids, which
+    differ by a digit but must never be confused.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        threshold: float = 0.92,
+        max_entries: int = 1024,
+    ):
+        """Initialize the cache.
+
+        Args:
+            embed: Function mapping a text to its embedding vector
+            threshold: Minimum cosine similarity for a lookup to hit
+            max_entries: Entries kept per bucket; the oldest go first
+        """
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, text: str, bucket: Hashable = None) -> Tuple[Tuple[float, ...], Optional[Any]]:
+        """Find the value stored for the prompt most similar to text.
+
+        Returns:
+            The normalized embedding of text, to pass to add() on a miss,
+            and the cached value, or None on a miss
+        """
+        vector = _normalize(self.embed(text))
+        with self._lock:
+            entries = list(self._buckets.get(bucket, ()))
+        best_score, best_value = self.threshold, None
+        for stored, value in entries:
+            score = _dot(vector, stored)
+            if score >= best_score:
+                best_score, best_value = score, value
+        with self._lock:
+            if best_value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector, best_value
+
+    def add(self, vector: Sequence[float], value: Any, bucket: Hashable = None) -> None:
+        """Store value under an embedding returned by lookup()."""
+        with self._lock:
+            entries = self._buckets.get(bucket)
+            if entries is None:
+                entries = self._buckets[bucket] = deque(maxlen=self.max_entries)
+            entries.append((tuple(vector), value))
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._buckets.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._buckets.values())
+
+
+@lru_cache(maxsize=None)
+def default_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL) -> Optional[Callable[[str], List[float]]]:
+    """Local sentence-transformers embedder, or None when it isn't installed."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    try:
+        model = SentenceTransformer(model_name)
+    except Exception as e:
+        logger.warning(f"Failed to load embedding model {model_name}: {e}")
+        return None
+    return lambda text: model.encode(text).tolist()
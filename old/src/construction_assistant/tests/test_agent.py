@@ -11,6 +11,18 @@ def test_estimate_materials_from_prompt():
     assert res["bags_estimate"] >= 1
 
 
+def test_estimate_materials_unit_is_case_insensitive():
+    res = estimate_materials("Estimate materials for 42.5 SQM")
+    assert res["area_sqm"] == 42.5
+
+
+def test_estimate_materials_defaults_area_and_returns_fresh_results():
+    first = estimate_materials("Estimate materials for the garage slab")
+    first["area_sqm"] = 0
+    second = estimate_materials("Estimate materials for the garage slab")
+    assert second["area_sqm"] == 10.0
+
+
 def test_fetch_project_plan():
     res = fetch_project_plan("Get a plan for foundation works")
     assert "phases" in res
@@ -23,3 +23,13 @@ def test_compare_bids_picks_lowest():
     assert len(out["top"]) == 2
     assert out["top"][0]["price"] <= out["top"][1]["price"]
     assert out["average_price"] == pytest.approx((15000 + 12000 + 13000) / 3)
+
+
+def test_compare_bids_top_matches_full_sort_on_large_bid_set():
+    bids = [
+        {"subcontractor": f"S{i}", "price": (i * 7919) % 1000, "lead_time_days": i % 14}
+        for i in range(500)
+    ]
+    out = compare_bids(bids, top_n=5)
+    assert out["count"] == 500
+    assert out["top"] == sorted(bids, key=lambda b: b["price"])[:5]
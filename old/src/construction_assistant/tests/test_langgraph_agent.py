@@ -1,3 +1,4 @@
+import pytest
 from unittest.mock import Mock, patch
 from construction_assistant import LangGraphAgent
 
@@ -14,6 +15,18 @@ def test_langgraph_agent_builds_graph():
         assert "format" in agent.graph.nodes
 
 
+def test_langgraph_agent_build_graph_is_idempotent():
+    """Test that calling build_graph again reuses the compiled graph."""
+    agent = LangGraphAgent(use_llm=False)
+    agent.build_graph()
+    compiled = agent.compiled_graph
+
+    agent.build_graph()
+    agent.run("Get bids for foundation works on project P-123")
+
+    assert agent.compiled_graph is compiled
+
+
 def test_langgraph_agent_runs_full_flow():
     """Test end-to-end execution of the agent on a procurement request."""
     with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
@@ -21,25 +34,386 @@ def test_langgraph_agent_runs_full_flow():
         mock_llm = Mock()
         mock_llm_class.return_value = mock_llm
         
-        # Mock parse response: extract project_id and scope as JSON
-        parse_response = Mock()
-        parse_response.content = '{"project_id": "P-123", "scope": "foundation works"}'
+        # Mock the single combined response: extraction plus a recommendation
+        # template that the format node fills in with the top bid
+        response = Mock()
+        response.content = (
+            '{"project_id": "P-123", "scope": "foundation works", '
+            '"recommendation_template": "Recommendation: Choose {subcontractor} at {price}, '
+            'ready in {lead_time_days} days."}'
+        )
+        mock_llm.invoke.return_value = response
         
-        # Mock format response: format a professional recommendation
-        format_response = Mock()
-        format_response.content = "Recommendation: Choose contractor with best value and timeline."
-        
-        # Set up side effects to return different responses for parse vs format
-        mock_llm.invoke.side_effect = [parse_response, format_response]
-        
-        agent = LangGraphAgent(api_key="dummy", top_n=2)
-        result = agent.run("Get subcontractor bids for foundation works on project P-123")
+        agent = LangGraphAgent(api_key="dummy", gemini_api_key="dummy", top_n=2)
+        # No project id for the regex to find, so the LLM parses this prompt
+        result = agent.run("Get subcontractor bids for foundation works on our Berlin office tower")
         
         assert isinstance(result, dict)
         assert "prompt" in result
         assert "recommendation" in result
-        assert "Recommendation" in result["recommendation"]
+        top = result["comparison"]["top"][0]
+        assert result["recommendation"] == (
+            f"Recommendation: Choose {top['subcontractor']} at ${top['price']:,}, "
+            f"ready in {top['lead_time_days']} days."
+        )
+        # Parsing and formatting share one LLM round-trip
+        assert mock_llm.invoke.call_count == 1
         assert isinstance(result.get("top_bids", []), list)
         # Should have found project ID from mock LLM
         assert result.get("project_id") == "P-123"
 
+
+
+def test_llm_responses_are_cached_across_agents():
+    """Repeated identical prompts are answered from the shared LLM response cache."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from construction_assistant.langgraph_agent import _llm_response_cache
+
+    def fake_gemini(**kwargs):
+        return FakeListChatModel(responses=["answer", "other"], cache=kwargs["cache"])
+
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI", side_effect=fake_gemini):
+        first = LangGraphAgent(gemini_api_key="key")
+        second = LangGraphAgent(gemini_api_key="key")
+
+    _llm_response_cache().clear()
+    assert first.llm.invoke("same prompt").content == "answer"
+    assert second.llm.invoke("same prompt").content == "answer"
+    # FakeListChatModel.i counts the calls that actually reached the model
+    assert (first.llm.i, second.llm.i) == (1, 0)
+
+    second.llm.invoke("other prompt")
+    assert second.llm.i == 1
+    _llm_response_cache().clear()
+
+
+def test_llm_response_cache_persists_only_in_the_configured_directory(tmp_path):
+    """Without LLM_CACHE_DIR responses stay in memory, even with SQLite available."""
+    import sys
+    import types
+    from langchain_core.caches import InMemoryCache
+    from construction_assistant import langgraph_agent
+
+    sqlite_cache = Mock(side_effect=lambda database_path: ("sqlite", database_path))
+    community = types.ModuleType("langchain_community")
+    community_cache = types.ModuleType("langchain_community.cache")
+    community_cache.SQLiteCache = sqlite_cache
+    modules = {"langchain_community": community, "langchain_community.cache": community_cache}
+
+    langgraph_agent._llm_response_cache.cache_clear()
+    try:
+        with patch.dict(sys.modules, modules), patch.object(langgraph_agent, "LLM_CACHE_DIR", None):
+            assert isinstance(langgraph_agent._llm_response_cache(), InMemoryCache)
+        sqlite_cache.assert_not_called()
+
+        langgraph_agent._llm_response_cache.cache_clear()
+        cache_dir = str(tmp_path / "llm")
+        with patch.dict(sys.modules, modules), patch.object(langgraph_agent, "LLM_CACHE_DIR", cache_dir):
+            assert langgraph_agent._llm_response_cache() == (
+                "sqlite", str(tmp_path / "llm" / langgraph_agent.LLM_CACHE_FILENAME)
+            )
+    finally:
+        langgraph_agent._llm_response_cache.cache_clear()
+
+
+def test_unusable_recommendation_template_falls_back_to_default_format():
+    """A template with unknown placeholders doesn't break formatting."""
+    agent = LangGraphAgent(use_llm=False)
+    bids = [{"subcontractor": "Acme", "price": 12000, "lead_time_days": 10}]
+
+    result = agent._format_node({
+        "comparison": {"top": bids},
+        "recommendation_template": "Pick {contractor}.",
+    })
+
+    assert result["recommendation"] == agent._format_with_default(bids)
+
+
+@pytest.mark.parametrize("template", [
+    "Pick {subcontractor.foo}.",
+    "Ready in {lead_time_days[0]} days.",
+    "Pick {}.",
+    "Costs {price:{width}}.",
+    "Costs {price:d}.",
+    "Unbalanced {subcontractor",
+    ["Pick {subcontractor}."],
+    42,
+])
+def test_malformed_recommendation_template_falls_back_to_default_format(template):
+    """Lookups, bad format specs and non-string templates don't crash the run."""
+    agent = LangGraphAgent(use_llm=False)
+    bids = [{"subcontractor": "Acme", "price": 12000, "lead_time_days": 10}]
+
+    result = agent._format_node({
+        "comparison": {"top": bids},
+        "recommendation_template": template,
+    })
+
+    assert result["recommendation"] == agent._format_with_default(bids)
+
+
+def test_reworded_parse_prompts_hit_the_semantic_cache():
+    """A reworded prompt for the same project reuses the LLM parse result."""
+    from construction_assistant.semantic_cache import SemanticCache
+
+    def embed(text):
+        words = text.lower().replace(",", " ").split()
+        return [float(words.count(term)) for term in ("foundation", "works", "bids", "project")]
+
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm = mock_llm_class.return_value
+        mock_llm.invoke.side_effect = [
+            Mock(content='{"project_id": "P-123", "scope": "foundation works"}'),
+            Mock(content='{"project_id": "P-124", "scope": "foundation works"}'),
+        ]
+        agent = LangGraphAgent(gemini_api_key="key")
+        agent.parse_cache = SemanticCache(embed, threshold=0.6)
+
+        first = agent._parse_with_llm("foundation works on project P-123")
+        reworded = agent._parse_with_llm("foundation bids, project P-123")
+        other_project = agent._parse_with_llm("foundation works on project P-124")
+
+    assert reworded == first == {"project_id": "P-123", "scope": "foundation works"}
+    assert other_project["project_id"] == "P-124"
+    assert mock_llm.invoke.call_count == 2
+
+
+def test_regex_parse_project_id_worst_case_is_linear():
+    """Regex fallback stays fast on long letter runs without any digits."""
+    import time
+
+    agent = LangGraphAgent(use_llm=False)
+    prompt = "excavation " + "Q" * 20000
+
+    start = time.perf_counter()
+    parsed = agent._parse_with_regex(prompt)
+    elapsed = time.perf_counter() - start
+
+    assert parsed == {"project_id": None, "scope": "excavation"}
+    # Backtracking made this take seconds; a linear scan is well under this
+    assert elapsed < 0.5
+    assert agent._parse_with_regex("bids for ab-12 and P-123")["project_id"] == "AB-12"
+
+
+def test_find_scope_matches_keyword_priority_scan():
+    """Single-pass scope matching agrees with checking each keyword in turn."""
+    import random
+    from construction_assistant.patterns import SCOPE_KEYWORDS, find_scope
+
+    def scan(prompt):
+        return next((kw for kw in SCOPE_KEYWORDS if kw.lower() in prompt.lower()), None)
+
+    rng = random.Random(0)
+    words = [kw.upper() for kw in SCOPE_KEYWORDS] + list(SCOPE_KEYWORDS) + ["bids", "P-1", "site", "roof"]
+    for _ in range(500):
+        prompt = " ".join(rng.choices(words, k=rng.randint(0, 5)))
+        assert find_scope(prompt) == scan(prompt)
+    assert find_scope("hvac after the excavation, then Foundation") == "foundation"
+
+
+def test_langgraph_agent_arun_matches_run():
+    """Async arun returns the same result as run and can be gathered."""
+    import asyncio
+
+    agent = LangGraphAgent(use_llm=False, top_n=2)
+    prompts = [
+        "Get bids for foundation works on project P-2025-001",
+        "Find contractors for roofing on project ALPHA-2025",
+    ]
+
+    async def run_all():
+        return await asyncio.gather(*[agent.arun(prompt) for prompt in prompts])
+
+    results = asyncio.run(run_all())
+
+    assert results == [agent.run(prompt) for prompt in prompts]
+    assert [result["project_id"] for result in results] == ["P-2025", "ALPHA-2025"]
+
+
+def test_run_many_overlaps_llm_calls_up_to_max_concurrency():
+    """run_many batches prompts through the async parse node, bounded and in order."""
+    import asyncio
+    import json
+
+    in_flight = peak = 0
+
+    async def fake_ainvoke(messages):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        project_id = messages[-1]["content"].split()[-1]
+        return Mock(content=json.dumps({"project_id": project_id, "scope": None}))
+
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm = mock_llm_class.return_value
+        mock_llm.ainvoke.side_effect = fake_ainvoke
+        agent = LangGraphAgent(gemini_api_key="key")
+        agent.parse_cache = None
+
+        prompts = [f"Bids for P-{i}" for i in range(6)]
+        results = agent.run_many(prompts, max_concurrency=3)
+
+    assert [result["project_id"] for result in results] == [f"P-{i}" for i in range(6)]
+    assert peak == 3
+    mock_llm.invoke.assert_not_called()
+
+
+def test_agents_share_one_compiled_graph():
+    """The graph is compiled once per class, but each agent runs its own settings."""
+    first = LangGraphAgent(use_llm=False, top_n=1)
+    second = LangGraphAgent(use_llm=False, top_n=3)
+    first.build_graph()
+    second.build_graph()
+
+    assert first.graph is second.graph
+    assert first.compiled_graph.nodes["parse"] is second.compiled_graph.nodes["parse"]
+
+    prompt = "Get bids for foundation works on project P-123"
+    assert len(first.run(prompt)["comparison"]["top"]) == 1
+    assert len(second.run(prompt)["comparison"]["top"]) == 3
+
+
+def test_malformed_llm_json_falls_back_to_regex_parse():
+    """A reply that isn't JSON is parsed with the regex fallback instead."""
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm_class.return_value.invoke.return_value = Mock(content="```json\n{oops")
+        agent = LangGraphAgent(gemini_api_key="key")
+        agent.parse_cache = None
+
+        parsed = agent._parse_with_llm("Roofing bids for P-77")
+
+    assert parsed == {"project_id": "P-77", "scope": "roofing"}
+
+
+def test_parse_prompt_keeps_a_stable_system_prefix():
+    """Only the user turn varies between parse calls, so the prefix can be cached."""
+    from construction_assistant.langgraph_agent import PARSE_SYSTEM_PROMPT
+
+    first = LangGraphAgent._extraction_prompt("Roofing bids for P-1")
+    second = LangGraphAgent._extraction_prompt("Excavation on ALPHA-2")
+
+    assert first[0] == second[0] == {"role": "system", "content": PARSE_SYSTEM_PROMPT}
+    assert first[1] == {"role": "user", "content": "User request: Roofing bids for P-1"}
+
+
+def test_verbose_runs_attach_a_single_log_handler():
+    """Repeated verbose runs don't stack up handlers and duplicate log lines."""
+    import logging
+    from construction_assistant import langgraph_agent
+
+    module_logger = logging.getLogger(langgraph_agent.__name__)
+    agent = LangGraphAgent(use_llm=False)
+    try:
+        for _ in range(3):
+            agent.run("Roofing bids for P-1", verbose=True)
+        assert module_logger.handlers.count(langgraph_agent._verbose_handler) == 1
+    finally:
+        module_logger.removeHandler(langgraph_agent._verbose_handler)
+        module_logger.setLevel(logging.NOTSET)
+
+
+def test_agent_instances_have_no_attribute_dict():
+    """LangGraphAgent declares __slots__, so instances carry no __dict__."""
+    agent = LangGraphAgent(use_llm=False)
+
+    assert not hasattr(agent, "__dict__")
+    assert agent.run("Roofing bids for P-1")["project_id"] == "P-1"
+
+
+def test_get_agent_reuses_a_built_agent_per_settings():
+    """get_agent returns one compiled agent per settings, shared across calls."""
+    from construction_assistant import get_agent
+
+    agent = get_agent(top_n=2, use_llm=False)
+
+    assert agent.compiled_graph is not None
+    assert get_agent(top_n=2, use_llm=False) is agent
+    assert get_agent(top_n=3, use_llm=False) is not agent
+    assert len(agent.run("Roofing bids for P-1")["comparison"]["top"]) == 2
+
+
+def test_run_many_starts_longest_prompts_first():
+    """Long prompts are scheduled first, and results still follow input order."""
+    import json
+
+    started = []
+
+    async def fake_ainvoke(messages):
+        request = messages[-1]["content"]
+        started.append(len(request))
+        return Mock(content=json.dumps({"project_id": request.split()[-1], "scope": None}))
+
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm_class.return_value.ainvoke.side_effect = fake_ainvoke
+        agent = LangGraphAgent(gemini_api_key="key")
+        agent.parse_cache = None
+
+        prompts = ["P-1", "Urgent bids, fast, for P-2", "Bids for P-3"]
+        results = agent.run_many(prompts, max_concurrency=1)
+
+    assert started == sorted(started, reverse=True)
+    assert [result["project_id"] for result in results] == ["P-1", "P-2", "P-3"]
+
+
+def test_llm_writes_the_recommendation_even_for_conclusive_prompts():
+    """By default the LLM is asked about every prompt, so its template is kept."""
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm = mock_llm_class.return_value
+        mock_llm.invoke.return_value = Mock(content=(
+            '{"project_id": "P-1", "scope": "roofing", "recommendation_template": "Go with {subcontractor}."}'
+        ))
+        agent = LangGraphAgent(gemini_api_key="key")
+        agent.parse_cache = None
+
+        parsed = agent._parse_node({"prompt": "Roofing bids for P-1"})
+
+    assert parsed["recommendation_template"] == "Go with {subcontractor}."
+    mock_llm.invoke.assert_called_once()
+
+
+def test_conclusive_regex_parse_skips_the_llm_with_regex_first():
+    """With regex_first, one project id plus a scope keyword is parsed without an LLM call."""
+    with patch("construction_assistant.langgraph_agent.ChatGoogleGenerativeAI") as mock_llm_class:
+        mock_llm = mock_llm_class.return_value
+        mock_llm.invoke.return_value = Mock(content='{"project_id": "P-9", "scope": "roofing"}')
+        agent = LangGraphAgent(gemini_api_key="key", regex_first=True)
+        agent.parse_cache = None
+
+        clear = agent._parse_node({"prompt": "Roofing bids for P-1"})
+        assert clear["project_id"] == "P-1"
+        mock_llm.invoke.assert_not_called()
+
+        agent._parse_node({"prompt": "Roofing bids for P-1, or was it P-9?"})
+        agent._parse_node({"prompt": "Bids for P-1"})
+        assert mock_llm.invoke.call_count == 2
+
+
+def test_heavy_dependencies_are_imported_on_first_use():
+    """Importing the package is cheap, and regex-only runs never import Gemini."""
+    import os
+    import subprocess
+    import sys
+
+    import construction_assistant
+
+    script = (
+        "import sys, construction_assistant as ca\n"
+        "assert 'langgraph' not in sys.modules\n"
+        "ca.LangGraphAgent(use_llm=False).run('Roofing bids for P-1')\n"
+        "assert 'langgraph' in sys.modules\n"
+        "assert 'langchain_google_genai' not in sys.modules\n"
+    )
+    package_root = os.path.dirname(os.path.dirname(construction_assistant.__file__))
+    env = {**os.environ, "PYTHONPATH": package_root}
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_project_ids_are_found_case_insensitively_and_upper_cased():
+    """Lower-case ids match without upper-casing the prompt, and come back upper-cased."""
+    from construction_assistant.patterns import find_project_id, find_project_ids
+
+    assert find_project_id("bids for ab-12 and P-123") == "AB-12"
+    assert find_project_ids("bids for ab-12, Xy7 and P-123") == ["AB-12", "XY7", "P-123"]
+    assert find_project_id("roofing, no id here") is None
@@ -7,11 +7,15 @@ Tests cover:
 - AsyncIO vs ThreadPoolExecutor modes
 """
 import pytest
+import threading
 import time
 from construction_assistant.parallel_executor import (
+    BatchingToolExecutor,
     ParallelToolExecutor,
+    ToolCall,
     create_parallel_executor
 )
+from construction_assistant.tool_cache import ToolCache
 
 
 class TestParallelToolExecutor:
@@ -62,8 +66,9 @@ class TestParallelToolExecutor:
             execution_times.append(time.time() - start)
             return {"tool": tool_name, "result": "success"}
         
+        # Canonicalized up front so dict parsing stays out of the timed region
         tool_calls = [
-            {"id": f"call-{i}", "tool": f"tool_{i}", "tool_input": {"p": i}}
+            ToolCall(id=f"call-{i}", tool=f"tool_{i}", tool_input={"p": i})
             for i in range(3)
         ]
         
@@ -138,6 +143,60 @@ class TestParallelToolExecutor:
         assert len(results) == 2
         assert "call-1" in results
         assert "call-2" in results
+    
+    def test_tool_call_from_dict_normalizes_formats(self):
+        """Test that both dict formats canonicalize to the same ToolCall."""
+        a = ToolCall.from_dict({"id": "call-1", "tool": "tool_a", "tool_input": {"p": 1}})
+        b = ToolCall.from_dict({"id": "call-1", "name": "tool_a", "input": {"p": 1}})
+        
+        assert a == b
+        assert (a.id, a.tool, a.tool_input) == ("call-1", "tool_a", {"p": 1})
+        assert ToolCall.from_dict({"id": "call-2", "tool": "tool_b"}).tool_input == {}
+    
+    def test_tool_call_from_dict_reads_langchain_and_openai_formats(self):
+        """Test the 'args' / 'arguments' keys and the tool-name id fallback."""
+        a = ToolCall.from_dict({"id": "call-1", "name": "tool_a", "args": {"p": 1}})
+        b = ToolCall.from_dict({"tool_call_id": "call-1", "name": "tool_a", "arguments": '{"p": 1}'})
+        
+        assert a == b == ToolCall(id="call-1", tool="tool_a", tool_input={"p": 1})
+        assert ToolCall.from_dict({"name": "tool_b"}, 3).id == "tool_b_3"
+    
+    def test_malformed_arguments_become_an_error_result(self):
+        """Test that undecodable JSON arguments fail only their own call."""
+        executor = ParallelToolExecutor(use_asyncio=False)
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"tool": tool_name, **tool_input}
+        
+        tool_calls = [
+            {"name": "tool_a", "arguments": '{"p": 1'},
+            {"name": "tool_a", "arguments": '{"p": 2}'},
+        ]
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        executor.shutdown()
+        
+        assert "Invalid JSON" in results["tool_a_0"]["error"]
+        assert results["tool_a_1"] == {"tool": "tool_a", "p": 2}
+    
+    def test_execute_accepts_tool_call_instances(self):
+        """Test that pre-canonicalized ToolCalls can be passed directly."""
+        executor = ParallelToolExecutor(use_asyncio=False)
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"tool": tool_name, **tool_input}
+        
+        tool_calls = [
+            ToolCall(id="call-1", tool="tool_a", tool_input={"p": 1}),
+            {"id": "call-2", "name": "tool_b", "input": {"p": 2}},
+        ]
+        
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        executor.shutdown()
+        
+        assert results == {
+            "call-1": {"tool": "tool_a", "p": 1},
+            "call-2": {"tool": "tool_b", "p": 2},
+        }
 
 
 class TestExecutorModes:
@@ -184,6 +243,257 @@ class TestExecutorModes:
         # Should execute successfully (may use fallback)
         assert len(results) == 2
         assert all("tool" in v for v in results.values())
+    
+    def test_asyncio_native_coroutine_tools(self):
+        """Test that an async invoke function is awaited concurrently on the loop."""
+        import asyncio
+        
+        executor = ParallelToolExecutor(max_workers=1, use_asyncio=True)
+        
+        def mock_invoke(tool_name, tool_input):
+            raise AssertionError("sync path should not be used")
+        
+        async def mock_ainvoke(tool_name, tool_input):
+            await asyncio.sleep(0.1)
+            if tool_name == "fail_tool":
+                raise ValueError("boom")
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": f"call-{i}", "tool": f"tool_{i}", "tool_input": {}}
+            for i in range(3)
+        ] + [{"id": "call-fail", "tool": "fail_tool", "tool_input": {}}]
+        
+        start = time.time()
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke, mock_ainvoke)
+        elapsed = time.time() - start
+        
+        # One worker thread, yet all four calls overlap on the event loop
+        assert elapsed < 0.3
+        assert results["call-0"] == {"tool": "tool_0"}
+        assert results["call-fail"] == {"error": "boom"}
+        executor.shutdown()
+    
+    def test_aexecute_tools_parallel_from_running_loop(self):
+        """Test that async callers can await the executor on their own loop."""
+        import asyncio
+        
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=True)
+        
+        async def mock_ainvoke(tool_name, tool_input):
+            await asyncio.sleep(0)
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "tool_a", "tool_input": {}},
+            {"id": "call-2", "name": "tool_b", "input": {}},
+        ]
+        
+        async def caller():
+            return await executor.aexecute_tools_parallel(tool_calls, None, mock_ainvoke)
+        
+        results = asyncio.run(caller())
+        executor.shutdown()
+        
+        assert results == {"call-1": {"tool": "tool_a"}, "call-2": {"tool": "tool_b"}}
+    
+    def test_asyncio_event_loop_reused_across_calls(self):
+        """Test that the asyncio path reuses one event loop between batches."""
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=True)
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "tool_a", "tool_input": {}},
+            {"id": "call-2", "tool": "tool_b", "tool_input": {}},
+        ]
+        
+        executor.execute_tools_parallel(tool_calls, mock_invoke)
+        first_loop = executor._loop
+        executor.execute_tools_parallel(tool_calls, mock_invoke)
+        
+        assert first_loop is not None
+        assert executor._loop is first_loop
+        
+        executor.shutdown()
+        assert first_loop.is_closed()
+    
+    def test_asyncio_path_runs_batches_from_different_threads_concurrently(self):
+        """Test that callers on different threads share the loop without waiting on each other."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        executor = ParallelToolExecutor(max_workers=4, use_asyncio=True)
+        
+        def mock_invoke(tool_name, tool_input):
+            time.sleep(0.2)
+            return {"tool": tool_name}
+        
+        def run_batch(caller):
+            tool_calls = [{"id": f"{caller}-{i}", "tool": f"tool_{i}", "tool_input": {}} for i in range(2)]
+            return executor.execute_tools_parallel(tool_calls, mock_invoke)
+        
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            results = list(callers.map(run_batch, ["a", "b"]))
+        elapsed = time.time() - start
+        executor.shutdown()
+        
+        assert results == [{f"{c}-{i}": {"tool": f"tool_{i}"} for i in range(2)} for c in "ab"]
+        assert elapsed < 0.35
+    
+    @pytest.mark.parametrize("use_asyncio", [False, True])
+    def test_context_vars_propagate_to_workers(self, use_asyncio):
+        """Test that caller contextvars (e.g. tracing ids) are visible in tools."""
+        import contextvars
+        
+        trace_id = contextvars.ContextVar("trace_id", default=None)
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=use_asyncio)
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"trace_id": trace_id.get()}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "tool_a", "tool_input": {}},
+            {"id": "call-2", "tool": "tool_b", "tool_input": {}},
+        ]
+        
+        token = trace_id.set("trace-123")
+        try:
+            results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        finally:
+            trace_id.reset(token)
+            executor.shutdown()
+        
+        assert results["call-1"] == {"trace_id": "trace-123"}
+        assert results["call-2"] == {"trace_id": "trace-123"}
+    
+    @pytest.mark.parametrize("use_asyncio", [False, True])
+    def test_slow_tool_times_out_without_holding_up_others(self, use_asyncio):
+        """Test that a call over the timeout gets an error result, the rest their results."""
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=use_asyncio)
+        
+        def mock_invoke(tool_name, tool_input):
+            if tool_name == "slow_tool":
+                time.sleep(0.5)
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "slow_tool", "tool_input": {}},
+            {"id": "call-2", "tool": "fast_tool", "tool_input": {}},
+        ]
+        
+        start = time.time()
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke, timeout=0.1)
+        elapsed = time.time() - start
+        executor.shutdown()
+        
+        assert results == {"call-1": {"error": "timeout"}, "call-2": {"tool": "fast_tool"}}
+        assert elapsed < 0.4
+    
+    @pytest.mark.parametrize("use_asyncio", [False, True])
+    def test_timeout_counts_from_when_each_call_starts(self, use_asyncio):
+        """Test that calls queued behind a full pool aren't timed out for waiting."""
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=use_asyncio)
+        
+        def mock_invoke(tool_name, tool_input):
+            time.sleep(0.3)
+            return {"tool": tool_name}
+        
+        tool_calls = [{"id": f"call-{i}", "tool": f"tool_{i}", "tool_input": {}} for i in range(4)]
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke, timeout=0.5)
+        executor.shutdown()
+        
+        assert results == {f"call-{i}": {"tool": f"tool_{i}"} for i in range(4)}
+    
+    def test_timed_out_call_does_not_hold_up_later_calls(self):
+        """Test that later calls don't queue behind a worker stuck on a timed-out call."""
+        executor = ParallelToolExecutor(max_workers=1, use_asyncio=False)
+        
+        def mock_invoke(tool_name, tool_input):
+            time.sleep(0.5 if tool_name == "slow_tool" else 0)
+            return {"tool": tool_name}
+        
+        executor.execute_tools_parallel(
+            [{"id": "call-1", "tool": "slow_tool", "tool_input": {}}], mock_invoke, timeout=0.1
+        )
+        start = time.time()
+        results = executor.execute_tools_parallel(
+            [{"id": "call-2", "tool": "fast_tool", "tool_input": {}}], mock_invoke, timeout=0.1
+        )
+        
+        assert results == {"call-2": {"tool": "fast_tool"}}
+        assert time.time() - start < 0.3
+        executor.shutdown()
+    
+    @pytest.mark.parametrize("use_asyncio", [False, True])
+    def test_calls_queued_behind_a_hung_call_are_not_stuck(self, use_asyncio):
+        """Test that calls queued on a saturated pool move off it once a call times out."""
+        executor = ParallelToolExecutor(max_workers=1, use_asyncio=use_asyncio)
+        release = threading.Event()
+        
+        def mock_invoke(tool_name, tool_input):
+            if tool_name == "hung_tool":
+                release.wait()
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "hung_tool", "tool_input": {}},
+            {"id": "call-2", "tool": "fast_tool", "tool_input": {}},
+        ]
+        start = time.time()
+        try:
+            results = executor.execute_tools_parallel(tool_calls, mock_invoke, timeout=0.2)
+        finally:
+            release.set()
+            executor.shutdown()
+        
+        assert results == {"call-1": {"error": "timeout"}, "call-2": {"tool": "fast_tool"}}
+        assert time.time() - start < 1.0
+    
+    def test_other_batch_queued_on_a_retired_pool_moves_to_a_fresh_one(self):
+        """Test that a batch sharing the executor isn't stuck behind another batch's hung call."""
+        executor = ParallelToolExecutor(max_workers=1, use_asyncio=False)
+        release = threading.Event()
+        
+        def mock_invoke(tool_name, tool_input):
+            if tool_name == "hung_tool":
+                release.wait()
+            return {"tool": tool_name}
+        
+        hung = threading.Thread(target=executor.execute_tools_parallel, args=(
+            [{"id": "call-1", "tool": "hung_tool", "tool_input": {}}], mock_invoke, None, 0.2
+        ))
+        hung.start()
+        time.sleep(0.05)
+        start = time.time()
+        try:
+            # Queued behind the hung call until that call's timeout retires the pool
+            results = executor.execute_tools_parallel(
+                [{"id": "call-2", "tool": "fast_tool", "tool_input": {}}], mock_invoke, timeout=0.2
+            )
+        finally:
+            release.set()
+            hung.join()
+            executor.shutdown()
+        
+        assert results == {"call-2": {"tool": "fast_tool"}}
+        assert time.time() - start < 1.0
+    
+    def test_single_call_honors_timeout(self):
+        """Test that a lone call is bounded too, instead of running inline."""
+        executor = ParallelToolExecutor(max_workers=1, use_asyncio=False)
+        
+        def mock_invoke(tool_name, tool_input):
+            time.sleep(0.5)
+            return {"tool": tool_name}
+        
+        results = executor.execute_tools_parallel(
+            [{"id": "call-1", "tool": "slow_tool", "tool_input": {}}], mock_invoke, timeout=0.1
+        )
+        executor.shutdown()
+        
+        assert results == {"call-1": {"error": "timeout"}}
 
 
 class TestExecutorPerformance:
@@ -198,7 +508,7 @@ class TestExecutorPerformance:
             return {"result": tool_name}
         
         tool_calls = [
-            {"id": f"call-{i}", "tool": f"tool_{i}", "tool_input": {}}
+            ToolCall(id=f"call-{i}", tool=f"tool_{i}", tool_input={})
             for i in range(3)
         ]
         
@@ -220,9 +530,7 @@ class TestExecutorPerformance:
         def mock_invoke(tool_name, tool_input):
             return {"result": "success"}
         
-        tool_calls = [
-            {"id": "call-1", "tool": "tool_a", "tool_input": {}}
-        ]
+        tool_calls = [ToolCall(id="call-1", tool="tool_a", tool_input={})]
         
         # Single tool should execute quickly
         start = time.time()
@@ -247,6 +555,25 @@ class TestExecutorShutdown:
         # Can be called multiple times
         executor.shutdown()
     
+    def test_thread_pool_reused_across_calls(self):
+        """Test that batches share one long-lived worker pool."""
+        executor = ParallelToolExecutor(max_workers=2, use_asyncio=False)
+        pool = executor.executor
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "tool_a", "tool_input": {}},
+            {"id": "call-2", "tool": "tool_b", "tool_input": {}},
+        ]
+        
+        executor.execute_tools_parallel(tool_calls, mock_invoke)
+        executor.execute_tools_parallel(tool_calls, mock_invoke)
+        
+        assert executor.executor is pool
+        executor.shutdown()
+    
     def test_context_manager_cleanup(self):
         """Test context manager cleanup."""
         def mock_invoke(tool_name, tool_input):
@@ -275,7 +602,109 @@ class TestCreateParallelExecutor:
         assert executor.max_workers == 8
         assert executor.use_asyncio is False
     
+    def test_create_with_uvloop_option(self):
+        """Test that the uvloop option runs batches whether or not uvloop is installed."""
+        executor = create_parallel_executor(max_workers=2, use_uvloop=True)
+        
+        def mock_invoke(tool_name, tool_input):
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "tool_a", "tool_input": {}},
+            {"id": "call-2", "tool": "tool_b", "tool_input": {}},
+        ]
+        
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        executor.shutdown()
+        
+        assert len(results) == 2
+    
     def test_create_returns_executor(self):
         """Test that factory returns proper executor."""
         executor = create_parallel_executor()
         assert isinstance(executor, ParallelToolExecutor)
+
+
+class TestExecutorCaching:
+    """Tests for skipping dispatch of cached tool calls."""
+    
+    def test_cached_calls_skip_dispatch(self):
+        """Test that repeated (tool, input) pairs are served from the cache."""
+        invocations = []
+        
+        def mock_invoke(tool_name, tool_input):
+            invocations.append((tool_name, tool_input["scope"]))
+            if tool_input["scope"] == "bad":
+                raise ValueError("bad scope")
+            return {"scope": tool_input["scope"]}
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "market", "tool_input": {"scope": "roofing"}},
+            {"id": "call-2", "tool": "market", "tool_input": {"scope": "bad"}},
+        ]
+        
+        with ParallelToolExecutor(use_asyncio=False, cache=ToolCache()) as executor:
+            first = executor.execute_tools_parallel(tool_calls, mock_invoke)
+            second = executor.execute_tools_parallel(
+                [{"id": "call-3", "name": "market", "input": {"scope": "roofing"}}] + tool_calls[1:],
+                mock_invoke,
+            )
+        
+        assert first["call-1"] == {"scope": "roofing"}
+        assert second["call-3"] == {"scope": "roofing"}
+        # Errors are not cached, so the failing call is dispatched again
+        assert "error" in second["call-2"]
+        assert invocations.count(("market", "roofing")) == 1
+        assert invocations.count(("market", "bad")) == 2
+
+
+class TestBatchingToolExecutor:
+    """Tests for coalescing batch-capable tool calls."""
+    
+    def test_batchable_calls_dispatched_once_per_chunk(self):
+        """Test that same-tool calls are grouped and results scattered back by id."""
+        dispatched = []
+        
+        def mock_invoke(tool_name, tool_input):
+            dispatched.append(tool_name)
+            if tool_name == "market":
+                return [{"scope": item["scope"]} for item in tool_input["batch"]]
+            return {"tool": tool_name}
+        
+        tool_calls = [
+            {"id": f"call-{i}", "tool": "market", "tool_input": {"scope": f"s{i}"}}
+            for i in range(5)
+        ] + [{"id": "call-other", "tool": "other", "tool_input": {}}]
+        
+        with BatchingToolExecutor(
+            ParallelToolExecutor(use_asyncio=False),
+            batch_tools=["market"],
+            max_batch_size=2,
+        ) as executor:
+            results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        
+        # 5 market calls -> 3 chunks, plus one unbatched call
+        assert sorted(dispatched) == ["market", "market", "market", "other"]
+        assert set(results) == {f"call-{i}" for i in range(5)} | {"call-other"}
+        for i in range(5):
+            assert results[f"call-{i}"] == {"scope": f"s{i}"}
+        assert results["call-other"] == {"tool": "other"}
+    
+    def test_failed_batch_reports_error_for_each_member(self):
+        """Test that a failing batch dispatch marks every member call as failed."""
+        def mock_invoke(tool_name, tool_input):
+            raise RuntimeError("endpoint down")
+        
+        tool_calls = [
+            {"id": "call-1", "tool": "market", "tool_input": {}},
+            {"id": "call-2", "tool": "market", "tool_input": {}},
+        ]
+        
+        executor = BatchingToolExecutor(batch_tools=["market"])
+        results = executor.execute_tools_parallel(tool_calls, mock_invoke)
+        executor.shutdown()
+        
+        assert results == {
+            "call-1": {"error": "endpoint down"},
+            "call-2": {"error": "endpoint down"},
+        }
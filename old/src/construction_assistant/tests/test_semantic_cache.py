@@ -0,0 +1,54 @@
+"""Tests for the similarity-based LLM result cache.
+
+Tests cover:
+- Hits for reworded prompts above the similarity threshold
+- Exact-match buckets
+- Per-bucket size bound
+"""
+from construction_assistant.semantic_cache import SemanticCache
+
+
+VOCAB = ("foundation", "works", "bids", "project", "roofing", "on", "for")
+
+
+def bag_of_words(text):
+    """Tiny deterministic embedder: word counts over a fixed vocabulary."""
+    words = text.lower().replace(",", " ").split()
+    return [float(words.count(term)) for term in VOCAB]
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache."""
+
+    def test_similar_prompt_hits_and_dissimilar_misses(self):
+        """Test that a reworded prompt reuses the stored value."""
+        cache = SemanticCache(bag_of_words, threshold=0.5)
+        vector, cached = cache.lookup("foundation works for project")
+        assert cached is None
+        cache.add(vector, {"scope": "foundation"})
+
+        assert cache.lookup("foundation bids, project")[1] == {"scope": "foundation"}
+        assert cache.lookup("roofing bids")[1] is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_buckets_never_share_entries(self):
+        """Test that identical prompts in different buckets don't hit."""
+        cache = SemanticCache(bag_of_words)
+        vector, _ = cache.lookup("foundation works", bucket="P-123")
+        cache.add(vector, "first", bucket="P-123")
+
+        assert cache.lookup("foundation works", bucket="P-123")[1] == "first"
+        assert cache.lookup("foundation works", bucket="P-124")[1] is None
+
+    def test_each_bucket_keeps_only_the_newest_entries(self):
+        """Test the size bound and clear()."""
+        cache = SemanticCache(bag_of_words, max_entries=2)
+        for value in ("foundation", "roofing", "bids"):
+            vector, _ = cache.lookup(value)
+            cache.add(vector, value)
+
+        assert len(cache) == 2
+        assert cache.lookup("foundation")[1] is None
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == cache.misses == 0
@@ -7,6 +7,7 @@ Tests cover:
 - Cache key generation
 - Integration with tools
 """
+import json
 import pytest
 import tempfile
 import os
@@ -19,6 +20,37 @@ from construction_assistant.tool_cache import (
 )
 
 
+class FakeClock:
+    """Manually advanced replacement for time.time in TTL tests."""
+    
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """A fake clock to pass as ToolCache's time_fn."""
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
+def shared_tmpdir(tmp_path_factory):
+    """One temporary directory for the whole session."""
+    return tmp_path_factory.mktemp("tool_cache")
+
+
+@pytest.fixture
+def cache_dir(shared_tmpdir):
+    """A fresh subdirectory of the shared directory, so tests don't see each other's entries."""
+    return tempfile.mkdtemp(dir=shared_tmpdir)
+
+
 class TestToolCacheBasics:
     """Tests for basic ToolCache functionality."""
     
@@ -28,11 +60,10 @@ class TestToolCacheBasics:
         assert cache.memory_cache == {}
         assert cache.cache_dir is None
     
-    def test_cache_with_directory(self):
+    def test_cache_with_directory(self, cache_dir):
         """Test ToolCache with file persistence."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = ToolCache(cache_dir=tmpdir)
-            assert os.path.exists(tmpdir)
+        cache = ToolCache(cache_dir=cache_dir)
+        assert os.path.exists(cache_dir)
     
     def test_cache_key_generation(self):
         """Test cache key generation is deterministic."""
@@ -48,6 +79,34 @@ class TestToolCacheBasics:
         key2 = ToolCache._generate_key("tool_name", {"param": "value2"})
         
         assert key1 != key2
+    
+    def test_cache_key_ignores_dict_order(self):
+        """Test that key order in the input does not change the cache key."""
+        key1 = ToolCache._generate_key("tool_name", {"a": 1, "b": {"x": 1, "y": 2}})
+        key2 = ToolCache._generate_key("tool_name", {"b": {"y": 2, "x": 1}, "a": 1})
+        
+        assert key1 == key2
+    
+    def test_cache_key_canonicalizes_read_only_mappings_and_sets(self):
+        """Test that frozen results and sets key like their sorted JSON forms."""
+        from types import MappingProxyType
+        
+        frozen = MappingProxyType({"y": 2, "x": 1})
+        key1 = ToolCache._generate_key("tool_name", {"prior": frozen, "tags": {"b", "a"}})
+        key2 = ToolCache._generate_key("tool_name", {"prior": {"x": 1, "y": 2}, "tags": ["a", "b"]})
+        
+        assert key1 == key2
+    
+    def test_cache_key_digest_is_memoized(self):
+        """Test that repeated identical inputs reuse the memoized digest."""
+        from construction_assistant.tool_cache import _key_from_payload
+        
+        _key_from_payload.cache_clear()
+        key1 = ToolCache._generate_key("tool_name", {"param": "memo"})
+        key2 = ToolCache._generate_key("tool_name", {"param": "memo"})
+        
+        assert key1 == key2
+        assert _key_from_payload.cache_info().hits == 1
 
 
 class TestCacheStorage:
@@ -68,6 +127,21 @@ class TestCacheStorage:
         
         assert cached == result
     
+    def test_cached_results_are_detached_from_callers(self):
+        """Test that mutating a hit or the original result, nested values included, leaves the entry intact."""
+        cache = ToolCache()
+        result = {"suppliers": 47, "regions": ["EU"]}
+        cache.set("fetch_market_data", {"scope": "excavation"}, result)
+        result["regions"].append("US")
+        
+        cached = cache.get("fetch_market_data", {"scope": "excavation"})
+        assert type(cached) is dict
+        assert json.loads(json.dumps(cached)) == {"suppliers": 47, "regions": ["EU"]}
+        cached["suppliers"] = 0
+        cached["regions"].append("APAC")
+        
+        assert cache.get("fetch_market_data", {"scope": "excavation"}) == {"suppliers": 47, "regions": ["EU"]}
+    
     def test_cache_miss_returns_none(self):
         """Test that cache miss returns None."""
         cache = ToolCache()
@@ -85,15 +159,130 @@ class TestCacheStorage:
         
         cache.set("tool", {"p": 2}, {"result": 2})
         assert cache.get_stats()["memory_entries"] == 2
+    
+    def test_cache_stats_count_hits_and_misses_per_tool(self):
+        """Test that lookups are counted overall and by tool name."""
+        cache = ToolCache()
+        cache.set("estimate", {"scope": "roofing"}, {"total": 1})
+        
+        cache.get("estimate", {"scope": "roofing"})
+        cache.get("estimate", {"scope": "roofing"})
+        cache.get("estimate", {"scope": "concrete"})
+        cache.get("fetch_market_data", {"scope": "roofing"})
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["hits_by_tool"] == {"estimate": 2}
+        assert stats["misses_by_tool"] == {"estimate": 1, "fetch_market_data": 1}
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the memory cache is bounded and evicts LRU entries."""
+        cache = ToolCache(max_size=2)
+        
+        cache.set("tool", {"p": 1}, {"r": 1})
+        cache.set("tool", {"p": 2}, {"r": 2})
+        
+        # Touch p=1 so p=2 becomes least recently used
+        assert cache.get("tool", {"p": 1}) == {"r": 1}
+        cache.set("tool", {"p": 3}, {"r": 3})
+        
+        assert cache.get_stats()["memory_entries"] == 2
+        assert cache.get("tool", {"p": 2}) is None
+        assert cache.get("tool", {"p": 1}) == {"r": 1}
+        assert cache.get("tool", {"p": 3}) == {"r": 3}
+    
+    def test_counter_policy_evicts_least_hit_entry(self):
+        """Test that the counter policy evicts by hit count, not recency."""
+        cache = ToolCache(max_size=3, policy="counter")
+        for name, hits in (("a", 3), ("b", 1), ("c", 2)):
+            cache.set("tool", {"p": name}, {"r": name})
+            for _ in range(hits):
+                cache.get("tool", {"p": name})
+        
+        assert cache.get("tool", {"p": "d"}) is None
+        cache.set("tool", {"p": "d"}, {"r": "d"})
+        
+        assert cache.get_stats()["memory_entries"] == 3
+        assert cache._generate_key("tool", {"p": "b"}) not in cache.memory_cache
+        assert cache.get("tool", {"p": "a"}) == {"r": "a"}
+    
+    def test_counter_policy_halves_saturated_counters(self):
+        """Test that counters are aged once one reaches COUNTER_MAX."""
+        cache = ToolCache(policy="counter")
+        cache.set("tool", {"p": "hot"}, {"r": 1})
+        cache.set("tool", {"p": "warm"}, {"r": 2})
+        for _ in range(10):
+            cache.get("tool", {"p": "warm"})
+        for _ in range(ToolCache.COUNTER_MAX):
+            cache.get("tool", {"p": "hot"})
+        
+        assert sorted(cache._counters.values()) == [5, ToolCache.COUNTER_MAX >> 1]
+    
+    def test_cache_rejects_unknown_policy(self):
+        """Test that a misspelled policy fails at construction."""
+        with pytest.raises(ValueError):
+            ToolCache(policy="lfu")
+    
+    def test_cache_rejects_non_positive_max_size(self):
+        """Test that an unbounded or empty memory tier can't be requested."""
+        with pytest.raises(ValueError):
+            ToolCache(max_size=0)
+    
+    def test_cache_admission_protects_hot_entries_from_scans(self):
+        """Test that one-off keys cannot evict a frequently read entry."""
+        cache = ToolCache(max_size=2)
+        
+        cache.set("tool", {"p": "hot"}, {"r": "hot"})
+        for _ in range(3):
+            assert cache.get("tool", {"p": "hot"}) == {"r": "hot"}
+        
+        # A scan of unique inputs: each is looked up once, then stored
+        for i in range(10):
+            assert cache.get("tool", {"p": i}) is None
+            cache.set("tool", {"p": i}, {"r": i})
+        
+        assert cache.get("tool", {"p": "hot"}) == {"r": "hot"}
+        assert cache.get_stats()["memory_entries"] == 2
+    
+    def test_cache_promotes_reused_entries_to_protected_segment(self):
+        """Test that a hit moves an entry out of probation, where evictions happen."""
+        cache = ToolCache(max_size=5)
+        hot_key = cache._generate_key("tool", {"p": "hot"})
+        
+        cache.set("tool", {"p": "hot"}, {"r": "hot"})
+        assert hot_key in cache._probation
+        assert cache.get("tool", {"p": "hot"}) == {"r": "hot"}
+        assert hot_key in cache._protected
+        
+        # Newer one-off entries are evicted among themselves
+        for i in range(10):
+            cache.get("tool", {"p": i})
+            cache.set("tool", {"p": i}, {"r": i})
+        
+        assert hot_key in cache.memory_cache
+        assert len(cache._probation) == 4
+        assert cache.get("tool", {"p": 9}) == {"r": 9}
+    
+    def test_cache_demotes_protected_overflow_to_probation(self):
+        """Test that the protected segment stays bounded without dropping entries."""
+        cache = ToolCache(max_size=5)
+        for i in range(5):
+            cache.set("tool", {"p": i}, {"r": i})
+            assert cache.get("tool", {"p": i}) == {"r": i}
+        
+        assert len(cache._protected) == cache._protected_size == 4
+        assert list(cache._probation) == [cache._generate_key("tool", {"p": 0})]
+        assert cache.get_stats()["memory_entries"] == 5
 
 
 class TestCacheExpiration:
     """Tests for cache TTL and expiration."""
     
-    def test_cache_expiration_ttl(self):
+    def test_cache_expiration_ttl(self, clock):
         """Test that cache entries expire after TTL."""
         # Create cache with 1-second TTL
-        cache = ToolCache(ttl_seconds=1)
+        cache = ToolCache(ttl_seconds=1, time_fn=clock)
         
         tool_input = {"scope": "roofing"}
         result = {"total": 36000}
@@ -104,89 +293,262 @@ class TestCacheExpiration:
         assert cache.get("estimate_cost", tool_input) == result
         
         # Wait for expiration
-        time.sleep(1.1)
+        clock.advance(1.1)
         
         # Should be expired now
         assert cache.get("estimate_cost", tool_input) is None
     
-    def test_cache_partial_expiration(self):
+    def test_cache_partial_expiration(self, clock):
         """Test that only expired entries are removed."""
-        cache = ToolCache(ttl_seconds=1)
+        cache = ToolCache(ttl_seconds=1, time_fn=clock)
         
         input1 = {"scope": "excavation"}
         input2 = {"scope": "roofing"}
         result = {"data": "value"}
         
         cache.set("tool", input1, result)
-        time.sleep(0.5)
+        clock.advance(0.5)
         cache.set("tool", input2, result)
         
-        time.sleep(0.7)
+        clock.advance(0.7)
         
         # First entry should be expired, second should be available
         assert cache.get("tool", input1) is None
         assert cache.get("tool", input2) == result
+    
+    def test_expired_entries_dropped_on_write(self, clock):
+        """Test that writes purge expired entries without a get on them."""
+        cache = ToolCache(ttl_seconds=1, time_fn=clock)
+        
+        cache.set("tool", {"p": 1}, {"r": 1})
+        clock.advance(1.1)
+        cache.set("tool", {"p": 2}, {"r": 2})
+        
+        assert cache.get_stats()["memory_entries"] == 1
+    
+    def test_file_cache_expiration_uses_injected_clock(self, clock, cache_dir):
+        """Test that persisted entries expire by the same clock."""
+        cache = ToolCache(cache_dir=cache_dir, ttl_seconds=1, time_fn=clock)
+        cache.set("tool", {"p": 1}, {"r": 1})
+        cache.flush()
+        
+        restarted = ToolCache(cache_dir=cache_dir, ttl_seconds=1, time_fn=clock)
+        assert restarted.get_stats()["file_entries"] == 1
+        
+        clock.advance(1.1)
+        assert restarted.get("tool", {"p": 1}) is None
+        assert restarted.get_stats()["file_entries"] == 0
+        cache.close()
+        restarted.close()
+    
+    def test_expired_memory_entry_skips_file_lookup(self, clock, cache_dir):
+        """Test that an expired memory hit is a miss without querying the store."""
+        cache = ToolCache(cache_dir=cache_dir, ttl_seconds=1, time_fn=clock)
+        cache.set("tool", {"p": 1}, {"r": 1})
+        clock.advance(1.1)
+        
+        def fail(key):
+            raise AssertionError("file store queried for a known-expired key")
+        
+        cache._load_from_file = fail
+        assert cache.get("tool", {"p": 1}) is None
+        assert cache.get_stats()["misses"] == 1
+        cache.close()
+
+class TestCacheInvalidation:
+    """Tests for per-tool TTLs and explicit invalidation."""
+    
+    def test_pure_tool_never_expires(self):
+        """Test that pure tools ignore the default TTL."""
+        cache = ToolCache(ttl_seconds=0)
+        cache.register_tool("estimate_project_cost", pure=True)
+        
+        cache.set("estimate_project_cost", {"scope": "roofing"}, {"total": 1})
+        cache.set("fetch_market_data", {"scope": "roofing"}, {"trend": "up"})
+        
+        assert cache.get("estimate_project_cost", {"scope": "roofing"}) == {"total": 1}
+        assert cache.get("fetch_market_data", {"scope": "roofing"}) is None
+    
+    def test_per_tool_ttl_override(self):
+        """Test that a per-tool TTL replaces the default and can be reset."""
+        cache = ToolCache(ttl_seconds=3600)
+        cache.register_tool("fetch_market_data", ttl=0)
+        
+        cache.set("fetch_market_data", {"scope": "roofing"}, {"trend": "up"})
+        assert cache.get("fetch_market_data", {"scope": "roofing"}) is None
+        
+        cache.register_tool("fetch_market_data")
+        cache.set("fetch_market_data", {"scope": "roofing"}, {"trend": "up"})
+        assert cache.get("fetch_market_data", {"scope": "roofing"}) == {"trend": "up"}
+    
+    def test_invalidate_single_input_and_whole_tool(self, cache_dir):
+        """Test invalidating one input, then every entry of a tool."""
+        cache = ToolCache(cache_dir=cache_dir)
+        for scope in ("roofing", "concrete"):
+            cache.set("fetch_market_data", {"scope": scope}, {"scope": scope})
+        cache.set("fetch_market_data_v2", {"scope": "roofing"}, {"v": 2})
+        
+        assert cache.invalidate("fetch_market_data", {"scope": "roofing"}) == 1
+        assert cache.get("fetch_market_data", {"scope": "roofing"}) is None
+        assert cache.get("fetch_market_data", {"scope": "concrete"}) == {"scope": "concrete"}
+        
+        assert cache.invalidate("fetch_market_data") == 1
+        assert cache.get("fetch_market_data", {"scope": "concrete"}) is None
+        # Tools sharing a name prefix are untouched
+        assert cache.get("fetch_market_data_v2", {"scope": "roofing"}) == {"v": 2}
+        assert cache.get_stats()["file_entries"] == 1
+        cache.close()
 
 
 class TestFilePersistence:
     """Tests for file-based cache persistence."""
     
-    def test_file_cache_save_and_load(self):
+    def test_file_cache_save_and_load(self, cache_dir):
         """Test saving to and loading from file cache."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = ToolCache(cache_dir=tmpdir, ttl_seconds=3600)
-            
-            tool_input = {"scope": "concrete"}
-            result = {"total": 12000}
-            
-            # Save to file cache
-            cache.set("estimate", tool_input, result)
-            
-            # Create new cache instance (simulating restart)
-            cache2 = ToolCache(cache_dir=tmpdir, ttl_seconds=3600)
-            
-            # Should load from file
-            cached = cache2.get("estimate", tool_input)
-            assert cached == result
+        cache = ToolCache(cache_dir=cache_dir, ttl_seconds=3600)
+        
+        tool_input = {"scope": "concrete"}
+        result = {"total": 12000}
+        
+        # Save to file cache; writes are committed in the background
+        cache.set("estimate", tool_input, result)
+        cache.flush()
+        
+        # Create new cache instance (simulating restart)
+        cache2 = ToolCache(cache_dir=cache_dir, ttl_seconds=3600)
+        
+        # Should load from file
+        cached = cache2.get("estimate", tool_input)
+        assert cached == result
+    
+    def test_queued_writes_are_committed_at_exit(self, cache_dir):
+        """Test that writes still queued when the process exits are not lost."""
+        import subprocess
+        import sys
+        
+        script = (
+            "from construction_assistant.tool_cache import ToolCache\n"
+            f"cache = ToolCache(cache_dir={cache_dir!r})\n"
+            "for i in range(2000):\n"
+            "    cache.set('estimate', {'i': i}, {'total': i})\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        subprocess.run([sys.executable, "-c", script], check=True, env=env)
+        
+        cache = ToolCache(cache_dir=cache_dir)
+        assert cache.get_stats()["file_entries"] == 2000
+        assert cache.get("estimate", {"i": 1999}) == {"total": 1999}
+        cache.close()
     
-    def test_file_cache_directory_creation(self):
+    def test_file_cache_round_trips_python_values(self, cache_dir):
+        """Test that persisted results keep types JSON would not preserve."""
+        cache = ToolCache(cache_dir=cache_dir)
+        result = {"total": 1.5, "items": (1, "a", None, True), 3: b"\x00raw"}
+        cache.set("estimate", {"scope": "roofing"}, result)
+        cache.close()
+        
+        loaded = ToolCache(cache_dir=cache_dir).get("estimate", {"scope": "roofing"})
+        
+        assert loaded == result
+    
+    def test_file_cache_ignores_rows_in_other_formats(self, cache_dir):
+        """Test that rows without the payload header are treated as misses."""
+        cache = ToolCache(cache_dir=cache_dir)
+        key = ToolCache._generate_key("estimate", {"scope": "roofing"})
+        cache._db.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, b'{"total": 1}', time.time() + 60),
+        )
+        
+        assert cache.get("estimate", {"scope": "roofing"}) is None
+        cache.close()
+    
+    def test_file_cache_writes_are_batched_in_background(self, cache_dir):
+        """Test that queued writes are readable before and after the commit."""
+        cache = ToolCache(cache_dir=cache_dir, max_size=1)
+        
+        for i in range(50):
+            cache.set("tool", {"p": i}, {"r": i})
+        
+        # Evicted from memory, served from the queued or committed write
+        assert cache.get("tool", {"p": 0}) == {"r": 0}
+        
+        cache.close()
+        cache2 = ToolCache(cache_dir=cache_dir)
+        assert cache2.get_stats()["file_entries"] == 50
+        assert cache2.get("tool", {"p": 49}) == {"r": 49}
+        cache2.close()
+    
+    def test_file_cache_evicts_oldest_writes_beyond_disk_cap(self, cache_dir):
+        """Test that the store is trimmed to the low-water mark, oldest first."""
+        cache = ToolCache(cache_dir=cache_dir, max_size=1, max_disk_bytes=2000)
+        for i in range(50):
+            cache.set("tool", {"p": i}, {"r": "x" * 100})
+        cache.flush()
+        
+        assert cache._stored_bytes() <= 2000
+        assert 0 < cache.get_stats()["file_entries"] < 50
+        assert cache.get("tool", {"p": 0}) is None
+        assert cache.get("tool", {"p": 48}) == {"r": "x" * 100}
+        cache.close()
+    
+    def test_file_cache_directory_creation(self, cache_dir):
         """Test that cache directory is created if it doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache_dir = os.path.join(tmpdir, "new_cache_dir")
-            assert not os.path.exists(cache_dir)
-            
-            cache = ToolCache(cache_dir=cache_dir)
-            assert os.path.exists(cache_dir)
+        new_dir = os.path.join(cache_dir, "new_cache_dir")
+        assert not os.path.exists(new_dir)
+        
+        cache = ToolCache(cache_dir=new_dir)
+        assert os.path.exists(new_dir)
     
-    def test_cache_clear_removes_files(self):
+    def test_cache_clear_removes_files(self, cache_dir):
         """Test that clearing cache removes file entries."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = ToolCache(cache_dir=tmpdir)
-            
-            cache.set("tool", {"p": 1}, {"r": 1})
-            cache.set("tool", {"p": 2}, {"r": 2})
-            
-            assert cache.get_stats()["file_entries"] > 0
-            
-            cache.clear()
-            
-            assert cache.get_stats()["memory_entries"] == 0
+        cache = ToolCache(cache_dir=cache_dir)
+        
+        cache.set("tool", {"p": 1}, {"r": 1})
+        cache.set("tool", {"p": 2}, {"r": 2})
+        
+        assert cache.get_stats()["file_entries"] > 0
+        
+        cache.clear()
+        
+        assert cache.get_stats()["memory_entries"] == 0
+        assert cache.get_stats()["file_entries"] == 0
+    
+    def test_file_cache_uses_single_database(self, cache_dir):
+        """Test that entries share one database file instead of a file per key."""
+        cache = ToolCache(cache_dir=cache_dir)
+        
+        for i in range(20):
+            cache.set("tool", {"p": i}, {"r": i})
+        
+        assert cache.get_stats()["file_entries"] == 20
+        assert not [f for f in os.listdir(cache_dir) if f.endswith(".json")]
+        assert os.path.exists(os.path.join(cache_dir, ToolCache.DB_FILENAME))
+        cache.close()
+    
+    def test_file_cache_reads_through_memory_map(self, cache_dir):
+        """Test that the database is opened with memory-mapped I/O enabled."""
+        cache = ToolCache(cache_dir=cache_dir)
+        
+        (mmap_size,) = cache._db.execute("PRAGMA mmap_size").fetchone()
+        
+        assert mmap_size == ToolCache.MMAP_SIZE
+        cache.close()
 
 
 class TestGlobalCache:
     """Tests for global cache instance."""
     
-    def test_init_tool_cache(self):
+    def test_init_tool_cache(self, cache_dir):
         """Test initialization of global cache."""
         # Initialize with temp directory
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = init_tool_cache(cache_dir=tmpdir, ttl_seconds=600)
-            
-            assert get_tool_cache() == cache
-            
-            # Use it
-            cache.set("test", {"p": 1}, {"result": 1})
-            assert cache.get("test", {"p": 1}) == {"result": 1}
+        cache = init_tool_cache(cache_dir=cache_dir, ttl_seconds=600)
+        
+        assert get_tool_cache() == cache
+        
+        # Use it
+        cache.set("test", {"p": 1}, {"result": 1})
+        assert cache.get("test", {"p": 1}) == {"result": 1}
     
     def test_get_tool_cache_before_init(self):
         """Test that get_tool_cache returns None before initialization."""
@@ -206,28 +568,46 @@ class TestGlobalCache:
 class TestCachedToolDecorator:
     """Tests for @cached_tool decorator."""
     
-    def test_cached_tool_decorator_basic(self):
+    def test_cached_tool_decorator_basic(self, cache_dir):
         """Test basic cached_tool decorator."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = init_tool_cache(cache_dir=tmpdir)
-            
-            call_count = 0
-            
-            @cached_tool(cache=cache)
-            def expensive_tool(param: str) -> dict:
-                nonlocal call_count
-                call_count += 1
-                return {"result": param, "computed": True}
-            
-            # First call should execute
-            result1 = expensive_tool("test")
-            assert call_count == 1
-            assert result1["computed"] is True
-            
-            # Second call should use cache
-            result2 = expensive_tool("test")
-            assert call_count == 1  # Still 1, not 2
-            assert result2 == result1
+        cache = init_tool_cache(cache_dir=cache_dir)
+        
+        call_count = 0
+        
+        @cached_tool(cache=cache)
+        def expensive_tool(param: str) -> dict:
+            nonlocal call_count
+            call_count += 1
+            return {"result": param, "computed": True}
+        
+        # First call should execute
+        result1 = expensive_tool("test")
+        assert call_count == 1
+        assert result1["computed"] is True
+        
+        # Second call should use cache
+        result2 = expensive_tool("test")
+        assert call_count == 1  # Still 1, not 2
+        assert result2 == result1
+    
+    def test_cached_tool_hits_and_misses_return_the_same_type(self, cache_dir):
+        """Test that memory and file hits are plain, independent dicts like the miss."""
+        def tool_func(scope: str) -> dict:
+            return {"scope": scope, "items": [1]}
+        
+        cache = ToolCache(cache_dir=cache_dir)
+        miss = cached_tool(cache=cache)(tool_func)("roofing")
+        hit = cached_tool(cache=cache)(tool_func)("roofing")
+        cache.close()
+        # A fresh cache on the same directory can only answer from the file
+        reopened = ToolCache(cache_dir=cache_dir)
+        file_hit = cached_tool(cache=reopened)(tool_func)("roofing")
+        assert reopened.get_stats()["hits"] == 1
+        reopened.close()
+        
+        assert type(miss) is type(hit) is type(file_hit) is dict
+        hit["items"].append(2)
+        assert miss == file_hit == {"scope": "roofing", "items": [1]}
     
     def test_cached_tool_different_params(self):
         """Test cached_tool with different parameters."""
@@ -249,6 +629,146 @@ class TestCachedToolDecorator:
         assert result1["param"] == "a"
         assert result2["param"] == "b"
     
+    def test_cached_tool_positional_and_keyword_share_entry(self):
+        """Test that positional and keyword calls map to the same cache entry."""
+        cache = ToolCache()
+        
+        call_count = 0
+        
+        @cached_tool(cache=cache)
+        def tool_func(scope: str, complexity: str = "medium") -> dict:
+            nonlocal call_count
+            call_count += 1
+            return {"scope": scope, "complexity": complexity}
+        
+        tool_func("roofing", "high")
+        tool_func(scope="roofing", complexity="high")
+        
+        assert call_count == 1
+    
+    def test_cached_tool_caches_none_results(self, cache_dir):
+        """Test that a tool returning None runs once, also after a restart."""
+        call_count = 0
+        
+        def lookup(scope: str):
+            nonlocal call_count
+            call_count += 1
+            return None
+        
+        cache = ToolCache(cache_dir=cache_dir)
+        tool_func = cached_tool(cache=cache)(lookup)
+        assert tool_func("roofing") is None
+        assert tool_func("roofing") is None
+        assert call_count == 1
+        cache.close()
+        
+        restarted = cached_tool(cache=ToolCache(cache_dir=cache_dir))(lookup)
+        assert restarted("roofing") is None
+        assert call_count == 1
+    
+    def test_cached_tool_mixed_arguments_match_bind(self):
+        """Test that the fast argument mapping agrees with Signature.bind."""
+        import inspect
+        
+        cache = ToolCache()
+        seen = []
+        
+        def tool_func(scope, complexity="medium", region="EU"):
+            return {"scope": scope, "complexity": complexity, "region": region}
+        
+        wrapped = cached_tool(cache=cache)(tool_func)
+        bind = inspect.signature(tool_func).bind
+        calls = [
+            (("roofing",), {}),
+            (("roofing", "high"), {}),
+            (("roofing",), {"complexity": "high"}),
+            ((), {"scope": "roofing", "complexity": "high"}),
+            (("roofing",), {"region": "US", "complexity": "high"}),
+        ]
+        for args, kwargs in calls:
+            wrapped(*args, **kwargs)
+            seen.append(ToolCache._generate_key("tool_func", bind(*args, **kwargs).arguments))
+        
+        # Calls 2-4 bind to the same arguments, so they share one entry
+        assert cache.get_stats()["hits"] == 2
+        assert len(cache.memory_cache) == len(set(seen)) == 3
+        assert set(cache.memory_cache) == set(seen)
+    
+    def test_cached_tool_invalid_calls_still_raise(self):
+        """Test that calls bind() rejects raise instead of hitting the cache."""
+        cache = ToolCache()
+        
+        @cached_tool(cache=cache)
+        def tool_func(scope, complexity="medium"):
+            return {"scope": scope}
+        
+        tool_func("roofing", "high")
+        with pytest.raises(TypeError):
+            tool_func("roofing", "high", "extra")
+        with pytest.raises(TypeError):
+            tool_func("roofing", scope="roofing")
+        with pytest.raises(TypeError):
+            tool_func("roofing", unknown=1)
+    
+    def test_cached_tool_keeps_varargs_calls_distinct(self):
+        """Test that packed *args never share an entry with an explicit tuple."""
+        cache = ToolCache()
+        
+        @cached_tool(cache=cache)
+        def tool_func(scope, *extra) -> dict:
+            return {"scope": scope, "extra": list(extra)}
+        
+        assert tool_func("roofing", "a", "b") == {"scope": "roofing", "extra": ["a", "b"]}
+        assert tool_func("roofing", ("a", "b")) == {"scope": "roofing", "extra": [("a", "b")]}
+    
+    def test_cached_tool_serializes_input_once_per_call(self, monkeypatch):
+        """Test that lookup and store on a miss share one key computation."""
+        import construction_assistant.tool_cache as cache_module
+        
+        serialized = []
+        dumps_sorted = cache_module._dumps_sorted
+        
+        def counting_dumps(value):
+            serialized.append(value)
+            return dumps_sorted(value)
+        
+        monkeypatch.setattr(cache_module, "_dumps_sorted", counting_dumps)
+        cache = ToolCache()
+        
+        @cached_tool(cache=cache, max_result_bytes=None)
+        def tool_func(scope: str) -> dict:
+            return {"scope": scope}
+        
+        tool_func("roofing")
+        assert serialized == [{"scope": "roofing"}]
+        assert tool_func("roofing") == {"scope": "roofing"}
+        assert len(serialized) == 2
+    
+    def test_cached_tool_bypasses_oversized_inputs_and_results(self):
+        """Test that large inputs skip the cache and large results aren't stored."""
+        cache = ToolCache()
+        
+        call_count = 0
+        
+        @cached_tool(cache=cache, max_key_bytes=100, max_result_bytes=100)
+        def tool_func(scope: str, size: int = 1) -> dict:
+            nonlocal call_count
+            call_count += 1
+            return {"scope": scope, "payload": "x" * size}
+        
+        tool_func("x" * 200)
+        tool_func("x" * 200)
+        assert call_count == 2
+        
+        tool_func("roofing", size=200)
+        tool_func("roofing", size=200)
+        assert call_count == 4
+        assert cache.get_stats()["memory_entries"] == 0
+        
+        tool_func("roofing")
+        tool_func("roofing")
+        assert call_count == 5
+    
     def test_cached_tool_no_cache(self):
         """Test cached_tool decorator when no cache is configured."""
         # Clear global cache
@@ -293,6 +813,36 @@ class TestCacheIntegration:
         cached = cache.get("fetch_data", input_dict)
         
         assert cached == result
+    
+    def test_concurrent_access_keeps_memory_tier_consistent(self):
+        """Threads sharing a cache leave the SLRU segments matching the entries."""
+        import sys
+        from concurrent.futures import ThreadPoolExecutor
+        
+        cache = ToolCache(max_size=8)
+        
+        def worker(seed: int) -> None:
+            for i in range(2000):
+                tool_input = {"n": (seed * 7 + i) % 24}
+                if cache.get("tool", tool_input) is None:
+                    cache.set("tool", tool_input, {"n": tool_input["n"]})
+                if i % 97 == 0:
+                    cache.invalidate("tool", tool_input)
+        
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(worker, range(8)))
+        finally:
+            sys.setswitchinterval(interval)
+        
+        probation, protected = set(cache._probation), set(cache._protected)
+        assert probation.isdisjoint(protected)
+        assert probation | protected == set(cache.memory_cache)
+        assert len(cache.memory_cache) <= cache.max_size
+        stats = cache.get_stats()
+        assert stats["hits"] + stats["misses"] == 8 * 2000
 
 
 class TestCacheErrorHandling:
@@ -310,16 +860,18 @@ class TestCacheErrorHandling:
         cache.set("tool", {"p": 1}, {"r": 1})
         assert cache.get("tool", {"p": 1}) == {"r": 1}
     
-    def test_cache_corrupted_file(self):
+    def test_cache_corrupted_file(self, cache_dir):
         """Test cache recovery from corrupted file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = ToolCache(cache_dir=tmpdir)
-            
-            # Manually create corrupted cache file
-            cache_file = os.path.join(tmpdir, "test_key.json")
-            with open(cache_file, "w") as f:
-                f.write("{ invalid json }")
-            
-            # Should handle gracefully
-            result = cache._load_from_file("test_key")
-            assert result is None
+        cache = ToolCache(cache_dir=cache_dir)
+        
+        # Manually store a corrupted cache entry
+        cache._db.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            ("test_key", "{ invalid json }", time.time() + 60),
+        )
+        
+        # Should handle gracefully
+        from construction_assistant.tool_cache import _MISS
+        
+        result = cache._load_from_file("test_key")
+        assert result is _MISS
@@ -9,7 +9,7 @@ This test suite validates:
 from unittest.mock import Mock, patch, MagicMock
 import pytest
 from construction_assistant.enhanced_langgraph_agent import EnhancedLangGraphAgent
-from construction_assistant.tools import fetch_market_data, estimate_project_cost, AVAILABLE_TOOLS
+from construction_assistant.tools import fetch_market_data, estimate_project_cost, batch, AVAILABLE_TOOLS, TOOL_INVOKERS
 
 
 class TestToolInvocation:
@@ -58,15 +58,116 @@ class TestToolInvocation:
             })
 
 
+    def test_tool_invokers_match_invoke(self):
+        """Test that the direct invokers return what .invoke() returns."""
+        inputs = {
+            "fetch_market_data": {"scope": "roofing", "unused": 1},
+            "estimate_project_cost": {"scope": "concrete", "complexity": "high"},
+            "batch": {"invocations": [{"tool_name": "fetch_market_data", "arguments": {"scope": "roofing"}}]},
+        }
+        for lc_tool in AVAILABLE_TOOLS:
+            tool_input = inputs[lc_tool.name]
+            assert TOOL_INVOKERS[lc_tool.name](tool_input) == lc_tool.invoke(tool_input)
+    
+    def test_tool_invokers_raise_like_invoke(self):
+        """Test that the direct invokers surface tool and schema errors."""
+        from langchain_core.tools.base import ToolException
+        from pydantic import ValidationError
+        
+        with pytest.raises(ToolException):
+            TOOL_INVOKERS["fetch_market_data"]({"scope": ""})
+        with pytest.raises(ValidationError):
+            TOOL_INVOKERS["estimate_project_cost"]({"complexity": "low"})
+    
+    def test_non_string_scope_is_rejected_by_schema(self):
+        """Test that argument validation, not the tool body, rejects bad types."""
+        from pydantic import ValidationError
+        
+        for lc_tool in AVAILABLE_TOOLS:
+            with pytest.raises(ValidationError):
+                lc_tool.invoke({"scope": 42})
+            with pytest.raises(ValidationError):
+                TOOL_INVOKERS[lc_tool.name]({"scope": ["roofing"]})
+    
+    def test_case_insensitive_arguments_share_a_cache_entry(self):
+        """Test that case-only argument differences hit the same entry."""
+        invoke = TOOL_INVOKERS["fetch_market_data"]
+        invoke.cache_clear()
+        
+        scopes = ("excavation", "Excavation", "EXCAVATION")
+        results = [invoke({"scope": scope}) for scope in scopes]
+        
+        assert results == [fetch_market_data.invoke({"scope": scope}) for scope in scopes]
+        assert invoke.cache_info().hits == 2
+    
+    @pytest.mark.parametrize("tool_input", [
+        {"scope": "Roofing", "complexity": "High"},
+        {"scope": "roofing", "complexity": "High"},
+        {"scope": "roofing ", "complexity": "high"},
+        {"scope": "   ", "complexity": "low"},
+    ])
+    def test_invokers_agree_with_invoke_on_any_spelling(self, tool_input):
+        """Test that hits and misses alike return what invoke() returns."""
+        invoke = TOOL_INVOKERS["estimate_project_cost"]
+        invoke.cache_clear()
+        invoke({"scope": tool_input["scope"].lower(), "complexity": tool_input["complexity"]})
+        
+        assert invoke(tool_input) == estimate_project_cost.invoke(tool_input)
+        assert TOOL_INVOKERS["fetch_market_data"]({"scope": tool_input["scope"]}) == (
+            fetch_market_data.invoke({"scope": tool_input["scope"]})
+        )
+    
+    def test_tool_output_keeps_its_case_and_whitespace_rules(self):
+        """Test that only case is ignored in lookups, and confidence compares complexity as given."""
+        assert estimate_project_cost.invoke({"scope": "roofing", "complexity": "High"})["confidence"] == "high"
+        assert estimate_project_cost.invoke({"scope": "roofing", "complexity": "high"})["confidence"] == "medium"
+        assert fetch_market_data.invoke({"scope": "roofing "}) == dict(
+            fetch_market_data.invoke({"scope": "general"}), scope="roofing "
+        )
+    
+    def test_read_only_tool_results_are_memoized(self):
+        """Test that repeated read-only calls reuse the first result."""
+        from langchain_core.tools.base import ToolException
+        
+        invoke = TOOL_INVOKERS["estimate_project_cost"]
+        invoke.cache_clear()
+        
+        first = invoke({"scope": "roofing", "complexity": "low"})
+        first["estimated_total"] = 0
+        second = invoke({"complexity": "low", "scope": "roofing"})
+        
+        assert second["estimated_total"] > 0
+        assert invoke.cache_info().hits == 1
+        # Nested values belong to the caller too
+        second["breakdown"]["labor"] = 0
+        assert invoke({"scope": "roofing", "complexity": "low"})["breakdown"]["labor"] > 0
+        # Failures raise every time rather than being cached
+        for _ in range(2):
+            with pytest.raises(ToolException):
+                invoke({"scope": "roofing", "complexity": "extreme"})
+        assert invoke.cache_info().hits == 2
+
+
 class TestToolsAvailable:
     """Tests for tool availability and configuration."""
     
     def test_available_tools_list(self):
         """Test that AVAILABLE_TOOLS contains expected tools."""
-        assert len(AVAILABLE_TOOLS) == 2
+        assert len(AVAILABLE_TOOLS) == 3
         tool_names = [t.name for t in AVAILABLE_TOOLS]
         assert "fetch_market_data" in tool_names
         assert "estimate_project_cost" in tool_names
+        assert "batch" in tool_names
+    
+    def test_precomputed_schemas_bind_like_the_tools(self):
+        """Test that binding the cached schemas equals binding the tool objects."""
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from construction_assistant.tools import AVAILABLE_TOOL_SCHEMAS
+        
+        llm = ChatGoogleGenerativeAI(model="gemini-3-pro-preview", google_api_key="test-key")
+        
+        assert isinstance(AVAILABLE_TOOLS, tuple)
+        assert llm.bind_tools(AVAILABLE_TOOL_SCHEMAS).kwargs == llm.bind_tools(AVAILABLE_TOOLS).kwargs
     
     def test_tools_have_proper_schema(self):
         """Test that tools have proper schema for LLM binding."""
@@ -74,10 +175,54 @@ class TestToolsAvailable:
             assert hasattr(tool, "name")
             assert hasattr(tool, "description")
             assert hasattr(tool, "args_schema")
-            assert tool.name in ["fetch_market_data", "estimate_project_cost"]
+            assert tool.name in ["fetch_market_data", "estimate_project_cost", "batch"]
             assert len(tool.description) > 0
 
 
+class TestBatchTool:
+    """Tests for the batch meta-tool."""
+    
+    def test_batch_returns_results_in_invocation_order(self):
+        """Test that each entry gets its tool's result, or its own error."""
+        results = batch.invoke({"invocations": [
+            {"tool_name": "estimate_project_cost", "arguments": {"scope": "roofing", "complexity": "bad"}},
+            {"tool_name": "fetch_market_data", "arguments": {"scope": "roofing"}},
+            {"tool_name": "batch", "arguments": {"invocations": []}},
+            {"tool_name": "fetch_market_data", "arguments": {"scope": 42}},
+        ]})
+        
+        assert "error" in results[0]
+        assert results[1] == fetch_market_data.invoke({"scope": "roofing"})
+        assert "error" in results[2]
+        assert "error" in results[3]
+    
+    def test_batch_runs_read_only_entries_concurrently(self):
+        """Test that read-only entries overlap instead of running in sequence."""
+        import time
+        
+        def slow_tool(tool_input):
+            time.sleep(0.1)
+            return {"echo": tool_input["n"]}
+        
+        invocations = [{"tool_name": "slow_tool", "arguments": {"n": i}} for i in range(4)]
+        with patch.dict(TOOL_INVOKERS, {"slow_tool": slow_tool}), patch(
+            "construction_assistant.tools.READ_ONLY_TOOL_NAMES", {"slow_tool"}
+        ):
+            start = time.time()
+            results = batch.invoke({"invocations": invocations})
+            elapsed = time.time() - start
+        
+        assert results == [{"echo": i} for i in range(4)]
+        assert elapsed < 0.3
+    
+    def test_empty_batch_raises_exception(self):
+        """Test that a batch without invocations raises ToolException."""
+        from langchain_core.tools.base import ToolException
+        
+        with pytest.raises(ToolException):
+            batch.invoke({"invocations": []})
+
+
 class TestAgentToolUsage:
     """Tests for tool usage within the enhanced agent."""
     
@@ -154,6 +299,170 @@ class TestAgentToolUsage:
         
         assert "use_tools" in agent.graph.nodes
         assert "llm_with_tools" in agent.graph.nodes
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_agents_share_one_compiled_graph(self, mock_llm_class):
+        """Test that the graph is compiled once yet each run uses its own agent's settings."""
+        mock_llm_class.return_value = Mock()
+        
+        strict = EnhancedLangGraphAgent(use_llm=False, min_bids=5, max_retries=2)
+        lenient = EnhancedLangGraphAgent(use_llm=False)
+        strict.build_graph()
+        lenient.build_graph()
+        
+        assert strict.graph is lenient.graph
+        assert strict.compiled_graph.nodes["parse"] is lenient.compiled_graph.nodes["parse"]
+        assert len(strict.run("roofing for P-123")["bids"]) == 6
+        assert len(lenient.run("roofing for P-123")["bids"]) == 3
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_agent_tools_fan_out_as_parallel_branches(self, mock_llm_class):
+        """Test that tools run as Send branches and are joined in use_tools."""
+        mock_llm_class.return_value = Mock()
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        agent.build_graph()
+        
+        assert "market_data" in agent.graph.nodes
+        assert "cost_estimate" in agent.graph.nodes
+        
+        sends = agent._dispatch_tools_router({"scope": "roofing"})
+        assert [send.node for send in sends] == ["market_data", "cost_estimate"]
+        
+        result = agent.run("Get roofing bids for P-123")
+        
+        assert [call["tool"] for call in result["tool_calls"]] == [
+            "fetch_market_data",
+            "estimate_project_cost",
+        ]
+        assert result["tool_results"]["cost_estimate"]["complexity"] == "high"
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_agent_arun_returns_tool_results(self, mock_llm_class):
+        """Test that agent.arun() awaits the graph and returns the run() shape."""
+        import asyncio
+        
+        mock_llm_class.return_value = Mock()
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        result = asyncio.run(agent.arun("Get roofing bids for P-123"))
+        
+        assert result == agent.run("Get roofing bids for P-123")
+        assert result["tool_results"]["cost_estimate"]["complexity"] == "high"
+
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_agent_arun_overlaps_tool_branches(self, mock_llm_class):
+        """Test that under ainvoke the two tool branches run at the same time."""
+        import asyncio
+        import time
+        
+        mock_llm_class.return_value = Mock()
+        
+        def slow(invoke):
+            def wrapper(tool_input):
+                time.sleep(0.2)
+                return invoke(tool_input)
+            return wrapper
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        agent.build_graph()
+        slow_invokers = {name: slow(TOOL_INVOKERS[name]) for name in (
+            fetch_market_data.name, estimate_project_cost.name,
+        )}
+        
+        with patch.dict(TOOL_INVOKERS, slow_invokers):
+            start = time.time()
+            result = asyncio.run(agent.arun("Get roofing bids for P-123"))
+            elapsed = time.time() - start
+        
+        assert set(result["tool_results"]) == {"market_data", "cost_estimate"}
+        assert elapsed < 0.35
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_parse_node_routes_to_fetch_or_clarify(self, mock_llm_class):
+        """Test that parse validates inline and only unclear prompts visit clarify."""
+        mock_llm_class.return_value = Mock()
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        agent.build_graph()
+        
+        def visited(prompt):
+            return [
+                node
+                for update in agent.compiled_graph.stream({"prompt": prompt}, stream_mode="updates")
+                for node in update
+            ]
+        
+        assert agent._parse_node({"prompt": "roofing for P-123"}).goto == "fetch"
+        assert "validate_parse" not in agent.graph.nodes
+        assert visited("roofing for P-123")[:2] == ["parse", "fetch"]
+        assert visited("roofing, somewhere")[:3] == ["parse", "clarify", "fetch"]
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_clarify_node_extracts_hyphenated_project_id(self, mock_llm_class):
+        """Test that clarification takes the first whole-word ID and defaults otherwise."""
+        mock_llm_class.return_value = Mock()
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        
+        found = agent._clarify_node({"prompt": "see XP-7a, then AB-12 or CD-34"})
+        missing = agent._clarify_node({"prompt": "no id here", "scope": "roofing"})
+        
+        assert (found["project_id"], found["scope"]) == ("AB-12", "general construction")
+        assert (missing["project_id"], missing["scope"]) == ("UNKNOWN", "roofing")
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_fetch_node_retries_insufficient_bids_in_place(self, mock_llm_class):
+        """Test that retries run inside fetch, merge their bids and skip failed attempts."""
+        import asyncio
+        
+        mock_llm_class.return_value = Mock()
+        
+        attempts = iter([[{"price": 1}], RuntimeError("timeout"), [{"price": 2}, {"price": 3}]])
+        
+        def fake_fetch(prompt, project_id=None, api_key=None):
+            outcome = next(attempts)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return {"bids": outcome}
+        
+        agent = EnhancedLangGraphAgent(use_llm=False, min_bids=2, max_retries=3)
+        state = {"prompt": "roofing for P-1", "project_id": "P-1"}
+        
+        with patch("construction_assistant.enhanced_langgraph_agent.fetch_subcontractor_bids", fake_fetch):
+            result = agent._fetch_node(state)
+        
+        assert result["_fetch_attempts"] == 3
+        assert result["fetch_errors"] == ["Attempt 2: timeout"]
+        assert sorted(bid["price"] for bid in result["bids"]) == [1, 2, 3]
+        assert result["bids"][0] == {"price": 1}
+        
+        sufficient = asyncio.run(agent._afetch_node(state))
+        assert sufficient["_fetch_attempts"] == 1
+        
+        agent.build_graph()
+        assert "refetch" not in agent.graph.nodes
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_failed_fetches_are_reported_in_the_result(self, mock_llm_class):
+        """Test that a run whose fetch attempts all fail says why it has no bids."""
+        import asyncio
+        
+        mock_llm_class.return_value = Mock()
+        
+        def failing_fetch(prompt, project_id=None, api_key=None):
+            raise ConnectionError("bids service unavailable")
+        
+        agent = EnhancedLangGraphAgent(use_llm=False, min_bids=2, max_retries=3)
+        
+        with patch("construction_assistant.enhanced_langgraph_agent.fetch_subcontractor_bids", failing_fetch):
+            result = agent.run("Get roofing bids for P-123")
+            async_result = asyncio.run(agent.arun("Get roofing bids for P-123"))
+        
+        expected = [f"Attempt {attempt}: bids service unavailable" for attempt in (1, 2, 3)]
+        assert result["bids"] == async_result["bids"] == []
+        assert result["fetch_errors"] == async_result["fetch_errors"] == expected
 
 
 class TestToolExecutionOrchestration:
@@ -206,6 +515,109 @@ class TestToolExecutionOrchestration:
         assert "call-1" in results
         assert "error" in results["call-1"]
     
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_execute_llm_tool_calls_runs_calls_concurrently(self, mock_llm_class):
+        """Test that independent tool calls overlap instead of running in sequence."""
+        import time
+        
+        mock_llm_class.return_value = Mock()
+        
+        def slow_tool(tool_input):
+            time.sleep(0.1)
+            return {"echo": tool_input["n"]}
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        tool_calls = [
+            {"tool": "slow_tool", "tool_input": {"n": i}, "id": f"call-{i}"}
+            for i in range(4)
+        ]
+        
+        with patch.dict(TOOL_INVOKERS, {"slow_tool": slow_tool}), patch(
+            "construction_assistant.enhanced_langgraph_agent.READ_ONLY_TOOL_NAMES", {"slow_tool"}
+        ):
+            start = time.time()
+            results = agent._execute_llm_tool_calls(tool_calls)
+            elapsed = time.time() - start
+        
+        assert results == {f"call-{i}": {"echo": i} for i in range(4)}
+        assert elapsed < 0.3
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_aexecute_llm_tool_calls_runs_calls_concurrently(self, mock_llm_class):
+        """Test that the async variant gathers the calls and keeps their ids."""
+        import asyncio
+        import time
+        
+        mock_llm_class.return_value = Mock()
+        
+        def slow_tool(tool_input):
+            time.sleep(0.1)
+            return {"echo": tool_input["n"]}
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        tool_calls = [
+            {"tool": "slow_tool", "tool_input": {"n": i}, "id": f"call-{i}"}
+            for i in range(4)
+        ] + [{"tool": "nonexistent_tool", "tool_input": {}, "id": "call-missing"}]
+        
+        with patch.dict(TOOL_INVOKERS, {"slow_tool": slow_tool}), patch(
+            "construction_assistant.enhanced_langgraph_agent.READ_ONLY_TOOL_NAMES", {"slow_tool"}
+        ):
+            start = time.time()
+            results = asyncio.run(agent._aexecute_llm_tool_calls(tool_calls))
+            elapsed = time.time() - start
+        
+        assert "error" in results.pop("call-missing")
+        assert results == {f"call-{i}": {"echo": i} for i in range(4)}
+        assert elapsed < 0.3
+    
+    @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
+    def test_mutating_tool_calls_run_one_at_a_time_after_reads(self, mock_llm_class):
+        """Test that calls to tools not marked read-only never overlap."""
+        import threading
+        import time
+        
+        mock_llm_class.return_value = Mock()
+        events = []
+        lock = threading.Lock()
+        
+        def traced(kind):
+            def invoke(tool_input):
+                with lock:
+                    events.append(("start", kind, tool_input["n"]))
+                time.sleep(0.02)
+                with lock:
+                    events.append(("end", kind, tool_input["n"]))
+                return {"n": tool_input["n"]}
+            return invoke
+        
+        agent = EnhancedLangGraphAgent(use_llm=False)
+        tool_calls = [
+            {"tool": "place_order", "tool_input": {"n": 0}, "id": "order-0"},
+            {"tool": "read", "tool_input": {"n": 1}, "id": "read-1"},
+            {"tool": "place_order", "tool_input": {"n": 2}, "id": "order-2"},
+            {"tool": "read", "tool_input": {"n": 3}, "id": "read-3"},
+        ]
+        
+        with patch.dict(TOOL_INVOKERS, {"read": traced("read"), "place_order": traced("order")}), patch(
+            "construction_assistant.enhanced_langgraph_agent.READ_ONLY_TOOL_NAMES", {"read"}
+        ):
+            results = agent._execute_llm_tool_calls(tool_calls)
+        
+        assert list(results) == ["order-0", "read-1", "order-2", "read-3"]
+        writes = [event for event in events if event[1] == "order"]
+        assert writes == [("start", "order", 0), ("end", "order", 0), ("start", "order", 2), ("end", "order", 2)]
+        # Writes start only once every read has finished
+        assert events.index(("start", "order", 0)) > max(
+            events.index(("end", "read", 1)), events.index(("end", "read", 3))
+        )
+    
+    def test_builtin_tools_are_marked_read_only(self):
+        """Test that the bundled tools may run concurrently, except batch."""
+        from construction_assistant.tools import READ_ONLY_TOOL_NAMES
+        
+        assert READ_ONLY_TOOL_NAMES == {fetch_market_data.name, estimate_project_cost.name}
+    
     @patch("construction_assistant.enhanced_langgraph_agent.ChatGoogleGenerativeAI")
     def test_execute_llm_tool_calls_accumulates_results(self, mock_llm_class):
         """Test that _execute_llm_tool_calls accumulates results in provided dict."""
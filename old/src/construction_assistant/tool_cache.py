@@ -1,55 +1,290 @@
 """Caching layer for tool execution results.
 
 This module provides:
-- In-memory caching with TTL
-- File-based persistent cache (optional)
+- Bounded in-memory segmented LRU caching with TTL and TinyLFU admission
+- Persistent cache backed by a single SQLite database (optional), written
+  by a background thread in batches and capped in size
 - Cache key generation from tool name + arguments
+- Per-tool TTL overrides and explicit invalidation
+- Hit/miss counters, kept up to date so statistics are free to read
 - Decorator pattern for easy tool caching
 """
+import atexit
+import copy
 import hashlib
+import heapq
+import inspect
 import json
+import math
 import os
-from functools import wraps
-from typing import Any, Callable, Dict, Optional
-from datetime import datetime, timedelta
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Literal, Mapping, NamedTuple, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _canonical(value: Any) -> Any:
+    """Make values JSON can't encode serialize the same in every process.
+    
+    Read-only mappings (such as cached results passed back into a tool) are
+    encoded as sorted objects and sets as lists sorted by repr; anything else
+    falls back to str().
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return str(value)
+
+
+try:
+    import orjson
+
+    def _dumps_sorted(value: Any) -> bytes:
+        return orjson.dumps(
+            value,
+            default=_canonical,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+except ImportError:
+    def _dumps_sorted(value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_canonical).encode()
+
+# Persisted values are pickled: the database is private to this cache, and
+# pickle round-trips tuples, bytes and non-str keys that JSON can't. The
+# header marks the format so rows written in another format read as misses.
+_PAYLOAD_MAGIC = b"TCP5"
+
+
+def _dumps(value: Any) -> bytes:
+    return _PAYLOAD_MAGIC + pickle.dumps(value, protocol=5)
+
+
+def _loads(payload: bytes) -> Any:
+    if not isinstance(payload, bytes) or not payload.startswith(_PAYLOAD_MAGIC):
+        raise ValueError("unrecognized cache payload format")
+    return pickle.loads(memoryview(payload)[len(_PAYLOAD_MAGIC):])
+
+try:
+    from xxhash import xxh3_64_hexdigest as _hexdigest
+except ImportError:
+    def _hexdigest(payload: bytes) -> str:
+        # 64-bit digest like xxh3; BLAKE2b is the fastest hash in hashlib
+        return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+# Returned by internal lookups on a miss, so a cached None is still a hit
+_MISS = object()
+
+
+@lru_cache(maxsize=4096)
+def _key_from_payload(tool_name: str, payload: bytes) -> str:
+    """Hash a serialized tool input into a cache key, memoized for repeat calls."""
+    return f"{tool_name}_{_hexdigest(payload)}"
+
+
+class CacheEntry(NamedTuple):
+    """A memory-tier entry; a tuple is far smaller than a per-entry dict."""
+    
+    result: Any
+    expires_at: float
+
+
+class CountMinSketch:
+    """Approximate access frequencies in fixed memory.
+    
+    Counters are halved after every ``width * 10`` additions so the estimates
+    follow recent popularity rather than all-time totals (TinyLFU aging).
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+        self._additions = 0
+        self._sample_size = width * 10
+    
+    def _indexes(self, key: str):
+        # Double hashing from one 64-bit hash; hash((seed, key)) rows are
+        # correlated, so a collision in one row usually meant all of them
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+    
+    def add(self, key: str) -> None:
+        """Record one access to key."""
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+    
+    def estimate(self, key: str) -> int:
+        """Return an upper bound on the recent access count of key."""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+    
+    def _age(self) -> None:
+        for row in self._rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self._additions //= 2
+
+
 class ToolCache:
     """In-memory cache for tool results with optional persistence."""
     
-    def __init__(self, cache_dir: Optional[str] = None, ttl_seconds: int = 3600):
+    DB_FILENAME = "cache.db"
+    WRITE_BATCH_SIZE = 256
+    # Disk eviction deletes entries until this fraction of max_disk_bytes
+    DISK_LOW_WATER = 0.9
+    # Bytes of the database file SQLite reads through a memory map
+    MMAP_SIZE = 64 * 1024 * 1024
+    # Share of max_size reserved for entries that were hit at least once
+    PROTECTED_RATIO = 0.8
+    # Hit count at which the "counter" policy halves all counters
+    COUNTER_MAX = 255
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: int = 3600,
+        max_size: int = 1024,
+        time_fn: Callable[[], float] = time.time,
+        max_disk_bytes: Optional[int] = 500 * 1024 * 1024,
+        policy: Literal["slru", "counter"] = "slru",
+    ):
         """Initialize the tool cache.
         
         Args:
             cache_dir: Optional directory for persistent cache files.
                       If None, cache is memory-only.
             ttl_seconds: Time-to-live for cache entries in seconds (default: 1 hour)
+            max_size: Maximum number of entries kept in memory; the least
+                      recently used probationary entry is evicted beyond this
+            time_fn: Clock returning the current time in seconds. Expiry times
+                     are persisted, so it must be wall-clock based outside tests.
+            max_disk_bytes: Cap on the size of stored values in the database.
+                            When exceeded, expired and then the least recently
+                            written entries are deleted. None disables the cap.
+            policy: Memory eviction policy. "slru" (segmented LRU) suits
+                    diverse access patterns; "counter" evicts the entry with
+                    the fewest hits and does no reordering on hits, which
+                    suits small caches of entries read once or twice.
+        
+        Raises:
+            ValueError: If max_size is less than 1 or policy is unknown
         """
-        self.memory_cache: Dict[str, dict] = {}
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        if policy not in ("slru", "counter"):
+            raise ValueError(f"Unknown cache policy: {policy!r}")
+        self._time = time_fn
+        self.memory_cache: Dict[str, CacheEntry] = {}
+        self.max_size = max_size
+        # Segmented LRU: keys enter probation and are promoted to protected on
+        # their second hit, so one-time entries are evicted before hot ones.
+        # Both are ordered from least to most recently used.
+        self._probation: "OrderedDict[str, None]" = OrderedDict()
+        self._protected: "OrderedDict[str, None]" = OrderedDict()
+        self._protected_size = int(max_size * self.PROTECTED_RATIO)
+        # "counter" policy: hits per key, in insertion order so ties evict
+        # the oldest; replaces the segments above
+        self._counting = policy == "counter"
+        self._counters: Dict[str, int] = {}
+        # Access frequencies for admission: when full, a new entry only
+        # replaces the LRU victim if it has been requested at least as often
+        self._sketch = CountMinSketch()
+        # Lookup outcomes, overall and per tool name
+        self._hits = 0
+        self._misses = 0
+        self._tool_hits: Counter = Counter()
+        self._tool_misses: Counter = Counter()
+        # (expires_at, key) min-heap so expired entries are dropped proactively;
+        # stale pairs for overwritten or evicted keys are skipped lazily
+        self._exp_heap: List[Tuple[float, str]] = []
         self.cache_dir = cache_dir
-        self.ttl = timedelta(seconds=ttl_seconds)
+        self.ttl_seconds = float(ttl_seconds)
+        # TTL overrides in seconds, set through register_tool()
+        self._tool_ttl: Dict[str, float] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # Guards the memory tier: memory_cache, the SLRU segments, counters,
+        # expiry heap, frequency sketch and lookup counts. Held by get(),
+        # set(), invalidate(), clear() and get_stats(); the helpers they call
+        # assume it.
+        self._memory_lock = threading.Lock()
+        self.max_disk_bytes = max_disk_bytes
+        # Bytes of stored values; may overcount replaced rows until the next
+        # eviction recomputes it
+        self._disk_bytes = 0
+        # Persistent writes are queued for a background thread so set() does
+        # not block on disk; queued rows stay readable from _pending
+        self._write_queue: "queue.Queue[Optional[Tuple[str, str, bytes, float]]]" = queue.Queue()
+        self._pending: Dict[str, Tuple[bytes, float]] = {}
+        self._pending_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
         
         if cache_dir:
             try:
                 os.makedirs(cache_dir, exist_ok=True)
                 logger.info(f"Created cache directory: {cache_dir}")
+                self._db = self._open_db(os.path.join(cache_dir, self.DB_FILENAME))
+                self._disk_bytes = self._stored_bytes()
             except Exception as e:
                 logger.warning(f"Failed to create cache directory {cache_dir}: {str(e)}. Using memory-only cache.")
                 self.cache_dir = None
+            else:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="toolcache-writer", daemon=True
+                )
+                self._writer.start()
+                # The writer is a daemon thread, so commit what is still
+                # queued before the interpreter exits
+                atexit.register(self.close)
+    
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        """Open the persistent store: one row per key, indexed by expiry.
+        
+        A single database replaces one JSON file per entry, so lookups fetch
+        only the requested key instead of touching the directory.
+        """
+        # Autocommit; access is serialized through _db_lock so the connection
+        # may be shared with executor threads
+        db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        # Serve reads from a shared memory map instead of read() syscalls
+        db.execute(f"PRAGMA mmap_size={ToolCache.MMAP_SIZE}")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS kv "
+            "(key TEXT PRIMARY KEY, tool TEXT, value BLOB, expires_at REAL)"
+        )
+        columns = {row[1] for row in db.execute("PRAGMA table_info(kv)")}
+        if "tool" not in columns:
+            # Databases created before per-tool invalidation lack the column
+            db.execute("ALTER TABLE kv ADD COLUMN tool TEXT")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_exp ON kv(expires_at)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_tool ON kv(tool)")
+        return db
     
     @staticmethod
     def _generate_key(tool_name: str, tool_input: Dict[str, Any]) -> str:
         """Generate a cache key from tool name and inputs.
         
-        Uses SHA256 hash of JSON-serialized input for consistent, short keys.
+        Uses a 64-bit xxh3 hash (BLAKE2b without xxhash) of the
+        JSON-serialized input for consistent, short keys.
         """
-        # Sort dict keys for consistent hashing
-        sorted_input = json.dumps(tool_input, sort_keys=True, default=str)
-        input_hash = hashlib.sha256(sorted_input.encode()).hexdigest()[:8]
-        return f"{tool_name}_{input_hash}"
+        # Sort dict keys for consistent hashing; the serialized input is the
+        # frozen, hashable form used to memoize the digest
+        return _key_from_payload(tool_name, _dumps_sorted(tool_input))
     
     def get(self, tool_name: str, tool_input: Dict[str, Any]) -> Optional[Any]:
         """Get a cached tool result if available and not expired.
@@ -61,32 +296,57 @@ class ToolCache:
         Returns:
             Cached result if found and valid, None otherwise
         """
-        key = self._generate_key(tool_name, tool_input)
-        
+        result = self._get_by_key(self._generate_key(tool_name, tool_input), tool_name)
+        return None if result is _MISS else result
+    
+    def _get_by_key(self, key: str, tool_name: str) -> Any:
+        """Look up a result by precomputed key; return _MISS if not cached."""
         # Check memory cache first
-        if key in self.memory_cache:
-            entry = self.memory_cache[key]
-            if datetime.now() < entry["expires_at"]:
-                logger.info(f"✅ Cache HIT for {tool_name} (key: {key})")
-                return entry["result"]
-            else:
-                logger.info(f"⏰ Cache EXPIRED for {tool_name} (key: {key})")
-                del self.memory_cache[key]
+        with self._memory_lock:
+            self._sketch.add(key)
+            entry = self.memory_cache.get(key)
+            if entry is not None:
+                if self._time() >= entry.expires_at:
+                    logger.info("⏰ Cache EXPIRED for %s (key: %s)", tool_name, key)
+                    self._remove(key)
+                    # The stored row was written or reloaded together with this
+                    # entry, so it has expired too; skip the query
+                    self._record(tool_name, hit=False)
+                    return _MISS
+                
+                logger.info("✅ Cache HIT for %s (key: %s)", tool_name, key)
+                self._touch(key)
+                self._record(tool_name, hit=True)
+        
+        if entry is not None:
+            # Entries are replaced, never mutated, so copy outside the lock
+            return self._detach(entry.result)
         
-        # Check file cache if available
-        if self.cache_dir:
+        # Check file cache if available; read outside the lock so other
+        # threads' memory hits don't wait on disk
+        if self._db is not None:
             cached_result = self._load_from_file(key)
-            if cached_result is not None:
-                logger.info(f"✅ Cache HIT (file) for {tool_name} (key: {key})")
-                # Reload into memory cache
-                self.memory_cache[key] = {
-                    "result": cached_result,
-                    "expires_at": datetime.now() + self.ttl
-                }
-                return cached_result
+            if cached_result is not _MISS:
+                logger.info("✅ Cache HIT (file) for %s (key: %s)", tool_name, key)
+                # Reload into memory cache; the caller gets its own copy
+                with self._memory_lock:
+                    self._store_in_memory(key, cached_result, self._ttl_for(tool_name))
+                    self._record(tool_name, hit=True)
+                return self._detach(cached_result)
         
-        logger.debug(f"❌ Cache MISS for {tool_name} (key: {key})")
-        return None
+        logger.debug("❌ Cache MISS for %s (key: %s)", tool_name, key)
+        with self._memory_lock:
+            self._record(tool_name, hit=False)
+        return _MISS
+    
+    def _record(self, tool_name: str, hit: bool) -> None:
+        """Count a lookup so get_stats() never has to scan entries."""
+        if hit:
+            self._hits += 1
+            self._tool_hits[tool_name] += 1
+        else:
+            self._misses += 1
+            self._tool_misses[tool_name] += 1
     
     def set(self, tool_name: str, tool_input: Dict[str, Any], result: Any) -> None:
         """Cache a tool result.
@@ -96,98 +356,380 @@ class ToolCache:
             tool_input: Input dict that was passed to the tool
             result: Result to cache
         """
-        key = self._generate_key(tool_name, tool_input)
+        self._set_by_key(self._generate_key(tool_name, tool_input), tool_name, result)
+    
+    def _set_by_key(self, key: str, tool_name: str, result: Any) -> None:
+        """Store a result under a precomputed key; see set()."""
+        ttl_seconds = self._ttl_for(tool_name)
         
         # Store in memory cache
-        self.memory_cache[key] = {
-            "result": result,
-            "expires_at": datetime.now() + self.ttl
-        }
+        detached = self._detach(result)
+        with self._memory_lock:
+            self._store_in_memory(key, detached, ttl_seconds)
         
         # Store in file cache if configured
-        if self.cache_dir:
-            self._save_to_file(key, result)
+        if self._db is not None:
+            self._save_to_file(key, result, tool_name, ttl_seconds)
         
-        logger.info(f"💾 Cached result for {tool_name} (key: {key}, TTL: {self.ttl.total_seconds()}s)")
+        logger.info("💾 Cached result for %s (key: %s, TTL: %ss)", tool_name, key, ttl_seconds)
     
-    def _load_from_file(self, key: str) -> Optional[Any]:
-        """Load a cached result from file."""
-        if not self.cache_dir:
-            return None
+    def register_tool(self, tool_name: str, ttl: Optional[float] = None, pure: bool = False) -> None:
+        """Override the cache lifetime of one tool's results.
         
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
+        Args:
+            tool_name: Name of the tool
+            ttl: TTL in seconds for this tool; None restores the cache default
+            pure: If True, results never expire (deterministic tools whose
+                  output only depends on their input)
+        """
+        if pure:
+            self._tool_ttl[tool_name] = math.inf
+        elif ttl is None:
+            self._tool_ttl.pop(tool_name, None)
+        else:
+            self._tool_ttl[tool_name] = ttl
+    
+    def _ttl_for(self, tool_name: str) -> float:
+        """Return the TTL in seconds that applies to tool_name."""
+        ttl = self._tool_ttl.get(tool_name)
+        return self.ttl_seconds if ttl is None else ttl
+    
+    def invalidate(self, tool_name: str, tool_input: Optional[Dict[str, Any]] = None) -> int:
+        """Drop cached results, e.g. when a tool's data source changes.
         
-        try:
-            if os.path.exists(cache_file):
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
-                    expires_at = datetime.fromisoformat(data.get("expires_at"))
-                    if datetime.now() < expires_at:
-                        return data.get("result")
+        Args:
+            tool_name: Name of the tool
+            tool_input: Drop only this input's entry; None drops all of the
+                        tool's entries
+            
+        Returns:
+            Number of memory entries removed
+        """
+        removed = 0
+        with self._memory_lock:
+            if tool_input is not None:
+                keys = [self._generate_key(tool_name, tool_input)]
+            else:
+                keys = [k for k in self.memory_cache if k.rpartition("_")[0] == tool_name]
+            
+            for key in keys:
+                if self._remove(key):
+                    removed += 1
+        
+        if self._db is not None:
+            # Queued writes would otherwise land after the delete
+            self.flush()
+            try:
+                with self._db_lock:
+                    if tool_input is not None:
+                        self._db.execute("DELETE FROM kv WHERE key = ?", (keys[0],))
                     else:
-                        os.remove(cache_file)  # Remove expired file
+                        self._db.execute("DELETE FROM kv WHERE tool = ?", (tool_name,))
+            except Exception as e:
+                logger.warning(f"Error invalidating file cache for {tool_name}: {str(e)}")
+        
+        logger.info("🗑️ Invalidated %s cached result(s) for %s", removed, tool_name)
+        return removed
+    
+    @staticmethod
+    def _detach(result: Any) -> Any:
+        """Return a deep copy of result, sharing nothing with the cache.
+        
+        Applied when storing and on every hit, so neither the dict a tool
+        returned nor a caller mutating a hit (nested values included) can
+        change the cached entry. Hits and misses return the same types.
+        """
+        return copy.deepcopy(result)
+    
+    def _store_in_memory(self, key: str, result: Any, ttl_seconds: float) -> None:
+        """Insert as most recently used, then enforce TTL and size bounds.
+        
+        New keys are only admitted into a full cache when their estimated
+        frequency is at least the eviction victim's, so a burst of one-off
+        calls cannot flush frequently used results. Caller holds _memory_lock.
+        """
+        self._purge_expired()
+        is_new = key not in self.memory_cache
+        if is_new and len(self.memory_cache) >= self.max_size:
+            victim = self._victim()
+            if self._sketch.estimate(key) < self._sketch.estimate(victim):
+                logger.debug("Cache admission rejected %s in favour of %s", key, victim)
+                return
+            # Evict before inserting, so the new key can't be its own victim
+            self._remove(victim)
+        
+        expires_at = self._time() + ttl_seconds
+        self.memory_cache[key] = CacheEntry(result, expires_at)
+        heapq.heappush(self._exp_heap, (expires_at, key))
+        if self._counting:
+            if is_new:
+                self._counters[key] = 0
+        elif is_new:
+            self._probation[key] = None
+        else:
+            (self._protected if key in self._protected else self._probation).move_to_end(key)
+        
+        # Overwrites and LRU evictions leave stale heap pairs behind
+        if len(self._exp_heap) > 2 * self.max_size:
+            self._exp_heap = [(e.expires_at, k) for k, e in self.memory_cache.items()]
+            heapq.heapify(self._exp_heap)
+    
+    def _purge_expired(self) -> None:
+        """Drop expired entries, earliest expiry first. Caller holds _memory_lock."""
+        now = self._time()
+        heap = self._exp_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.memory_cache.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+    
+    def _touch(self, key: str) -> None:
+        """Record a hit: promote probationary keys, refresh protected ones.
+        
+        Caller holds _memory_lock, as for all memory-tier helpers below.
+        """
+        if self._counting:
+            count = self._counters[key] + 1
+            self._counters[key] = count
+            if count >= self.COUNTER_MAX:
+                # Age all counts so past popularity doesn't pin entries forever
+                self._counters = {k: v >> 1 for k, v in self._counters.items()}
+            return
+        
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return
+        
+        del self._probation[key]
+        self._protected[key] = None
+        # Demote rather than drop, so the entry gets another chance
+        while len(self._protected) > self._protected_size:
+            demoted, _ = self._protected.popitem(last=False)
+            self._probation[demoted] = None
+    
+    def _victim(self) -> str:
+        """Return the key to evict next: the probation LRU, else the protected LRU.
+        
+        Under the "counter" policy, the least hit key instead.
+        """
+        if self._counting:
+            return min(self._counters, key=self._counters.__getitem__)
+        return next(iter(self._probation or self._protected))
+    
+    def _remove(self, key: str) -> bool:
+        """Drop key from memory; return whether it was present."""
+        if self.memory_cache.pop(key, None) is None:
+            return False
+        if self._counting:
+            del self._counters[key]
+        elif self._probation.pop(key, False) is False:
+            del self._protected[key]
+        return True
+    
+    def _load_from_file(self, key: str) -> Any:
+        """Load a cached result from the persistent store, or _MISS."""
+        if self._db is None:
+            return _MISS
+        
+        try:
+            with self._pending_lock:
+                row = self._pending.get(key)
+            if row is not None:
+                value, expires_at = row
+                return _loads(value) if self._time() < expires_at else _MISS
+            
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value FROM kv WHERE key = ? AND expires_at > ?",
+                    (key, self._time()),
+                ).fetchone()
+            if row is not None:
+                return _loads(row[0])
         except Exception as e:
             logger.warning(f"Error loading file cache for {key}: {str(e)}")
         
-        return None
+        return _MISS
     
-    def _save_to_file(self, key: str, result: Any) -> None:
-        """Save a cached result to file."""
-        if not self.cache_dir:
+    def _save_to_file(
+        self,
+        key: str,
+        result: Any,
+        tool_name: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Queue a cached result for the background writer."""
+        if self._db is None:
             return
         
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
         
         try:
-            data = {
-                "result": result,
-                "expires_at": (datetime.now() + self.ttl).isoformat(),
-            }
-            with open(cache_file, "w") as f:
-                json.dump(data, f)
+            # Serialize now so later mutation of result can't leak into the store
+            value = _dumps(result)
+            expires_at = self._time() + ttl_seconds
+            with self._pending_lock:
+                self._pending[key] = (value, expires_at)
+            self._write_queue.put((key, tool_name, value, expires_at))
         except Exception as e:
             logger.warning(f"Error saving file cache for {key}: {str(e)}")
     
+    def _writer_loop(self) -> None:
+        """Drain queued writes, committing up to WRITE_BATCH_SIZE rows at a time."""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            rows = [item for item in batch if item is not None]
+            if rows:
+                try:
+                    with self._db_lock:
+                        self._db.execute("BEGIN")
+                        self._db.executemany(
+                            "INSERT OR REPLACE INTO kv (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                            rows,
+                        )
+                        self._db.execute("COMMIT")
+                        self._disk_bytes += sum(len(row[2]) for row in rows)
+                        if self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes:
+                            self._evict_from_disk()
+                except Exception as e:
+                    logger.warning(f"Error saving {len(rows)} file cache entries: {str(e)}")
+                    with self._db_lock:
+                        if self._db is not None and self._db.in_transaction:
+                            self._db.execute("ROLLBACK")
+                
+                with self._pending_lock:
+                    for key, _, value, _ in rows:
+                        # Keep the entry if a newer value was queued meanwhile
+                        if key in self._pending and self._pending[key][0] is value:
+                            del self._pending[key]
+            
+            for _ in batch:
+                self._write_queue.task_done()
+            if len(rows) < len(batch):
+                return
+    
+    def _stored_bytes(self) -> int:
+        """Return the total size of stored values."""
+        return self._db.execute("SELECT COALESCE(SUM(length(value)), 0) FROM kv").fetchone()[0]
+    
+    def _evict_from_disk(self) -> None:
+        """Shrink the store to DISK_LOW_WATER of max_disk_bytes.
+        
+        Expired rows go first, then the oldest writes: INSERT OR REPLACE gives
+        every write a new, larger rowid, so rowid order is write order.
+        Caller must hold _db_lock.
+        """
+        self._db.execute("DELETE FROM kv WHERE expires_at <= ?", (self._time(),))
+        excess = self._stored_bytes() - int(self.max_disk_bytes * self.DISK_LOW_WATER)
+        if excess > 0:
+            # Smallest rowid whose running total of older values covers the excess
+            (cutoff,) = self._db.execute(
+                "SELECT rowid FROM (SELECT rowid, SUM(length(value)) OVER (ORDER BY rowid) AS freed FROM kv) "
+                "WHERE freed >= ? LIMIT 1",
+                (excess,),
+            ).fetchone()
+            self._db.execute("DELETE FROM kv WHERE rowid <= ?", (cutoff,))
+            logger.info("Evicted file cache entries to stay under %s bytes", self.max_disk_bytes)
+        self._disk_bytes = self._stored_bytes()
+    
+    def flush(self) -> None:
+        """Block until all queued writes have been committed."""
+        if self._writer is not None:
+            self._write_queue.join()
+    
     def clear(self) -> None:
         """Clear all cached entries."""
-        self.memory_cache.clear()
-        if self.cache_dir:
-            import shutil
+        with self._memory_lock:
+            self.memory_cache.clear()
+            self._probation.clear()
+            self._protected.clear()
+            self._counters.clear()
+            self._exp_heap.clear()
+        if self._db is not None:
+            self.flush()
             try:
-                shutil.rmtree(self.cache_dir)
-                os.makedirs(self.cache_dir, exist_ok=True)
+                with self._db_lock:
+                    self._db.execute("DELETE FROM kv")
+                    self._disk_bytes = 0
                 logger.info(f"Cleared cache directory: {self.cache_dir}")
             except Exception as e:
                 logger.warning(f"Error clearing file cache: {str(e)}")
     
-    def get_stats(self) -> Dict[str, int]:
-        """Get cache statistics."""
-        return {
-            "memory_entries": len(self.memory_cache),
-            "file_entries": (
-                len([f for f in os.listdir(self.cache_dir) if f.endswith(".json")])
-                if self.cache_dir and os.path.exists(self.cache_dir)
-                else 0
-            )
-        }
+    def close(self) -> None:
+        """Flush and close the persistent store; the cache keeps working memory-only.
+        
+        Runs at interpreter exit for caches that weren't closed explicitly.
+        """
+        atexit.unregister(self.close)
+        if self._writer is not None:
+            self.flush()
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+        
+        Entry counts reflect the current contents; hit and miss counts are
+        cumulative over the cache's lifetime, overall and per tool.
+        """
+        file_entries = 0
+        if self._db is not None:
+            self.flush()
+            with self._db_lock:
+                file_entries = self._db.execute(
+                    "SELECT COUNT(*) FROM kv WHERE expires_at > ?", (self._time(),)
+                ).fetchone()[0]
+        with self._memory_lock:
+            return {
+                "memory_entries": len(self.memory_cache),
+                "file_entries": file_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hits_by_tool": dict(self._tool_hits),
+                "misses_by_tool": dict(self._tool_misses),
+            }
 
 
 # Global cache instance (can be customized)
 _global_cache: Optional[ToolCache] = None
 
 
-def init_tool_cache(cache_dir: Optional[str] = None, ttl_seconds: int = 3600) -> ToolCache:
+def init_tool_cache(
+    cache_dir: Optional[str] = None,
+    ttl_seconds: int = 3600,
+    max_size: int = 1024,
+    max_disk_bytes: Optional[int] = 500 * 1024 * 1024,
+) -> ToolCache:
     """Initialize the global tool cache.
     
     Args:
         cache_dir: Optional directory for persistent cache
         ttl_seconds: Time-to-live for cache entries
+        max_size: Maximum number of in-memory entries
+        max_disk_bytes: Cap on the persistent cache size, None for no cap
         
     Returns:
         The initialized ToolCache instance
     """
     global _global_cache
-    _global_cache = ToolCache(cache_dir=cache_dir, ttl_seconds=ttl_seconds)
+    _global_cache = ToolCache(
+        cache_dir=cache_dir,
+        ttl_seconds=ttl_seconds,
+        max_size=max_size,
+        max_disk_bytes=max_disk_bytes,
+    )
     return _global_cache
 
 
@@ -196,7 +738,16 @@ def get_tool_cache() -> Optional[ToolCache]:
     return _global_cache
 
 
-def cached_tool(cache: Optional[ToolCache] = None) -> Callable:
+# Above these serialized sizes, hashing or storing costs more than recomputing
+MAX_KEY_BYTES = 64 * 1024
+MAX_RESULT_BYTES = 1024 * 1024
+
+
+def cached_tool(
+    cache: Optional[ToolCache] = None,
+    max_key_bytes: Optional[int] = MAX_KEY_BYTES,
+    max_result_bytes: Optional[int] = MAX_RESULT_BYTES,
+) -> Callable:
     """Decorator to cache tool results.
     
     Usage:
@@ -207,38 +758,74 @@ def cached_tool(cache: Optional[ToolCache] = None) -> Callable:
     
     Args:
         cache: Optional ToolCache instance. If None, uses global cache.
+        max_key_bytes: Calls whose serialized input is larger bypass the
+                       cache entirely. None disables the check.
+        max_result_bytes: Results whose serialized form is larger are
+                          returned without being cached. None disables
+                          the check.
     
     Returns:
         Decorated function that caches results
     """
     def decorator(func: Callable) -> Callable:
+        # Resolved once per tool rather than on every call
+        name = func.__name__
+        signature = inspect.signature(func)
+        bind = signature.bind
+        # Fast path for plain parameters; *args/**kwargs need bind() to pack them
+        plain = all(
+            p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+            for p in signature.parameters.values()
+        )
+        param_names = tuple(signature.parameters) if plain else None
+        keyword_names = frozenset(
+            p.name for p in signature.parameters.values() if p.kind is p.POSITIONAL_OR_KEYWORD
+        )
+        
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             # Use provided cache or global cache
-            tool_cache = cache or _global_cache
+            tool_cache = cache if cache is not None else _global_cache
             
-            if not tool_cache:
-                logger.debug(f"No cache configured for {func.__name__}, executing without caching")
+            if tool_cache is None:
+                logger.debug("No cache configured for %s, executing without caching", name)
                 return func(*args, **kwargs)
             
             # Convert args and kwargs to a dict for cache key generation
             # This assumes the function takes a single dict argument or keyword arguments
-            if len(args) == 1 and isinstance(args[0], dict) and not kwargs:
+            if len(args) == 1 and not kwargs and isinstance(args[0], dict):
                 tool_input = args[0]
+            elif param_names is not None and len(args) <= len(param_names):
+                # Same mapping bind() builds (key order is irrelevant, the key
+                # is serialized sorted); omitted defaults stay omitted
+                tool_input = dict(zip(param_names, args))
+                if kwargs:
+                    if keyword_names.issuperset(kwargs) and tool_input.keys().isdisjoint(kwargs):
+                        tool_input.update(kwargs)
+                    else:
+                        # Let bind() raise the TypeError the call itself would
+                        tool_input = bind(*args, **kwargs).arguments
             else:
-                # Convert args and kwargs to dict
-                import inspect
-                sig = inspect.signature(func)
-                tool_input = sig.bind(*args, **kwargs).arguments
+                tool_input = bind(*args, **kwargs).arguments
+            
+            # Serialize and hash once for the size check, lookup and store
+            payload = _dumps_sorted(tool_input)
+            if max_key_bytes is not None and len(payload) > max_key_bytes:
+                logger.debug("Input too large to cache for %s, executing without caching", name)
+                return func(*args, **kwargs)
+            key = _key_from_payload(name, payload)
             
             # Check cache
-            cached_result = tool_cache.get(func.__name__, tool_input)
-            if cached_result is not None:
+            cached_result = tool_cache._get_by_key(key, name)
+            if cached_result is not _MISS:
                 return cached_result
             
             # Execute function and cache result
             result = func(*args, **kwargs)
-            tool_cache.set(func.__name__, tool_input, result)
+            if max_result_bytes is not None and len(_dumps_sorted(result)) > max_result_bytes:
+                logger.debug("Result too large to cache for %s", name)
+                return result
+            tool_cache._set_by_key(key, name, result)
             
             return result
         
@@ -12,12 +12,74 @@ Caching Example:
     cache = init_tool_cache()
     cached_fetch = create_cached_tool_wrapper(fetch_market_data, cache)
 """
+import copy
 import logging
-from langchain_core.tools import tool
+from functools import lru_cache
+from typing import Any, Callable, Dict, List
+
+from langchain_core.tools import BaseTool, tool
 from langchain_core.tools.base import ToolException
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, Field
+
+from .parallel_executor import ToolCall, create_parallel_executor
 
 logger = logging.getLogger(__name__)
 
+# Lookup tables for the tools below, built once at import. Read-only: tool
+# results are copies, never these dicts.
+_MARKET_BENCHMARKS = {
+    "excavation": {
+        "avg_cost_per_day": 1500,
+        "avg_cost_per_cubic_yard": 8,
+        "market_suppliers": 47,
+        "current_trend": "stable",
+    },
+    "roofing": {
+        "avg_cost_per_sqft": 12,
+        "avg_cost_per_project": 15000,
+        "market_suppliers": 63,
+        "current_trend": "increasing",
+    },
+    "concrete": {
+        "avg_cost_per_cubic_yard": 180,
+        "avg_cost_per_sqft": 8,
+        "market_suppliers": 52,
+        "current_trend": "stable",
+    },
+    "general": {
+        "avg_cost_per_day": 2000,
+        "market_suppliers": 100,
+        "current_trend": "unknown",
+    },
+}
+
+_COMPLEXITY_MULTIPLIERS = {"low": 0.8, "medium": 1.0, "high": 1.5}
+
+_SCOPE_ESTIMATES = {
+    "excavation": {"base": 5000, "labor": 3000, "equipment": 2000},
+    "roofing": {"base": 12000, "labor": 5000, "materials": 7000},
+    "concrete": {"base": 8000, "labor": 3000, "materials": 5000},
+    "general": {"base": 10000, "labor": 6000, "materials": 4000},
+}
+
+# Both inputs are closed sets, so every (scope, complexity) estimate is
+# computed up front and the tool only looks one up: (breakdown, total)
+_ESTIMATE_TABLE = {
+    (scope_key, complexity_key): (
+        {k: int(v * multiplier) for k, v in estimate.items()},
+        int(sum(estimate.values()) * multiplier),
+    )
+    for scope_key, estimate in _SCOPE_ESTIMATES.items()
+    for complexity_key, multiplier in _COMPLEXITY_MULTIPLIERS.items()
+}
+
+# Market results without the echoed scope, which the tool appends
+_MARKET_RESULTS = {
+    scope_key: {"timestamp": "2025-12-06", **data}
+    for scope_key, data in _MARKET_BENCHMARKS.items()
+}
+
 
 @tool
 def fetch_market_data(scope: str) -> dict:
@@ -42,45 +104,14 @@ def fetch_market_data(scope: str) -> dict:
     Raises:
         ToolException: If scope is invalid or data unavailable
     """
-    if not scope or not isinstance(scope, str):
+    # args_schema already rejects non-string scopes before the call
+    if not scope:
         raise ToolException("Scope must be a non-empty string")
     
-    market_benchmarks = {
-        "excavation": {
-            "avg_cost_per_day": 1500,
-            "avg_cost_per_cubic_yard": 8,
-            "market_suppliers": 47,
-            "current_trend": "stable",
-        },
-        "roofing": {
-            "avg_cost_per_sqft": 12,
-            "avg_cost_per_project": 15000,
-            "market_suppliers": 63,
-            "current_trend": "increasing",
-        },
-        "concrete": {
-            "avg_cost_per_cubic_yard": 180,
-            "avg_cost_per_sqft": 8,
-            "market_suppliers": 52,
-            "current_trend": "stable",
-        },
-        "general": {
-            "avg_cost_per_day": 2000,
-            "market_suppliers": 100,
-            "current_trend": "unknown",
-        },
-    }
-    
-    try:
-        data = market_benchmarks.get(scope.lower(), market_benchmarks["general"])
-        result = {
-            "scope": scope,
-            "timestamp": "2025-12-06",
-            **data,  # Spread market data
-        }
-        return result
-    except Exception as e:
-        raise ToolException(f"Failed to fetch market data: {str(e)}")
+    # One copy plus a store; the scope is echoed after the market fields
+    result = dict(_MARKET_RESULTS.get(scope.lower(), _MARKET_RESULTS["general"]))
+    result["scope"] = scope
+    return result
 
 
 @tool
@@ -108,37 +139,194 @@ def estimate_project_cost(scope: str, complexity: str = "medium") -> dict:
     Raises:
         ToolException: If scope/complexity are invalid
     """
-    if not scope or not isinstance(scope, str):
+    if not scope:
         raise ToolException("Scope must be a non-empty string")
     
-    valid_complexities = {"low", "medium", "high"}
-    if complexity.lower() not in valid_complexities:
-        raise ToolException(f"Complexity must be one of {valid_complexities}")
+    complexity_key = complexity.lower()
+    if complexity_key not in _COMPLEXITY_MULTIPLIERS:
+        raise ToolException(f"Complexity must be one of {set(_COMPLEXITY_MULTIPLIERS)}")
     
-    try:
-        complexity_multipliers = {"low": 0.8, "medium": 1.0, "high": 1.5}
-        multiplier = complexity_multipliers.get(complexity.lower(), 1.0)
-        
-        scope_estimates = {
-            "excavation": {"base": 5000, "labor": 3000, "equipment": 2000},
-            "roofing": {"base": 12000, "labor": 5000, "materials": 7000},
-            "concrete": {"base": 8000, "labor": 3000, "materials": 5000},
-            "general": {"base": 10000, "labor": 6000, "materials": 4000},
-        }
+    scope_key = scope.lower()
+    if scope_key not in _SCOPE_ESTIMATES:
+        scope_key = "general"
+    breakdown, total = _ESTIMATE_TABLE[scope_key, complexity_key]
+    
+    return {
+        "scope": scope,
+        "complexity": complexity,
+        "breakdown": dict(breakdown),
+        "estimated_total": total,
+        "confidence": "high" if complexity != "high" else "medium",
+    }
+
+
+class ToolInvocation(BaseModel):
+    """One tool call inside a batch."""
+    tool_name: str = Field(description="Name of the tool to call, e.g. 'fetch_market_data'")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="The tool's own arguments")
+
+
+# Runs the read-only entries of a batch concurrently; worker threads are
+# only started on the first batch with more than one such entry
+_batch_executor = create_parallel_executor(max_workers=8, use_asyncio=False)
+
+
+@tool
+def batch(invocations: List[ToolInvocation]) -> list:
+    """Run several tool calls in a single step and return their results in order.
+    
+    Prefer this over calling tools one per turn whenever you need more than
+    one of them, e.g. market data and a cost estimate for the same scope.
+    
+    Args:
+        invocations: Tool calls to run, each a tool_name with its arguments,
+                     e.g. [{"tool_name": "fetch_market_data", "arguments": {"scope": "roofing"}}]
         
-        estimate = scope_estimates.get(scope.lower(), scope_estimates["general"])
-        total = sum(estimate.values()) * multiplier
+    Returns:
+        One result per invocation, in the same order. An invocation that
+        fails yields {"error": ...} in its place without affecting the others.
         
-        return {
-            "scope": scope,
-            "complexity": complexity,
-            "breakdown": {k: int(v * multiplier) for k, v in estimate.items()},
-            "estimated_total": int(total),
-            "confidence": "high" if complexity != "high" else "medium",
-        }
-    except Exception as e:
-        raise ToolException(f"Failed to estimate project cost: {str(e)}")
-
-
-# List of available tools for binding to LLM
-AVAILABLE_TOOLS = [fetch_market_data, estimate_project_cost]
+    Raises:
+        ToolException: If invocations is empty
+    """
+    if not invocations:
+        raise ToolException("Invocations must list at least one tool call")
+    
+    # Same rule as the agent: read-only calls concurrently, then the rest
+    # one at a time in their original order
+    calls = [
+        ToolCall(id=index, tool=invocation.tool_name, tool_input=invocation.arguments)
+        for index, invocation in enumerate(invocations)
+    ]
+    read_only = [call for call in calls if call.tool in READ_ONLY_TOOL_NAMES]
+    results = _batch_executor.execute_tools_parallel(read_only, _invoke_batched)
+    for call in calls:
+        if call.tool not in READ_ONLY_TOOL_NAMES:
+            results.update(_batch_executor.execute_tools_parallel([call], _invoke_batched))
+    return [results[call.id] for call in calls]
+
+
+def _invoke_batched(tool_name: str, tool_input: Dict[str, Any]) -> Any:
+    """Call one batch entry, validated against its own tool's args_schema."""
+    if tool_name == batch.name or tool_name not in TOOL_INVOKERS:
+        raise ToolException(f"Tool '{tool_name}' can't be called from a batch")
+    return TOOL_INVOKERS[tool_name](tool_input)
+
+
+# Available tools for binding to LLM. The single-call tools stay available
+# next to batch.
+AVAILABLE_TOOLS = (fetch_market_data, estimate_project_cost, batch)
+
+# Their tool-calling schemas, derived once: bind_tools() accepts these as is,
+# skipping the pydantic schema introspection it runs on tool objects
+AVAILABLE_TOOL_SCHEMAS = tuple(convert_to_openai_tool(t) for t in AVAILABLE_TOOLS)
+
+# Tools without side effects carry metadata["is_read_only"]; the agent runs
+# calls to them concurrently. Any other tool is treated as mutating and its
+# calls run one at a time, in the order the LLM made them.
+# metadata["case_insensitive_args"] names string arguments the tool only
+# reads lower-cased, apart from echoing them back under their own name;
+# invokers cache on their lower-cased form. complexity isn't one of them: the
+# estimate's confidence compares it as given.
+# batch has no metadata: whether it is read-only depends on its entries.
+fetch_market_data.metadata = {"is_read_only": True, "case_insensitive_args": ("scope",)}
+estimate_project_cost.metadata = {"is_read_only": True, "case_insensitive_args": ("scope",)}
+
+READ_ONLY_TOOL_NAMES = frozenset(
+    t.name for t in AVAILABLE_TOOLS if (t.metadata or {}).get("is_read_only")
+)
+
+
+# Distinct argument sets whose results are kept per read-only tool
+TOOL_RESULT_CACHE_SIZE = 512
+
+
+class _MemoKey:
+    """Memo key comparing by normalized arguments, carrying the raw ones.
+    
+    Lets the memo share one entry between spellings while the tool itself
+    is still called with the arguments as given.
+    """
+    __slots__ = ("key", "kwargs", "_hash")
+    
+    def __init__(self, key: tuple, kwargs: Dict[str, Any]):
+        self.key = key
+        self.kwargs = kwargs
+        # Raises TypeError for unhashable arguments
+        self._hash = hash(key)
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _MemoKey) and self.key == other.key
+
+
+def _compile_invoker(lc_tool: BaseTool) -> Callable[[Dict[str, Any]], Any]:
+    """Build a direct call path for a tool, skipping BaseTool.invoke().
+    
+    invoke() sets up a callback manager and run tracking on every call, which
+    costs far more than these tools' bodies. The invoker validates arguments
+    with the tool's args_schema, whose pydantic-core validator is compiled once
+    with the class, then calls the function directly. As with invoke(), only
+    provided schema keys are passed so defaults stay with the function, and
+    ToolException / ValidationError propagate. Callbacks and tracing are not
+    triggered.
+    
+    Read-only tools are deterministic, so their results are memoized by
+    validated arguments; the LLM tool loop often repeats a call across
+    iterations. Failures raise through the cache and are never stored. The
+    memo's statistics are exposed as the invoker's cache_info().
+    
+    Case-insensitive arguments are lower-cased for the cache key only, so
+    calls differing just in case ("Excavation" vs "excavation") share one
+    entry; the tool is always called with the validated arguments as given.
+    Such calls only differ in the arguments echoed back, so each hit gets the
+    caller's own spelling restored and the result is exactly what invoke()
+    would return.
+    """
+    validate = lc_tool.args_schema.model_validate
+    fields = frozenset(lc_tool.args_schema.model_fields)
+    func = lc_tool.func
+    metadata = lc_tool.metadata or {}
+    case_insensitive = frozenset(metadata.get("case_insensitive_args", ()))
+    
+    def invoke(tool_input: Dict[str, Any]) -> Any:
+        args = validate(tool_input)
+        return func(**{name: getattr(args, name) for name in tool_input if name in fields})
+    
+    if not metadata.get("is_read_only"):
+        return invoke
+    
+    @lru_cache(maxsize=TOOL_RESULT_CACHE_SIZE)
+    def call_memoized(memo_key: _MemoKey) -> Any:
+        return func(**memo_key.kwargs)
+    
+    def invoke_memoized(tool_input: Dict[str, Any]) -> Any:
+        args = validate(tool_input)
+        kwargs = {name: getattr(args, name) for name in tool_input if name in fields}
+        key = tuple(sorted(
+            (name, value.lower() if name in case_insensitive and isinstance(value, str) else value)
+            for name, value in kwargs.items()
+        ))
+        try:
+            memo_key = _MemoKey(key, kwargs)
+        except TypeError:
+            return func(**kwargs)
+        # Deep copy, so callers can't alter the cached result or the dicts
+        # nested in it (e.g. an estimate's breakdown)
+        result = copy.deepcopy(call_memoized(memo_key))
+        if isinstance(result, dict):
+            for name in case_insensitive.intersection(tool_input).intersection(result):
+                result[name] = getattr(args, name)
+        return result
+    
+    invoke_memoized.cache_info = call_memoized.cache_info
+    invoke_memoized.cache_clear = call_memoized.cache_clear
+    return invoke_memoized
+
+
+# Direct invokers keyed by tool name, for the agent's own tool execution
+TOOL_INVOKERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    t.name: _compile_invoker(t) for t in AVAILABLE_TOOLS
+}
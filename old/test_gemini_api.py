@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Test Gemini API connection and list available models."""
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -19,19 +20,26 @@ try:
         "gemini-3-pro-preview"
     ]
     
-    for model in models_to_test:
-        try:
-            print(f"\nTesting {model}...", end=" ")
-            llm = ChatGoogleGenerativeAI(
-                model=model,
-                google_api_key=api_key,
-                temperature=0.3
-            )
-            response = llm.invoke("Say 'Working!'")
-            print(f"✅ Works! Response: {response.content}")
-            break
-        except Exception as e:
-            print(f"❌ Failed: {str(e)[:80]}")
+    async def probe(model):
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=api_key,
+            temperature=0.3
+        )
+        return await llm.ainvoke("Say 'Working!'")
+    
+    async def probe_all():
+        # All models are probed at once; a failure doesn't stop the others
+        return await asyncio.gather(*(probe(m) for m in models_to_test), return_exceptions=True)
+    
+    # Reported in list order; the first working model is the one to use
+    for model, response in zip(models_to_test, asyncio.run(probe_all())):
+        print(f"\nTesting {model}...", end=" ")
+        if isinstance(response, Exception):
+            print(f"❌ Failed: {str(response)[:80]}")
+            continue
+        print(f"✅ Works! Response: {response.content}")
+        break
             
 except Exception as e:
     print(f"Error: {e}")
@@ -8,13 +8,21 @@ from .nodes import AnswerNode
 logger = getLogger(__name__)
 
 
-class Agent002(StateGraph):
+class Agent002:
+    # Wraps a StateGraph rather than being one; no per-instance __dict__
+    __slots__ = ("agent_name", "graph", "compiled_graph")
+
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
         self.graph = StateGraph(Agent002State)
         self.compiled_graph = None
+        # Compile up front so the first run() doesn't pay for it
+        self._build()
 
-    def build(self):
+    def _build(self):
+        # Adding the nodes twice would raise, so only the first call builds
+        if self.compiled_graph is not None:
+            return
         answer_node = AnswerNode(self.agent_name)
         self.graph.add_node("answer_node", answer_node)
         self.graph.add_edge(START, "answer_node")
@@ -22,7 +30,4 @@ class Agent002(StateGraph):
         self.compiled_graph = self.graph.compile(debug=True)
 
     def run(self, state: InputState) -> OutputState:
-        if self.compiled_graph is None:
-            logger.info("Graph not compiled, compiling now...")
-            self.build()
         return self.compiled_graph.invoke(state)
@@ -8,11 +8,16 @@ from .nodes import AnswerNode, ToolNode
 logger = getLogger(__name__)
 
 
-class Agent003(StateGraph):
+class Agent003:
+    # Wraps a StateGraph rather than being one; no per-instance __dict__
+    __slots__ = ("agent_name", "graph", "compiled_graph")
+
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
         self.graph = StateGraph(Agent003State)
         self.compiled_graph = None
+        # Compile up front so the first run() doesn't pay for it
+        self._build()
 
     def answer_action(state: Agent003State) -> str:
         last_answer = state["messages"][-1]["content"]
@@ -20,7 +25,10 @@ class Agent003(StateGraph):
             return "Use Tool"
         return "No Tool Needed"
 
-    def build(self):
+    def _build(self):
+        # Adding the nodes twice would raise, so only the first call builds
+        if self.compiled_graph is not None:
+            return
         answer_node = AnswerNode(self.agent_name)
         self.graph.add_node("answer_node", answer_node)
         tool_node = ToolNode("tool_node")
@@ -34,7 +42,4 @@ class Agent003(StateGraph):
         self.compiled_graph = self.graph.compile(debug=True)
 
     def run(self, state: InputState) -> OutputState:
-        if self.compiled_graph is None:
-            logger.info("Graph not compiled, compiling now...")
-            self.build()
         return self.compiled_graph.invoke(state)